@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Shared Milvus Helpers for the Maintenance Scripts
+=================================================
+
+One connection per process and one loaded Collection handle per name, shared
+by check_milvus_count.py, check_topper_collections.py and clean_duplicates_milvus.py.
+"""
+
+import functools
+from typing import Dict, Iterator, List
+
+from pymilvus import connections, Collection
+
+DEFAULT_URI = "./milvus_toppers.db"
+
+
+def ensure_connection(uri: str = DEFAULT_URI) -> bool:
+    """Connect the default alias unless it is already connected; True if newly connected"""
+    if connections.has_connection("default"):
+        return False
+    connections.connect("default", uri=uri)
+    return True
+
+
+@functools.lru_cache(maxsize=None)
+def get_loaded_collection(name: str, uri: str = DEFAULT_URI) -> Collection:
+    """Return a Collection handle, loading it once per process"""
+    ensure_connection(uri)
+    collection = Collection(name)
+    collection.load()
+    return collection
+
+
+def iter_rows(collection: Collection, output_fields: List[str], batch_size: int = 500,
+              expr: str = "") -> Iterator[Dict]:
+    """Stream every matching row with a server-side query iterator (no 16384-row query window)"""
+    iterator = collection.query_iterator(batch_size=batch_size, expr=expr, output_fields=output_fields)
+    try:
+        while True:
+            batch = iterator.next()
+            if not batch:
+                break
+            yield from batch
+    finally:
+        iterator.close()
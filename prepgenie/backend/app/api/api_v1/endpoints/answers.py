@@ -9,6 +9,7 @@ import traceback
 import asyncio
 from pathlib import Path
 import json
+import orjson
 from datetime import datetime
 
 from app.db.database import get_db
@@ -22,9 +23,9 @@ from app.schemas.answer import (
 )
 from app.core.config import settings
 from app.utils.vision_pdf_processor import VisionPDFProcessor
-from app.core.llm_service import get_llm_service, LLMService
+from app.core.llm_service import get_llm_service, close_llm_service, LLMService
 from app.utils.vision_pdf_processor import ProgressTracker
-from app.services.topper_comparison_service import TopperComparisonService
+from app.services.topper_comparison_service import get_topper_comparison_service
 from app.db.database import SessionLocal
 
 router = APIRouter()
@@ -33,6 +34,13 @@ logger = logging.getLogger(__name__)
 # Force reload test v3
 
 # Helper functions
+def _loads_stored_json(blob):
+    """Parse a stored JSON column; rows written by json.dumps may hold NaN/Infinity, which orjson rejects"""
+    try:
+        return orjson.loads(blob)
+    except orjson.JSONDecodeError:
+        return json.loads(blob)
+
 async def save_uploaded_file(file: UploadFile) -> str:
     """Save uploaded file and return the file path"""
     upload_dir = Path(settings.UPLOAD_DIR) / "answers"
@@ -489,10 +497,10 @@ async def topper_comparison_evaluation(answer_id: int, file_path: str, task_id:
                     logger.info(f"📋 First question sample: {str(first_q)[:200]}...")
                 
                 # Initialize topper comparison service
-                topper_service = TopperComparisonService()
+                topper_service = get_topper_comparison_service()
                 
-                # Process each question individually
-                all_topper_evaluations = []
+                # Collect the questions to compare; each comparison is independent
+                pending_questions = []
                 for i, question in enumerate(questions_list):
                     question_text = question.get('question_text', '')
                     student_answer = question.get('student_answer', '')  # Changed from 'complete_answer' to 'student_answer'
@@ -508,32 +516,53 @@ async def topper_comparison_evaluation(answer_id: int, file_path: str, task_id:
                         logger.warning(f"Skipping Q{i+1}: question_text='{question_text[:50]}...', student_answer='{student_answer[:50]}...'")
                         continue
                     
-                    logger.info(f"Processing Q{i+1}: '{question_text[:100]}...' with {len(student_answer)} chars")
-                    
-                    # Perform topper comparison for this specific question
-                    topper_evaluation = await topper_service.generate_topper_based_evaluation(
-                        question_text=question_text,
-                        student_answer=student_answer,
-                        marks=marks
-                    )
-                    
-                    # Add question number and details
-                    topper_evaluation['question_number'] = i + 1
-                    topper_evaluation['question_text'] = question_text[:100] + "..." if len(question_text) > 100 else question_text
-                    
-                    all_topper_evaluations.append(topper_evaluation)
-                    
-                    # Send progress update for each question
-                    progress_percentage = 50 + (30 * (i + 1) / len(questions_list))  # 50-80% range
+                    pending_questions.append((i, question_text, student_answer, marks))
+                
+                # One batched call: searches share a single embedding pass, and the LLM
+                # comparisons run concurrently (cache hits skip the LLM entirely)
+                await progress_manager.send_progress_update(task_id, {
+                    "progress": 50,
+                    "message": f"📊 Analyzing {len(pending_questions)} Questions with Toppers",
+                    "timestamp": datetime.now().isoformat(),
+                    "phase": "topper_comparison",
+                    "details": f"Comparing {len(pending_questions)} answers with topper answers",
+                    "answer_id": answer_id
+                })
+                
+                completed_count = 0
+                
+                async def question_done(j: int):
+                    # Send progress update as each question finishes
+                    nonlocal completed_count
+                    completed_count += 1
+                    i = pending_questions[j][0]
+                    progress_percentage = 50 + (30 * completed_count / len(pending_questions))  # 50-80% range
                     await progress_manager.send_progress_update(task_id, {
                         "progress": int(progress_percentage),
                         "message": f"📊 Analyzing Question {i+1} with Toppers",
                         "timestamp": datetime.now().isoformat(),
                         "phase": "topper_comparison",
-                        "details": f"Comparing Q{i+1} with topper answers",
+                        "details": f"Compared Q{i+1} with topper answers ({completed_count}/{len(pending_questions)})",
                         "answer_id": answer_id
                     })
                 
+                # The concurrency cap keeps bursts within the LLM provider's rate limits
+                batch_results = await topper_service.generate_topper_based_evaluations(
+                    [(question_text, student_answer, marks) for _, question_text, student_answer, marks in pending_questions],
+                    max_concurrency=4,
+                    on_item_done=question_done
+                )
+                
+                all_topper_evaluations = []
+                for (i, question_text, _, _), topper_evaluation in zip(pending_questions, batch_results):
+                    if topper_evaluation.get('error'):
+                        logger.error(f"❌ Topper comparison failed for Q{i+1}: {topper_evaluation['error']}")
+                    
+                    # Add question number and details
+                    topper_evaluation['question_number'] = i + 1
+                    topper_evaluation['question_text'] = question_text[:100] + "..." if len(question_text) > 100 else question_text
+                    all_topper_evaluations.append(topper_evaluation)
+                
                 # Combine all evaluations into comprehensive feedback
                 if all_topper_evaluations:
                     combined_feedback = []
@@ -546,7 +575,10 @@ async def topper_comparison_evaluation(answer_id: int, file_path: str, task_id:
                         
                         combined_feedback.append(f"\n🔍 **QUESTION {q_num} ANALYSIS**")
                         combined_feedback.append(f"**Question**: {q_text}")
-                        combined_feedback.append(f"**Score**: {eval_result.get('score', 0)}/{eval_result.get('max_score', 10)}")
+                        if eval_result.get('scored', True):
+                            combined_feedback.append(f"**Score**: {eval_result.get('score', 0)}/{eval_result.get('max_score', 10)}")
+                        else:
+                            combined_feedback.append("**Score**: Not scored (no similar topper answer)")
                         combined_feedback.append("---")
                         combined_feedback.append(eval_result.get('feedback', 'No feedback available'))
                         combined_feedback.append("\n" + "="*50 + "\n")
@@ -707,7 +739,7 @@ def comprehensive_pdf_evaluation(answer_id: int, file_path: str, evaluation_type
 def _create_topper_comparison_evaluation(answer_id: int, evaluation_results: dict, local_db):
     """Create topper comparison based evaluation"""
     try:
-        from app.services.topper_comparison_service import TopperComparisonService
+        from app.services.topper_comparison_service import get_topper_comparison_service
         
         logger.info(f"Creating topper comparison evaluation for answer {answer_id}")
         
@@ -719,7 +751,7 @@ def _create_topper_comparison_evaluation(answer_id: int, evaluation_results: dic
             marks = first_question.get("marks", 10)
             
             # Initialize topper comparison service
-            topper_service = TopperComparisonService()
+            topper_service = get_topper_comparison_service()
             
             # Generate topper-based evaluation (this is async but we'll handle it)
             import asyncio
@@ -751,6 +783,7 @@ def _create_topper_comparison_evaluation(answer_id: int, evaluation_results: dic
                 logger.info(f"✅ SUCCESS: Topper comparison evaluation created with ID: {new_evaluation.id}")
                 
             finally:
+                loop.run_until_complete(close_llm_service())
                 loop.close()
         else:
             # Fallback evaluation
@@ -900,10 +933,10 @@ async def upload_answer_legacy(
 async def create_topper_comparison_evaluation(answer_id: int, file_path: str, db: Session):
     """Create evaluation using topper comparison approach"""
     try:
-        from app.services.topper_comparison_service import TopperComparisonService
+        from app.services.topper_comparison_service import get_topper_comparison_service
         
         # Initialize topper comparison service
-        topper_service = TopperComparisonService()
+        topper_service = get_topper_comparison_service()
         
         # Generate topper-based evaluation
         evaluation_result = await topper_service.generate_topper_based_evaluation(
@@ -947,6 +980,7 @@ def comprehensive_pdf_evaluation(answer_id: int, file_path: str, evaluation_type
                 )
                 logger.info(f"✅ Topper comparison evaluation completed for answer_id={answer_id}")
             finally:
+                loop.run_until_complete(close_llm_service())
                 loop.close()
         else:
             # Use traditional dimensional evaluation
@@ -1065,7 +1099,7 @@ async def get_my_answers(
             # Parse and include actionable data if available
             if hasattr(evaluation, 'actionable_data') and evaluation.actionable_data:
                 try:
-                    actionable = json.loads(evaluation.actionable_data)
+                    actionable = _loads_stored_json(evaluation.actionable_data)
                     # Merge actionable fields into evaluation_data for frontend
                     if actionable.get('questions') and len(actionable['questions']) > 0:
                         # Get first question's actionable data for summary display
@@ -1343,7 +1377,7 @@ async def generate_model_answer(
     # Check if model answer already exists
     if evaluation.model_answer:
         try:
-            existing_model = json.loads(evaluation.model_answer)
+            existing_model = _loads_stored_json(evaluation.model_answer)
             return {
                 "success": True,
                 "answer_id": answer_id,
@@ -1356,7 +1390,7 @@ async def generate_model_answer(
     
     # Parse actionable data
     try:
-        actionable = json.loads(evaluation.actionable_data)
+        actionable = _loads_stored_json(evaluation.actionable_data)
     except json.JSONDecodeError:
         raise HTTPException(status_code=500, detail="Failed to parse evaluation data")
     
@@ -1646,7 +1680,7 @@ async def get_model_answer(
         raise HTTPException(status_code=404, detail="Model answer not generated yet. Call POST /generate-model-answer first.")
     
     try:
-        model_data = json.loads(evaluation.model_answer)
+        model_data = _loads_stored_json(evaluation.model_answer)
         return {
             "success": True,
             "answer_id": answer_id,
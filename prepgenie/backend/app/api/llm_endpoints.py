@@ -9,7 +9,7 @@ import logging
 import json
 import os
 
-from app.core.llm_service import get_llm_service, ChatMessage, LLMService, LLMServiceError
+from app.core.llm_service import get_llm_service, ChatMessage, LLMService, LLMServiceError, is_transient_llm_error
 from app.services.enhanced_comprehensive_analysis import enhanced_comprehensive_analysis_with_topper_comparison
 
 # Import modular prompts for UPSC evaluation
@@ -1022,7 +1022,8 @@ CRITICAL: Be SPECIFIC - name actual schemes, articles, committees, examples. No
             "strengths": ["Fallback analysis provided"],
             "improvements": ["Retry analysis", "Check system configuration"],
             "success": False,
-            "error": str(e)
+            "error": str(e),
+            "transient": is_transient_llm_error(e)
         }
 
 
@@ -10,7 +10,9 @@ import time
 import hashlib
 import hmac
 import base64
-from typing import Dict, Any, Optional, List, Union
+import weakref
+from contextlib import asynccontextmanager
+from typing import Dict, Any, Optional, List, Union, Callable, Awaitable
 from pydantic import BaseModel
 import httpx
 from tenacity import retry, retry_if_exception_type, wait_exponential, stop_after_attempt
@@ -45,6 +47,24 @@ class ChatResponse(BaseModel):
     provider: str
 
 
+def is_transient_llm_error(error: BaseException) -> bool:
+    """
+    Timeouts, 429s and 5xx responses are worth retrying; anything else fails the same way again
+    Providers wrap these in LLMServiceError, so the exception chain is checked too
+    """
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        if isinstance(error, httpx.HTTPStatusError):
+            status = error.response.status_code
+            if status == 429 or status >= 500:
+                return True
+        elif isinstance(error, (httpx.TimeoutException, asyncio.TimeoutError, RateLimitException)):
+            return True
+        error = error.__cause__ or error.__context__
+    return False
+
+
 def generate_walmart_auth_signature(consumer_id: str, private_key: str) -> tuple[str, str, str]:
     """Generate authentication signature for Walmart LLM Gateway"""
     timestamp = str(int(time.time() * 1000))
@@ -73,7 +93,66 @@ def generate_walmart_auth_signature(consumer_id: str, private_key: str) -> tuple
         raise
 
 
-class OpenAIProvider:
+class PooledClientMixin:
+    """Optional keep-alive clients shared by every request from a provider (see ensure_http_client)
+    
+    Pooled connections belong to the event loop that opened them, so each running loop
+    gets its own client; sync endpoints that run their own loop never touch another's pool.
+    """
+    
+    _pool_limits: Optional[httpx.Limits] = None
+    _loop_clients: Optional["weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]"] = None
+    
+    def _pool_verify(self) -> bool:
+        """SSL verification for the pooled client"""
+        return True
+    
+    def ensure_http_client(self, limits: Optional[httpx.Limits] = None):
+        """Enable keep-alive clients (one per event loop) reused by every request from this provider"""
+        self._pool_limits = limits or httpx.Limits()
+        if self._loop_clients is None:
+            self._loop_clients = weakref.WeakKeyDictionary()
+    
+    def _loop_client(self) -> Optional[httpx.AsyncClient]:
+        """The running loop's pooled client, created on first use; None when pooling is off"""
+        if self._pool_limits is None:
+            return None
+        loop = asyncio.get_running_loop()
+        client = self._loop_clients.get(loop)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                timeout=120.0,
+                verify=self._pool_verify(),
+                limits=self._pool_limits
+            )
+            self._loop_clients[loop] = client
+        return client
+    
+    async def aclose(self):
+        """Close the running loop's pooled client and forget those of already-closed loops"""
+        if not self._loop_clients:
+            return
+        client = self._loop_clients.pop(asyncio.get_running_loop(), None)
+        for loop in [loop for loop in self._loop_clients if loop.is_closed()]:
+            del self._loop_clients[loop]
+        if client is not None:
+            await client.aclose()
+    
+    @asynccontextmanager
+    async def _client(self, timeout: float, verify: bool = True):
+        """Yield the running loop's pooled client when configured, otherwise a per-request client
+        
+        The pooled client keeps its own default timeout, so callers also pass timeout to each request.
+        """
+        client = self._loop_client()
+        if client is not None:
+            yield client
+        else:
+            async with httpx.AsyncClient(timeout=timeout, verify=verify) as client:
+                yield client
+
+
+class OpenAIProvider(PooledClientMixin):
     """OpenAI API provider"""
     
     def __init__(self):
@@ -84,6 +163,10 @@ class OpenAIProvider:
         if not self.api_key:
             raise LLMServiceError("OpenAI API key not configured")
     
+    def _pool_verify(self) -> bool:
+        # For stage environment, bypass SSL verification
+        return "stage" not in self.base_url.lower()
+    
     @retry(
         retry=retry_if_exception_type((httpx.HTTPStatusError, RateLimitException)),
         wait=wait_exponential(multiplier=1, min=2, max=30),
@@ -123,7 +206,7 @@ class OpenAIProvider:
         # For stage environment, bypass SSL verification
         verify_ssl = "stage" not in self.base_url.lower()
         
-        async with httpx.AsyncClient(timeout=60.0, verify=verify_ssl) as client:
+        async with self._client(60.0, verify_ssl) as client:
             try:
                 # Construct URL with API version for Walmart Gateway deployments
                 if "wmtllmgateway" in self.base_url.lower() and "deployments" in self.base_url.lower():
@@ -135,7 +218,7 @@ class OpenAIProvider:
                 logger.debug(f"Headers: {headers}")
                 logger.debug(f"Payload: {payload}")
                 
-                response = await client.post(url, headers=headers, json=payload)
+                response = await client.post(url, headers=headers, json=payload, timeout=60.0)
                 
                 if response.status_code == 429:
                     raise RateLimitException("OpenAI rate limit exceeded")
@@ -200,7 +283,7 @@ class OpenAIProvider:
         # For stage environment, bypass SSL verification
         verify_ssl = "stage" not in self.base_url.lower()
         
-        async with httpx.AsyncClient(timeout=120.0, verify=verify_ssl) as client:
+        async with self._client(120.0, verify_ssl) as client:
             try:
                 # Construct URL with API version for Walmart Gateway deployments
                 if "wmtllmgateway" in self.base_url.lower() and "deployments" in self.base_url.lower():
@@ -210,7 +293,7 @@ class OpenAIProvider:
                 
                 logger.info(f"Sending vision request to OpenAI: {url}")
                 
-                response = await client.post(url, headers=headers, json=payload)
+                response = await client.post(url, headers=headers, json=payload, timeout=120.0)
                 
                 if response.status_code == 429:
                     raise RateLimitException("OpenAI rate limit exceeded")
@@ -218,7 +301,11 @@ class OpenAIProvider:
                 response.raise_for_status()
                 response_data = response.json()
                 
-                logger.info(f"OpenAI vision response status: {response.status_code}")
+                # cached_tokens shows how much of the prompt prefix the provider served from its cache
+                usage = response_data.get("usage") or {}
+                cached_tokens = (usage.get("prompt_tokens_details") or {}).get("cached_tokens", 0)
+                logger.info(f"OpenAI vision response status: {response.status_code} "
+                            f"(prompt tokens: {usage.get('prompt_tokens', '?')}, cached: {cached_tokens})")
                 
                 # Extract content from response
                 content = ""
@@ -243,7 +330,7 @@ class OpenAIProvider:
                 raise LLMServiceError(f"OpenAI Vision error: {str(e)}")
 
 
-class WalmartLLMGatewayProvider:
+class WalmartLLMGatewayProvider(PooledClientMixin):
     """Walmart LLM Gateway provider"""
     
     def __init__(self):
@@ -267,6 +354,10 @@ class WalmartLLMGatewayProvider:
             if not self.consumer_id or not self.private_key:
                 raise LLMServiceError("Walmart LLM Gateway credentials not configured")
     
+    def _pool_verify(self) -> bool:
+        # For stage environment, bypass SSL verification
+        return self.svc_env != "stage"
+    
     @retry(
         retry=retry_if_exception_type((httpx.HTTPStatusError, RateLimitException)),
         wait=wait_exponential(multiplier=1, min=3, max=30),
@@ -320,11 +411,11 @@ class WalmartLLMGatewayProvider:
         # For stage environment, bypass SSL verification
         verify_ssl = self.svc_env != "stage"
         
-        async with httpx.AsyncClient(timeout=60.0, verify=verify_ssl) as client:
+        async with self._client(60.0, verify_ssl) as client:
             try:
                 logger.info(f"Sending request to Walmart LLM Gateway: {url}")
                 
-                response = await client.post(url, headers=headers, json=payload)
+                response = await client.post(url, headers=headers, json=payload, timeout=60.0)
                 
                 if response.status_code == 429:
                     raise RateLimitException("Walmart LLM Gateway rate limit exceeded")
@@ -354,7 +445,7 @@ class WalmartLLMGatewayProvider:
                 raise LLMServiceError(f"Walmart LLM Gateway error: {str(e)}")
 
 
-class OllamaProvider:
+class OllamaProvider(PooledClientMixin):
     """Provider for Ollama local LLM service"""
     
     def __init__(self):
@@ -388,12 +479,13 @@ class OllamaProvider:
             }
         }
         
-        async with httpx.AsyncClient(timeout=120.0) as client:
+        async with self._client(120.0) as client:
             try:
                 response = await client.post(
                     f"{self.base_url}/api/generate",
                     json=payload,
-                    headers={"Content-Type": "application/json"}
+                    headers={"Content-Type": "application/json"},
+                    timeout=120.0
                 )
                 
                 if response.status_code == 429:
@@ -480,11 +572,55 @@ class LLMService:
     async def generate_completion(self, prompt: str, **kwargs) -> str:
         """Generate a simple completion for a given prompt (Ollama-style interface)"""
         return await self.simple_chat(prompt, **kwargs)
+    
+    async def generate_completions_batch(self, prompts: List[str], max_concurrency: int = 8,
+                                         return_exceptions: bool = False,
+                                         on_complete: Optional[Callable[[int], Awaitable[None]]] = None,
+                                         **kwargs) -> List[Any]:
+        """
+        Generate completions for many prompts at once, in input order
+        Requests are in flight together so the backend can batch them; with
+        return_exceptions=True a failed prompt yields its exception instead of raising.
+        on_complete(index) is awaited as each prompt finishes (e.g. for progress updates)
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def complete(index: int, prompt: str) -> str:
+            try:
+                async with semaphore:
+                    return await self.generate_completion(prompt, **kwargs)
+            finally:
+                if on_complete:
+                    await on_complete(index)
+        
+        return await asyncio.gather(*(complete(i, prompt) for i, prompt in enumerate(prompts)),
+                                    return_exceptions=return_exceptions)
+    
+    def ensure_http_client(self, max_connections: int = 10, max_keepalive_connections: int = 5):
+        """
+        Reuse one pooled HTTP client for all requests (batch jobs)
+        No-op for providers that don't support a shared client
+        """
+        if hasattr(self.provider, "ensure_http_client"):
+            self.provider.ensure_http_client(httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections
+            ))
+    
+    async def aclose(self):
+        """Release the running loop's pooled HTTP client, if one was created"""
+        if hasattr(self.provider, "aclose"):
+            await self.provider.aclose()
 
 
 # Global LLM service instance
 _llm_service: Optional[LLMService] = None
 
+# Keep-alive pool of the global instance, so concurrent evaluations share connections
+# instead of paying a TLS handshake per completion
+LLM_HTTP_MAX_CONNECTIONS = int(os.getenv("LLM_HTTP_MAX_CONNECTIONS", "64"))
+LLM_HTTP_MAX_KEEPALIVE = int(os.getenv("LLM_HTTP_MAX_KEEPALIVE", "32"))
+
 
 def get_llm_service() -> LLMService:
     """Get the global LLM service instance"""
@@ -495,9 +631,22 @@ def get_llm_service() -> LLMService:
     
     if _llm_service is None:
         _llm_service = LLMService()
+        _llm_service.ensure_http_client(
+            max_connections=LLM_HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=LLM_HTTP_MAX_KEEPALIVE
+        )
     return _llm_service
 
 
+async def close_llm_service():
+    """Close the global instance's pooled HTTP client for the running loop
+    
+    Called on application shutdown, and by sync code before closing its own event loop.
+    """
+    if _llm_service is not None:
+        await _llm_service.aclose()
+
+
 # Test function
 async def test_llm_service():
     """Test the LLM service with the configured provider"""
@@ -1,3 +1,6 @@
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from typing import Union, Optional
 import jwt
@@ -6,6 +9,12 @@ from app.core.config import settings
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# Verified token -> payload, so repeat requests with the same bearer token skip
+# the signature check. Entries are only served while their "exp" is in the future.
+_VERIFIED_TOKEN_CACHE_SIZE = 1024
+_verified_tokens: "OrderedDict[str, dict]" = OrderedDict()
+_verified_tokens_lock = threading.Lock()
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
@@ -23,8 +32,23 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     return encoded_jwt
 
 def verify_token(token: str) -> Optional[dict]:
+    with _verified_tokens_lock:
+        payload = _verified_tokens.get(token)
+        if payload is not None:
+            if payload.get("exp", 0) > time.time():
+                _verified_tokens.move_to_end(token)
+                return dict(payload)
+            del _verified_tokens[token]
+
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        return payload
     except jwt.InvalidTokenError:
         return None
+
+    # Tokens without an expiry are never cached
+    if isinstance(payload.get("exp"), (int, float)):
+        with _verified_tokens_lock:
+            _verified_tokens[token] = payload
+            if len(_verified_tokens) > _VERIFIED_TOKEN_CACHE_SIZE:
+                _verified_tokens.popitem(last=False)
+    return dict(payload)
@@ -18,6 +18,8 @@ class WorkflowConfig:
     # LangGraph specific settings
     LANGGRAPH_TIMEOUT = int(os.getenv("LANGGRAPH_TIMEOUT", "900"))  # 15 minutes
     LANGGRAPH_MAX_RETRIES = int(os.getenv("LANGGRAPH_MAX_RETRIES", "3"))
+    LANGGRAPH_MAX_CONCURRENT_QUESTIONS = int(os.getenv("LANGGRAPH_MAX_CONCURRENT_QUESTIONS", "4"))  # Parallel per-question analyses
+    LANGGRAPH_MAX_FALLBACK_CHARS = int(os.getenv("LANGGRAPH_MAX_FALLBACK_CHARS", "20000"))  # Cap on raw content sent to LLM in fallback
     
     # A/B Testing (user-based routing)
     LANGGRAPH_USER_PERCENTAGE = float(os.getenv("LANGGRAPH_USER_PERCENTAGE", "0.0"))  # 0% = disabled
@@ -3,8 +3,7 @@ Database connection utilities with timeout and error handling
 """
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import OperationalError
-from sqlalchemy import text
-from app.db.database import SessionLocal
+from app.db.database import SessionLocal, engine, PING_SQL
 import logging
 from contextlib import contextmanager
 from typing import Optional
@@ -22,7 +21,7 @@ def get_db_with_timeout(timeout_seconds: int = 5):
         db = SessionLocal()
         
         # Test the connection with a simple query
-        db.execute(text("SELECT 1"))
+        db.execute(PING_SQL)
         
         yield db
     except OperationalError as e:
@@ -44,7 +43,9 @@ def test_db_connection() -> bool:
     Test if database connection is working
     """
     try:
-        with get_db_with_timeout(timeout_seconds=3):
-            return True
+        # Single pooled connection, no Session or transaction bookkeeping
+        with engine.connect() as conn:
+            conn.execute(PING_SQL)
+        return True
     except Exception:
         return False
@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
@@ -32,6 +32,27 @@ else:
         }
 
 engine = create_engine(settings.DATABASE_URL, **engine_kwargs)
+
+# Constant health-check statement, built once so repeated checks reuse SQLAlchemy's
+# compiled-statement cache entry instead of constructing a new TextClause per call
+PING_SQL = text("SELECT 1")
+
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",  # 256 MB
+    "PRAGMA cache_size=-65536",  # 64 MB page cache
+)
+
+if "sqlite" in settings.DATABASE_URL.lower():
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        """Apply performance pragmas once per new SQLite connection"""
+        cursor = dbapi_connection.cursor()
+        for pragma in SQLITE_PRAGMAS:
+            cursor.execute(pragma)
+        cursor.close()
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
@@ -46,12 +67,9 @@ def get_db():
 def test_db_connection():
     """Test database connection quickly"""
     try:
-        from sqlalchemy import text
-        db = SessionLocal()
-        # Quick connection test with timeout
-        result = db.execute(text("SELECT 1"))
-        result.fetchone()
-        db.close()
+        # Borrow one pooled connection directly; a full ORM Session adds nothing here
+        with engine.connect() as conn:
+            conn.execute(PING_SQL).fetchone()
         return True
     except Exception:
         return False
@@ -0,0 +1,78 @@
+"""
+Shared Embedding Model
+Process-wide SentenceTransformer instances so every vector service reuses one
+copy of the BGE weights instead of each loading its own
+
+Set EMBEDDING_BACKEND=onnx-int8 to run inference through a dynamically
+int8-quantized ONNX export (requires `pip install sentence-transformers[onnx]`).
+The export is built once into EMBEDDING_ONNX_DIR and reused afterwards.
+"""
+import logging
+import os
+import threading
+from typing import Dict, Optional, Tuple
+
+from sentence_transformers import SentenceTransformer
+from sentence_transformers.util import get_device_name
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_EMBEDDING_MODEL = "BAAI/bge-large-en-v1.5"
+
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch").lower()
+EMBEDDING_ONNX_DIR = os.getenv("EMBEDDING_ONNX_DIR", "./models/onnx-int8")
+ONNX_QUANTIZATION = os.getenv("EMBEDDING_ONNX_QUANTIZATION", "avx2")  # avx2 | avx512 | avx512_vnni | arm64
+
+_models: Dict[Tuple[str, str], SentenceTransformer] = {}
+_lock = threading.Lock()
+
+
+def get_embedder(model_name: str = DEFAULT_EMBEDDING_MODEL, device: Optional[str] = None) -> SentenceTransformer:
+    """Return the shared model for (model_name, device), loading it on first use
+
+    device=None resolves to the device SentenceTransformer would pick, so callers that
+    name that device explicitly share the same instance. Load failures are raised to
+    the caller and not cached, so a later call retries.
+    """
+    device = device or get_device_name()
+    key = (model_name, device)
+    model = _models.get(key)
+    if model is None:
+        with _lock:
+            model = _models.get(key)
+            if model is None:
+                model = _load_model(model_name, device)
+                _models[key] = model
+                logger.info("✅ Loaded shared embedding model %s (device=%s)", model_name, device)
+    return model
+
+
+def _load_model(model_name: str, device: Optional[str]) -> SentenceTransformer:
+    """Load the configured backend, falling back to the PyTorch model"""
+    if EMBEDDING_BACKEND == "onnx-int8":
+        try:
+            return _load_onnx_int8(model_name, device)
+        except Exception as e:
+            logger.warning("⚠️ ONNX int8 embedder unavailable for %s, using PyTorch: %s", model_name, e)
+    return SentenceTransformer(model_name, device=device)
+
+
+def _load_onnx_int8(model_name: str, device: Optional[str]) -> SentenceTransformer:
+    """Load (exporting on first use) a dynamically int8-quantized ONNX copy of the model"""
+    from sentence_transformers import export_dynamic_quantized_onnx_model
+
+    export_dir = os.path.join(EMBEDDING_ONNX_DIR, model_name.replace("/", "__"))
+    file_name = f"onnx/model_qint8_{ONNX_QUANTIZATION}.onnx"
+
+    if not os.path.exists(os.path.join(export_dir, file_name)):
+        logger.info("🔧 Exporting %s to int8 ONNX (%s) in %s", model_name, ONNX_QUANTIZATION, export_dir)
+        onnx_model = SentenceTransformer(model_name, backend="onnx", device=device)
+        onnx_model.save(export_dir)
+        export_dynamic_quantized_onnx_model(onnx_model, ONNX_QUANTIZATION, export_dir)
+
+    return SentenceTransformer(
+        export_dir,
+        backend="onnx",
+        device=device,
+        model_kwargs={"file_name": file_name},
+    )
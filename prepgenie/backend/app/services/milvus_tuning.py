@@ -0,0 +1,79 @@
+"""
+Milvus Search Tuning
+Derives per-collection search parameters from the collection's vector index
+so callers don't hardcode nprobe/ef for every collection size
+"""
+import json
+import logging
+import math
+from typing import Any, Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+# Index description per collection name; indexes don't change while a process runs
+_INDEX_PROFILES: Dict[str, Dict[str, Any]] = {}
+
+
+def index_profile(collection, vector_field: str = "embedding") -> Dict[str, Any]:
+    """Return {index_type, metric_type, nlist} for a collection's vector index (cached)
+
+    Collections also carry scalar filter indexes, so the vector index is picked by field
+    name; collection.index() raises AmbiguousIndexName once there is more than one.
+    Raises instead of guessing a metric, since a wrong one silently corrupts scores.
+    """
+    profile = _INDEX_PROFILES.get(collection.name)
+    if profile is not None:
+        return profile
+
+    vector_index = next(
+        (index for index in collection.indexes if index.field_name == vector_field), None
+    )
+    if vector_index is None:
+        raise RuntimeError(f"Collection {collection.name} has no index on '{vector_field}'")
+
+    params = dict(vector_index.params)
+    # pymilvus nests build params under "params", sometimes as a JSON string
+    build_params = params.get("params", params)
+    if isinstance(build_params, str):
+        build_params = json.loads(build_params)
+    if "metric_type" not in params:
+        raise RuntimeError(f"Index on {collection.name}.{vector_field} has no metric_type: {params}")
+    profile = {
+        "index_type": params.get("index_type", "IVF_FLAT"),
+        "metric_type": params["metric_type"],
+        "nlist": int(build_params.get("nlist", 1024)),
+    }
+    logger.info("📐 %s vector index: %s", collection.name, profile)
+
+    _INDEX_PROFILES[collection.name] = profile
+    return profile
+
+
+def adaptive_search_params(collection, limit: int) -> Dict[str, Any]:
+    """Search params scaled to the index: nprobe ~ sqrt(nlist) for IVF, ef ~ 2*limit for HNSW"""
+    profile = index_profile(collection)
+    if profile["index_type"] == "HNSW":
+        params = {"ef": max(limit * 2, 64)}
+    else:
+        nprobe = int(math.sqrt(profile["nlist"])) * max(1, limit // 10)
+        params = {"nprobe": max(8, min(64, nprobe))}
+    return {"metric_type": profile["metric_type"], "params": params}
+
+
+# Raw Milvus score -> similarity in "higher is better" form, per metric.
+# COSINE and IP already return similarities; L2 returns a distance.
+_SCORE_CONVERTERS = {
+    "COSINE": lambda score: score,
+    "IP": lambda score: score,
+    "L2": lambda score: 1.0 / (1.0 + score),
+}
+
+
+def score_converter(metric_type: str) -> Callable[[float], float]:
+    """Return the raw-score -> similarity function for a metric name (COSINE if unknown)"""
+    return _SCORE_CONVERTERS.get(metric_type, _SCORE_CONVERTERS["COSINE"])
+
+
+def similarity_converter(collection) -> Callable[[float], float]:
+    """Return the raw-score -> similarity function for a collection's metric"""
+    return score_converter(index_profile(collection)["metric_type"])
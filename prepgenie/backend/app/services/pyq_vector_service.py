@@ -5,10 +5,10 @@ Handles vector storage and semantic search for Previous Year Questions
 from typing import List, Dict, Optional, Any
 from pymilvus import Collection, connections, FieldSchema, CollectionSchema, DataType, utility
 import numpy as np
-from sentence_transformers import SentenceTransformer
 import logging
 import os
 from app.core.config import settings
+from app.services.embedder import get_embedder
 import json
 from typing import Optional
 from dataclasses import dataclass
@@ -52,7 +52,7 @@ class PYQVectorService:
             os.environ['TRANSFORMERS_OFFLINE'] = '1'
             os.environ['HF_HUB_OFFLINE'] = '1'
             
-            self.embedding_model = SentenceTransformer(self.model_name, device='cpu')
+            self.embedding_model = get_embedder(self.model_name)
             logger.info("✅ Embedding model loaded successfully from cache")
         except Exception as e:
             logger.error(f"❌ Failed to load model {self.model_name}: {e}")
@@ -210,13 +210,11 @@ class PYQVectorService:
             # Ensure model is loaded
             if not hasattr(self, 'embedding_model') or self.embedding_model is None:
                 logger.info("🔄 Reinitializing embedding model...")
-                from sentence_transformers import SentenceTransformer
-                
                 # Use offline mode to avoid SSL issues
                 os.environ['TRANSFORMERS_OFFLINE'] = '1'
                 os.environ['HF_HUB_OFFLINE'] = '1'
                 
-                self.embedding_model = SentenceTransformer('BAAI/bge-large-en-v1.5', device='cpu')
+                self.embedding_model = get_embedder(self.model_name)
             
             # Generate embeddings
             embeddings = self.embedding_model.encode(texts, convert_to_numpy=True)
@@ -308,6 +306,9 @@ Return only the expanded query text, no explanations."""
                 try:
                     return loop.run_until_complete(_async_expand())
                 finally:
+                    # Pooled LLM connections are bound to this loop; release them with it
+                    from app.core.llm_service import close_llm_service
+                    loop.run_until_complete(close_llm_service())
                     loop.close()
             
             # Run in separate thread to avoid event loop conflicts
@@ -400,6 +401,8 @@ Ranking (most to least relevant):"""
                     return None
                 finally:
                     try:
+                        from app.core.llm_service import close_llm_service
+                        loop.run_until_complete(close_llm_service())
                         loop.close()
                     except:
                         pass
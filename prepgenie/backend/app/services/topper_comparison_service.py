@@ -2,217 +2,115 @@
 Topper Comparison Service
 Provides semantic comparison between student answers and topper answers
 Identifies gaps, similarities, and improvement suggestions based on topper performance
+
+pymilvus and the embedding model (torch) are imported on first use, so importing
+this module (answers.py does at startup) stays cheap.
 """
-from typing import List, Dict, Any, Optional, Tuple
-import json
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, List, Dict, Any, Optional, Tuple, Callable, Awaitable
+import asyncio
+import copy
+import hashlib
 import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from pymilvus import MilvusClient
-from sentence_transformers import SentenceTransformer
-import numpy as np
+from pathlib import Path
+import orjson
 
-from app.core.config import settings
 from app.core.llm_service import get_llm_service
+from app.services.milvus_tuning import score_converter
+from app.utils.disk_cache import DiskCache
+
+if TYPE_CHECKING:
+    from pymilvus import MilvusClient
 
 logger = logging.getLogger(__name__)
 
-class TopperComparisonService:
-    """Service for comparing student answers with topper answers using BGE embeddings"""
-    
-    def __init__(self):
-        self.collection_name = "topper_embeddings"
-        self.model = None
-        self.milvus_client = None
-        self.llm_service = get_llm_service()
-        self._initialize_connections()
-    
-    def _initialize_connections(self):
-        """Initialize BGE embedding model and Milvus connection (1024-dim)"""
-        try:
-            # Use BGE model for high-quality embeddings
-            from sentence_transformers import SentenceTransformer
-            import socket
-            
-            # Set socket timeout for model download
-            original_timeout = socket.getdefaulttimeout()
-            socket.setdefaulttimeout(30)  # 30 second timeout
-            
-            try:
-                self.model = SentenceTransformer('BAAI/bge-large-en-v1.5')
-                logger.info("✅ BGE embedding model loaded (1024 dimensions)")
-            finally:
-                socket.setdefaulttimeout(original_timeout)
-                
-        except Exception as e:
-            logger.error(f"❌ Failed to load BGE model: {e}")
-            raise Exception(f"BGE model loading failed: {e}")
-        
-        # Use dedicated database file for topper comparisons to avoid locks
-        self.topper_db_path = "topper_readonly.db"
-        self.milvus_client = None
-        logger.info("✅ Topper comparison service initialized (will use dedicated read-only DB)")
-    
-    async def find_similar_topper_answers(self, question_text: str, student_answer: str, limit: int = 5) -> List[Dict[str, Any]]:
-        """Find similar topper answers using BGE embeddings"""
-        if not self.model:
-            logger.error("BGE model not initialized")
-            return []
-            
-        # Use dedicated read-only database to avoid lock conflicts
-        try:
-            import shutil
-            import os
-            
-            # Ensure we have a read-only copy for topper comparisons
-            original_db = "milvus_lite_local.db"
-            
-            if not os.path.exists(self.topper_db_path) or os.path.getmtime(original_db) > os.path.getmtime(self.topper_db_path):
-                # Update read-only copy if original is newer
-                if os.path.exists(original_db):
-                    shutil.copy2(original_db, self.topper_db_path)
-                    logger.info("✅ Updated read-only topper database")
-                else:
-                    logger.error("❌ Original database not found")
-                    return []
-            
-            # Connect to dedicated read-only database
-            milvus_client = MilvusClient(uri=self.topper_db_path)
-            logger.info("✅ Connected to dedicated topper database")
-                
-        except Exception as e:
-            logger.error(f"❌ Failed to access topper database: {e}")
-            return []
-        
-        try:
-            # Create combined query from question and answer for better matching
-            combined_query = f"Question: {question_text}\nAnswer: {student_answer}"
-            
-            # Generate embedding for the combined query
-            query_embedding = self.model.encode([combined_query], normalize_embeddings=True)
-            
-            # Search in Milvus for similar topper answers
-            results = milvus_client.search(
-                collection_name=self.collection_name,
-                data=[query_embedding[0].tolist()],
-                anns_field='embedding',
-                limit=limit,
-                output_fields=['question_text', 'answer_text', 'combined_content', 'pdf_filename', 'question_number', 'marks']
-            )
-            
-            similar_answers = []
-            if results and len(results[0]) > 0:
-                for hit in results[0]:
-                    entity = hit['entity']
-                    similarity_score = hit['distance']  # BGE uses distance, lower = more similar
-                    
-                    # Filter out Hindi content - check for Devanagari script
-                    question_text = entity.get('question_text', '')
-                    answer_text = entity.get('answer_text', '')
-                    
-                    # Check if text contains Hindi/Devanagari characters
-                    def contains_hindi(text):
-                        if not text:
-                            return False
-                        # Check for Devanagari Unicode range (U+0900-U+097F)
-                        # Also check for common Hindi words to be more accurate
-                        hindi_chars = sum(1 for char in text if '\u0900' <= char <= '\u097F')
-                        total_chars = len(text.replace(' ', '').replace('\n', ''))
-                        
-                        # If more than 10% of characters are Hindi, consider it Hindi content
-                        return total_chars > 0 and (hindi_chars / total_chars) > 0.1
-                    
-                    # Skip if question or answer contains Hindi
-                    if contains_hindi(question_text) or contains_hindi(answer_text):
-                        logger.debug(f"Skipping Hindi content from {entity.get('pdf_filename', 'unknown')}")
-                        continue
-                    
-                    similar_answers.append({
-                        'question_text': question_text,
-                        'answer_text': answer_text,
-                        'combined_content': entity.get('combined_content', ''),
-                        'pdf_filename': entity.get('pdf_filename', ''),
-                        'question_number': entity.get('question_number', 0),
-                        'marks': entity.get('marks', 10),
-                        'similarity_score': float(1 - similarity_score),  # Convert to similarity (higher = more similar)
-                        'topper_name': self._extract_topper_name(entity.get('pdf_filename', ''))
-                    })
-            
-            logger.info(f"Found {len(similar_answers)} similar English topper answers (filtered out Hindi content)")
-            
-            # If no English answers found, include Hindi content as fallback
-            if len(similar_answers) == 0:
-                logger.warning("No English topper answers found, including Hindi content as fallback...")
-                # Get results including Hindi content as fallback
-                for hit in results[0]:
-                    entity = hit['entity']
-                    similarity_score = hit['distance']
-                    
-                    similar_answers.append({
-                        'question_text': entity.get('question_text', ''),
-                        'answer_text': entity.get('answer_text', ''),
-                        'combined_content': entity.get('combined_content', ''),
-                        'pdf_filename': entity.get('pdf_filename', ''),
-                        'question_number': entity.get('question_number', 0),
-                        'marks': entity.get('marks', 10),
-                        'similarity_score': float(1 - similarity_score),
-                        'topper_name': self._extract_topper_name(entity.get('pdf_filename', ''))
-                    })
-                    
-                    # Limit to top 3 results as fallback
-                    if len(similar_answers) >= 3:
-                        break
-                
-                logger.info(f"Fallback: Using {len(similar_answers)} topper answers (including Hindi content)")
-            
-            return similar_answers
-            
-        except Exception as e:
-            logger.error(f"Error finding similar topper answers: {e}")
-            return []
-    
-    def _extract_topper_name(self, filename: str) -> str:
-        """Extract topper name from PDF filename"""
-        try:
-            # Extract name from filename like "VisionIAS Toppers Answer Booklet Aayushi Bansal (1).pdf"
-            if "Toppers Answer Booklet" in filename:
-                parts = filename.split("Toppers Answer Booklet")
-                if len(parts) > 1:
-                    name_part = parts[1].strip()
-                    # Remove file extension and parentheses
-                    name_part = name_part.replace('.pdf', '').replace('_FIXED_V2_extracted', '')
-                    # Extract name before parentheses
-                    if '(' in name_part:
-                        name_part = name_part.split('(')[0].strip()
-                    return name_part
-            return "Unknown Topper"
-        except Exception:
-            return "Unknown Topper"
-    
-    async def analyze_topper_comparison(self, question_text: str, student_answer: str, similar_toppers: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Analyze student answer against topper answers and provide detailed comparison"""
-        try:
-            if not similar_toppers:
-                return {
-                    'comparison_available': False,
-                    'message': 'No similar topper answers found for comparison'
-                }
-            
-            # Prepare detailed comparison data for LLM analysis
-            topper_examples = []
-            for i, topper in enumerate(similar_toppers[:3]):  # Use top 3 most similar
-                topper_examples.append({
-                    'topper_name': topper['topper_name'],
-                    'similarity_score': topper['similarity_score'],  # Keep as float for LLM processing
-                    'similarity_percentage': f"{topper['similarity_score']:.1%}",  # Formatted version
-                    'question_text': topper['question_text'],  # Full question for exact matching
-                    'complete_answer': topper['answer_text'],  # Full answer for detailed analysis
-                    'marks': topper['marks'],
-                    'word_count': len(topper['answer_text'].split()),
-                    'pdf_source': topper.get('pdf_filename', 'Unknown')
-                })
-            
-            # Create enhanced LLM prompt for specific, detailed comparison
-            comparison_prompt = f"""
+# Similar-topper search results shared across service instances (one is created per
+# request). Keyed by blake2b(question, answer, limit); entries expire after the TTL.
+SIMILAR_TOPPERS_CACHE_SIZE = 1024
+SIMILAR_TOPPERS_CACHE_TTL = 600  # seconds
+_similar_toppers_cache: "OrderedDict[bytes, Tuple[float, List[Dict[str, Any]]]]" = OrderedDict()
+_similar_toppers_key_locks: Dict[bytes, asyncio.Lock] = {}
+
+
+def _similar_toppers_key(question_text: str, student_answer: str, limit: int) -> bytes:
+    raw = f"{question_text}\x1f{student_answer}\x1f{limit}".encode("utf-8")
+    return hashlib.blake2b(raw, digest_size=16).digest()
+
+
+def _get_cached_similar_toppers(key: bytes) -> Optional[List[Dict[str, Any]]]:
+    entry = _similar_toppers_cache.get(key)
+    if entry is None:
+        return None
+    stored_at, answers = entry
+    if time.monotonic() - stored_at > SIMILAR_TOPPERS_CACHE_TTL:
+        del _similar_toppers_cache[key]
+        return None
+    _similar_toppers_cache.move_to_end(key)
+    # Callers annotate the returned dicts, so never hand out the cached objects
+    return copy.deepcopy(answers)
+
+
+def _store_similar_toppers(key: bytes, answers: List[Dict[str, Any]]):
+    _similar_toppers_cache[key] = (time.monotonic(), copy.deepcopy(answers))
+    _similar_toppers_cache.move_to_end(key)
+    while len(_similar_toppers_cache) > SIMILAR_TOPPERS_CACHE_SIZE:
+        _similar_toppers_cache.popitem(last=False)
+
+# Combined question/answer query embeddings, shared across service instances; the
+# similar-topper cache expires after its TTL but the embedding stays valid
+QUERY_EMBEDDING_CACHE_SIZE = 4096
+_query_embedding_cache: "OrderedDict[bytes, List[float]]" = OrderedDict()
+_query_embedding_lock = threading.Lock()
+
+# Embedding + Milvus search are blocking calls (torch and milvus-lite release the GIL),
+# so they run on a small thread pool to keep the event loop free for other evaluations
+SEARCH_WORKERS = int(os.getenv("TOPPER_SEARCH_WORKERS", "4"))
+_search_pool: Optional[ThreadPoolExecutor] = None
+_search_pool_lock = threading.Lock()
+_topper_db_lock = threading.Lock()  # serializes refreshes of the read-only DB copy
+
+
+def _get_search_pool() -> ThreadPoolExecutor:
+    global _search_pool
+    if _search_pool is None:
+        with _search_pool_lock:
+            if _search_pool is None:
+                _search_pool = ThreadPoolExecutor(max_workers=SEARCH_WORKERS, thread_name_prefix="topper-search")
+                logger.info("🔎 Topper search pool started with %d workers", SEARCH_WORKERS)
+    return _search_pool
+
+# Comparison LLM responses on disk, keyed by sha256(provider, model, prompt inputs), so replaying an
+# evaluation skips the LLM call; set TOPPER_COMPLETION_CACHE_DIR="" to disable
+COMPLETION_CACHE_DIR = os.getenv("TOPPER_COMPLETION_CACHE_DIR", "./.llm_cache/topper_comparison")
+COMPLETION_CACHE_TTL = int(os.getenv("TOPPER_COMPLETION_CACHE_TTL", str(24 * 3600)))  # seconds
+COMPLETION_CACHE_MAX_MB = int(os.getenv("TOPPER_COMPLETION_CACHE_MAX_MB", "128"))
+_completion_cache = DiskCache(COMPLETION_CACHE_DIR, COMPLETION_CACHE_TTL, COMPLETION_CACHE_MAX_MB * 2**20)
+
+# Word budgets for topper text sent to the comparison LLM (~1.3 tokens per English word).
+# UPSC answers run 150-250 words, so only runaway extractions are clipped.
+TOPPER_PROMPT_ANSWER_WORDS = int(os.getenv("TOPPER_PROMPT_ANSWER_WORDS", "400"))
+TOPPER_PROMPT_QUESTION_WORDS = int(os.getenv("TOPPER_PROMPT_QUESTION_WORDS", "80"))
+
+# A comparison whose best topper match falls below this skips the LLM (its feedback would be
+# made up) and the question is left out of the score totals
+TOPPER_MIN_SIMILARITY = float(os.getenv("TOPPER_MIN_SIMILARITY", "0.55"))
+
+
+def _clip_words(words: List[str], text: str, max_words: int) -> str:
+    """text limited to its first max_words words (text itself when it already fits)"""
+    if len(words) <= max_words:
+        return text
+    return " ".join(words[:max_words]) + " ..."
+
+# Enhanced LLM prompt for specific, detailed comparison; filled by _build_comparison_prompt
+COMPARISON_PROMPT_TEMPLATE = """
 You are an expert UPSC evaluator conducting a DETAILED SIDE-BY-SIDE comparison between student and topper answers. Provide SPECIFIC, ACTIONABLE insights.
 
 **QUESTION:**
@@ -222,7 +120,7 @@ You are an expert UPSC evaluator conducting a DETAILED SIDE-BY-SIDE comparison b
 {student_answer}
 
 **TOPPER ANSWERS FOR DETAILED COMPARISON:**
-{json.dumps(topper_examples, indent=2)}
+{topper_block}
 
 **CRITICAL REQUIREMENTS - PROVIDE HIGHLY SPECIFIC ANALYSIS:**
 
@@ -305,34 +203,441 @@ Provide response in JSON format with SPECIFIC, DETAILED content:
 }}
 }}
 """
+
+# Part of the completion cache key, derived from the template text so any edit to the
+# prompt invalidates cached comparisons without a hand-maintained version number
+COMPARISON_PROMPT_VERSION = hashlib.sha256(COMPARISON_PROMPT_TEMPLATE.encode("utf-8")).hexdigest()[:16]
+
+class TopperComparisonService:
+    """Service for comparing student answers with topper answers using BGE embeddings"""
+    
+    def __init__(self):
+        self.collection_name = "topper_embeddings"
+        self.model = None
+        self.milvus_client = None
+        self.llm_service = get_llm_service()
+        self.min_similarity = TOPPER_MIN_SIMILARITY
+        self.low_similarity_skips = 0  # comparisons answered without the LLM
+        self._to_similarity: Optional[Callable[[float], float]] = None
+        self._initialize_connections()
+    
+    def _initialize_connections(self):
+        """Initialize BGE embedding model and Milvus connection (1024-dim)"""
+        try:
+            # Use BGE model for high-quality embeddings
+            import socket
+            from app.services.embedder import get_embedder
             
-            # Get LLM analysis
-            response = await self.llm_service.simple_chat(comparison_prompt)
+            # Set socket timeout for model download
+            original_timeout = socket.getdefaulttimeout()
+            socket.setdefaulttimeout(30)  # 30 second timeout
             
-            # Parse JSON response
             try:
-                analysis = json.loads(response)
-            except json.JSONDecodeError:
-                # Fallback if JSON parsing fails
-                analysis = {
-                    'overall_comparison': response[:200] + "..." if len(response) > 200 else response,
-                    'content_gaps': ['Analysis available in overall comparison'],
-                    'structure_insights': 'Detailed analysis provided above',
-                    'depth_analysis': 'See overall comparison for details',
-                    'writing_style_tips': 'Review topper examples for style insights',
-                    'specific_improvements': ['Study the topper examples provided'],
-                    'student_strengths': ['Answer attempt shows effort'],
-                    'estimated_topper_score': 'Analysis in progress',
-                    'key_learning': 'Compare with topper approaches'
-                }
+                self.model = get_embedder()
+                logger.info("✅ BGE embedding model loaded (1024 dimensions)")
+            finally:
+                socket.setdefaulttimeout(original_timeout)
+                
+        except Exception as e:
+            logger.error(f"❌ Failed to load BGE model: {e}")
+            raise Exception(f"BGE model loading failed: {e}")
+        
+        # Use dedicated database file for topper comparisons to avoid locks
+        self.topper_db_path = "topper_readonly.db"
+        self.milvus_client = None
+        logger.info("✅ Topper comparison service initialized (will use dedicated read-only DB)")
+    
+    async def find_similar_topper_answers(self, question_text: str, student_answer: str, limit: int = 5) -> List[Dict[str, Any]]:
+        """Find similar topper answers using BGE embeddings (cached per question/answer)"""
+        key = _similar_toppers_key(question_text, student_answer, limit)
+        cached = _get_cached_similar_toppers(key)
+        if cached is not None:
+            logger.info("♻️ Using cached similar topper answers (%d results)", len(cached))
+            return cached
+        
+        # Coalesce concurrent misses for the same key into a single search
+        lock = _similar_toppers_key_locks.setdefault(key, asyncio.Lock())
+        try:
+            async with lock:
+                cached = _get_cached_similar_toppers(key)
+                if cached is not None:
+                    return cached
+                
+                similar_answers = await self._search_similar_topper_answers(question_text, student_answer, limit)
+                # Empty results usually mean a DB/model error; let the next call retry
+                if similar_answers:
+                    _store_similar_toppers(key, similar_answers)
+                return similar_answers
+        finally:
+            if not lock.locked():
+                _similar_toppers_key_locks.pop(key, None)
+    
+    def _get_topper_client(self) -> Optional[MilvusClient]:
+        """Refresh the read-only topper DB copy if needed and connect to it"""
+        # Use dedicated read-only database to avoid lock conflicts
+        try:
+            import shutil
+            from pymilvus import MilvusClient
+            
+            # Ensure we have a read-only copy for topper comparisons
+            original_db = "milvus_lite_local.db"
+            
+            with _topper_db_lock:
+                if not os.path.exists(self.topper_db_path) or os.path.getmtime(original_db) > os.path.getmtime(self.topper_db_path):
+                    # Update read-only copy if original is newer
+                    if os.path.exists(original_db):
+                        shutil.copy2(original_db, self.topper_db_path)
+                        logger.info("✅ Updated read-only topper database")
+                    else:
+                        logger.error("❌ Original database not found")
+                        return None
+            
+            # Connect to dedicated read-only database
+            milvus_client = MilvusClient(uri=self.topper_db_path)
+            logger.info("✅ Connected to dedicated topper database")
+            return milvus_client
+                
+        except Exception as e:
+            logger.error(f"❌ Failed to access topper database: {e}")
+            return None
+    
+    @staticmethod
+    def _combined_query(question_text: str, student_answer: str) -> str:
+        # Create combined query from question and answer for better matching
+        return f"Question: {question_text}\nAnswer: {student_answer}"
+    
+    @staticmethod
+    def _contains_hindi(text: str) -> bool:
+        """Check if text contains Hindi/Devanagari characters"""
+        if not text:
+            return False
+        # Check for Devanagari Unicode range (U+0900-U+097F)
+        # Also check for common Hindi words to be more accurate
+        hindi_chars = sum(1 for char in text if '\u0900' <= char <= '\u097F')
+        total_chars = len(text.replace(' ', '').replace('\n', ''))
+        
+        # If more than 10% of characters are Hindi, consider it Hindi content
+        return total_chars > 0 and (hindi_chars / total_chars) > 0.1
+    
+    def _similarity_fn(self, milvus_client: MilvusClient) -> Callable[[float], float]:
+        """Raw-score -> similarity for the topper collection's index metric (resolved once)"""
+        if self._to_similarity is None:
+            metric_type = "COSINE"
+            try:
+                for index_name in milvus_client.list_indexes(self.collection_name, field_name="embedding"):
+                    metric_type = milvus_client.describe_index(self.collection_name, index_name).get("metric_type", metric_type)
+                    break
+            except Exception as e:
+                logger.warning("Could not read topper index metric, assuming COSINE: %s", e)
+            self._to_similarity = score_converter(metric_type)
+        return self._to_similarity
+    
+    def _hit_to_similar_answer(self, hit: Dict[str, Any], to_similarity: Callable[[float], float]) -> Dict[str, Any]:
+        entity = hit['entity']
+        question_text = entity.get('question_text', '')
+        answer_text = entity.get('answer_text', '')
+        answer_words = answer_text.split()
+        # Prompt snippets are clipped here, once per search result, and travel with the
+        # cached result instead of being recomputed on every prompt build
+        return {
+            'question_text': question_text,
+            'answer_text': answer_text,
+            'question_snippet': _clip_words(question_text.split(), question_text, TOPPER_PROMPT_QUESTION_WORDS),
+            'answer_snippet': _clip_words(answer_words, answer_text, TOPPER_PROMPT_ANSWER_WORDS),
+            'answer_word_count': len(answer_words),
+            'combined_content': entity.get('combined_content', ''),
+            'pdf_filename': entity.get('pdf_filename', ''),
+            'question_number': entity.get('question_number', 0),
+            'marks': entity.get('marks', 10),
+            'similarity_score': float(to_similarity(hit['distance'])),  # Higher = more similar
+            'topper_name': self._extract_topper_name(entity.get('pdf_filename', ''))
+        }
+    
+    def _format_similar_hits(self, hits: List[Dict[str, Any]],
+                             to_similarity: Callable[[float], float]) -> List[Dict[str, Any]]:
+        """English-only similar answers from one query's hits, falling back to the top 3 of any language"""
+        all_answers = [self._hit_to_similar_answer(hit, to_similarity) for hit in hits]
+        
+        similar_answers = []
+        for similar_answer in all_answers:
+            # Skip if question or answer contains Hindi
+            if self._contains_hindi(similar_answer['question_text']) or self._contains_hindi(similar_answer['answer_text']):
+                logger.debug("Skipping Hindi content from %s", similar_answer['pdf_filename'] or 'unknown')
+                continue
+            
+            similar_answers.append(similar_answer)
+        
+        logger.info("Found %d similar English topper answers (filtered out Hindi content)", len(similar_answers))
+        
+        # If no English answers found, include Hindi content as fallback
+        if len(similar_answers) == 0 and all_answers:
+            logger.warning("No English topper answers found, including Hindi content as fallback...")
+            # Limit to top 3 results as fallback
+            similar_answers = all_answers[:3]
+            logger.info("Fallback: Using %d topper answers (including Hindi content)", len(similar_answers))
+        
+        return similar_answers
+    
+    def _embed_combined_queries(self, queries: List[str]) -> List[List[float]]:
+        """Embed queries, reusing cached vectors and encoding all misses in one forward pass"""
+        keys = [hashlib.blake2b(query.encode("utf-8"), digest_size=16).digest() for query in queries]
+        embeddings: List[Optional[List[float]]] = []
+        with _query_embedding_lock:
+            for key in keys:
+                embedding = _query_embedding_cache.get(key)
+                if embedding is not None:
+                    _query_embedding_cache.move_to_end(key)
+                embeddings.append(embedding)
+        
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        if missing:
+            # Generate embeddings for all uncached combined queries at once
+            encoded = self.model.encode(
+                [queries[i] for i in missing],
+                normalize_embeddings=True,
+                batch_size=32
+            )
+            with _query_embedding_lock:
+                for i, embedding in zip(missing, encoded):
+                    embeddings[i] = embedding.tolist()
+                    _query_embedding_cache[keys[i]] = embeddings[i]
+                while len(_query_embedding_cache) > QUERY_EMBEDDING_CACHE_SIZE:
+                    _query_embedding_cache.popitem(last=False)
+        
+        return embeddings
+    
+    async def _search_similar_topper_answers(self, question_text: str, student_answer: str, limit: int = 5) -> List[Dict[str, Any]]:
+        """Embed the question/answer pair and search Milvus for similar topper answers"""
+        results = await self._search_similar_topper_answers_batch([(question_text, student_answer)], limit)
+        return results[0]
+    
+    async def _search_similar_topper_answers_batch(self, pairs: List[Tuple[str, str]], limit: int = 5) -> List[List[Dict[str, Any]]]:
+        """Embed all (question, answer) pairs in one forward pass and run one multi-vector search
+        
+        The blocking work runs on the search thread pool, not the event loop.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            _get_search_pool(), self._search_similar_topper_answers_batch_sync, pairs, limit
+        )
+    
+    def _search_similar_topper_answers_batch_sync(self, pairs: List[Tuple[str, str]], limit: int = 5) -> List[List[Dict[str, Any]]]:
+        """Synchronous body of _search_similar_topper_answers_batch (runs in a worker thread)"""
+        if not self.model:
+            logger.error("BGE model not initialized")
+            return [[] for _ in pairs]
+        
+        milvus_client = self._get_topper_client()
+        if milvus_client is None:
+            return [[] for _ in pairs]
+        
+        try:
+            to_similarity = self._similarity_fn(milvus_client)
+            query_embeddings = self._embed_combined_queries([self._combined_query(q, a) for q, a in pairs])
             
-            # Add metadata
-            analysis['comparison_available'] = True
-            analysis['toppers_analyzed'] = len(topper_examples)
-            analysis['highest_similarity'] = max([t['similarity_score'] for t in topper_examples])
-            analysis['topper_names'] = [t['topper_name'] for t in topper_examples]
+            # Search in Milvus for similar topper answers; one result list per query
+            results = milvus_client.search(
+                collection_name=self.collection_name,
+                data=query_embeddings,
+                anns_field='embedding',
+                limit=limit,
+                output_fields=['question_text', 'answer_text', 'combined_content', 'pdf_filename', 'question_number', 'marks']
+            )
             
-            return analysis
+            return [self._format_similar_hits(list(hits), to_similarity) for hits in results]
+            
+        except Exception as e:
+            logger.error(f"Error finding similar topper answers: {e}")
+            return [[] for _ in pairs]
+    
+    async def find_similar_topper_answers_batch(self, pairs: List[Tuple[str, str]], limit: int = 5) -> List[List[Dict[str, Any]]]:
+        """find_similar_topper_answers for many (question, answer) pairs
+        
+        Cached pairs are served from the shared cache; all misses are embedded together
+        and searched with a single Milvus request. Results keep the input order.
+        """
+        results: List[Optional[List[Dict[str, Any]]]] = [None] * len(pairs)
+        keys = [_similar_toppers_key(q, a, limit) for q, a in pairs]
+        misses: Dict[bytes, List[int]] = {}  # duplicate pairs share one search
+        for i, key in enumerate(keys):
+            cached = _get_cached_similar_toppers(key)
+            if cached is not None:
+                results[i] = cached
+            else:
+                misses.setdefault(key, []).append(i)
+        
+        if misses:
+            miss_indexes = [indexes[0] for indexes in misses.values()]
+            searched = await self._search_similar_topper_answers_batch([pairs[i] for i in miss_indexes], limit)
+            for (key, indexes), similar_answers in zip(misses.items(), searched):
+                # Empty results usually mean a DB/model error; let the next call retry
+                if similar_answers:
+                    _store_similar_toppers(key, similar_answers)
+                for i in indexes:
+                    results[i] = copy.deepcopy(similar_answers)
+        
+        logger.info("🔎 Batch topper search: %d queries, %d searched", len(pairs), len(misses))
+        return results
+    
+    def _completion_cache_path(self, question_text: str, student_answer: str,
+                               topper_examples: List[Dict[str, Any]]) -> Optional[Path]:
+        """Cache file for a comparison, keyed by the prompt's inputs rather than the prompt
+        
+        Hashing the inputs lets a hit skip building the (large) prompt altogether; the
+        template itself is covered by COMPARISON_PROMPT_VERSION, its content hash.
+        """
+        provider = getattr(self.llm_service, 'provider', None)
+        # Every example field is rendered into the prompt, so all of them are part of the key
+        return _completion_cache.path_for(
+            getattr(self.llm_service, 'provider_name', ''), getattr(provider, 'model', ''),
+            COMPARISON_PROMPT_VERSION, question_text, student_answer,
+            orjson.dumps(topper_examples, option=orjson.OPT_SORT_KEYS)
+        )
+    
+    def _load_cached_completion(self, path: Optional[Path]) -> Optional[str]:
+        """Return a cached LLM response if present and younger than the TTL"""
+        data = _completion_cache.read(path)
+        if data is None:
+            return None
+        try:
+            return orjson.loads(data)['response']
+        except (ValueError, KeyError):
+            return None
+    
+    def _store_cached_completion(self, path: Optional[Path], response: str):
+        """Persist an LLM response; cache write failures never fail the evaluation"""
+        _completion_cache.write(path, orjson.dumps({'response': response, 'cached_at': datetime.now().isoformat()}))
+    
+    def _store_if_parseable(self, path: Optional[Path], response: str):
+        """Cache only parseable responses; a malformed one should be regenerated next time"""
+        try:
+            orjson.loads(response)
+        except (TypeError, ValueError):
+            return
+        self._store_cached_completion(path, response)
+    
+    def _extract_topper_name(self, filename: str) -> str:
+        """Extract topper name from PDF filename"""
+        try:
+            # Extract name from filename like "VisionIAS Toppers Answer Booklet Aayushi Bansal (1).pdf"
+            if "Toppers Answer Booklet" in filename:
+                parts = filename.split("Toppers Answer Booklet")
+                if len(parts) > 1:
+                    name_part = parts[1].strip()
+                    # Remove file extension and parentheses
+                    name_part = name_part.replace('.pdf', '').replace('_FIXED_V2_extracted', '')
+                    # Extract name before parentheses
+                    if '(' in name_part:
+                        name_part = name_part.split('(')[0].strip()
+                    return name_part
+            return "Unknown Topper"
+        except Exception:
+            return "Unknown Topper"
+    
+    @staticmethod
+    def _build_topper_examples(similar_toppers: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Top 3 similar toppers in the shape the comparison prompt expects
+        
+        Values are read straight from the search results (snippets and word counts are
+        precomputed per hit), so each example is a single dict of shared references.
+        """
+        return [
+            {
+                'topper_name': topper.get('topper_name', 'Unknown Topper'),
+                'similarity_score': topper['similarity_score'],  # Keep as float for LLM processing
+                'similarity_percentage': f"{topper['similarity_score']:.1%}",  # Formatted version
+                'question_text': topper.get('question_snippet', ''),  # Question for exact matching
+                'complete_answer': topper.get('answer_snippet', ''),  # Answer (word-budgeted) for detailed analysis
+                'marks': topper.get('marks', 10),
+                'word_count': topper.get('answer_word_count', 0),
+                'pdf_source': topper.get('pdf_filename', 'Unknown')
+            }
+            for topper in similar_toppers[:3]  # Use top 3 most similar
+        ]
+    
+    @staticmethod
+    def _build_comparison_prompt(question_text: str, student_answer: str, topper_examples: List[Dict[str, Any]]) -> str:
+        """Build the side-by-side comparison prompt"""
+        return COMPARISON_PROMPT_TEMPLATE.format_map({
+            'question_text': question_text,
+            'student_answer': student_answer,
+            'topper_block': orjson.dumps(topper_examples, option=orjson.OPT_INDENT_2).decode()
+        })
+    
+    @staticmethod
+    def _parse_comparison_response(response: str, topper_examples: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Parse the LLM's JSON analysis (with a text fallback) and attach comparison metadata"""
+        # Parse JSON response
+        try:
+            analysis = orjson.loads(response)
+        except orjson.JSONDecodeError:
+            # Fallback if JSON parsing fails
+            analysis = {
+                'overall_comparison': response[:200] + "..." if len(response) > 200 else response,
+                'content_gaps': ['Analysis available in overall comparison'],
+                'structure_insights': 'Detailed analysis provided above',
+                'depth_analysis': 'See overall comparison for details',
+                'writing_style_tips': 'Review topper examples for style insights',
+                'specific_improvements': ['Study the topper examples provided'],
+                'student_strengths': ['Answer attempt shows effort'],
+                'estimated_topper_score': 'Analysis in progress',
+                'key_learning': 'Compare with topper approaches'
+            }
+        
+        # Add metadata
+        analysis['comparison_available'] = True
+        analysis['toppers_analyzed'] = len(topper_examples)
+        analysis['highest_similarity'] = max(t['similarity_score'] for t in topper_examples)
+        analysis['topper_names'] = [t['topper_name'] for t in topper_examples]
+        
+        return analysis
+    
+    def _skip_comparison(self, similar_toppers: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Analysis to return without calling the LLM, or None when a close enough topper exists"""
+        if not similar_toppers:
+            return {
+                'comparison_available': False,
+                'message': 'No similar topper answers found for comparison'
+            }
+        best = max((t.get('similarity_score', 0.0) for t in similar_toppers), default=0.0)
+        if best < self.min_similarity:
+            self.low_similarity_skips += 1
+            logger.info("⏭️ Skipping topper comparison: best similarity %.2f < %.2f (%d skipped)",
+                        best, self.min_similarity, self.low_similarity_skips)
+            return {
+                'comparison_available': False,
+                'low_similarity': True,
+                'highest_similarity': best,
+                'message': 'No sufficiently similar topper answers found for comparison'
+            }
+        return None
+    
+    async def analyze_topper_comparison(self, question_text: str, student_answer: str, similar_toppers: List[Dict[str, Any]],
+                                        use_cache: bool = True) -> Dict[str, Any]:
+        """Analyze student answer against topper answers and provide detailed comparison
+        
+        Identical prompts reuse the cached LLM response unless use_cache is False.
+        """
+        try:
+            skipped = self._skip_comparison(similar_toppers)
+            if skipped is not None:
+                return skipped
+            
+            topper_examples = self._build_topper_examples(similar_toppers)
+            
+            # Check the completion cache before building the prompt
+            cache_path = self._completion_cache_path(question_text, student_answer, topper_examples) if use_cache else None
+            response = self._load_cached_completion(cache_path)
+            if response is not None:
+                logger.info("♻️ Using cached topper comparison response")
+            else:
+                comparison_prompt = self._build_comparison_prompt(question_text, student_answer, topper_examples)
+                
+                # Get LLM analysis
+                response = await self.llm_service.simple_chat(comparison_prompt)
+                self._store_if_parseable(cache_path, response)
+            
+            return self._parse_comparison_response(response, topper_examples)
             
         except Exception as e:
             logger.error(f"Error in topper comparison analysis: {e}")
@@ -342,195 +647,357 @@ Provide response in JSON format with SPECIFIC, DETAILED content:
                 'message': 'Failed to analyze topper comparison'
             }
     
-    async def generate_topper_based_evaluation(self, question_text: str, student_answer: str, marks: int = 10) -> Dict[str, Any]:
+    async def analyze_topper_comparisons_batch(
+        self,
+        items: List[Tuple[str, str, List[Dict[str, Any]]]],
+        use_cache: bool = True,
+        max_concurrency: int = 8,
+        on_item_done: Optional[Callable[[int], Awaitable[None]]] = None
+    ) -> List[Dict[str, Any]]:
+        """analyze_topper_comparison for many (question, answer, similar_toppers) items
+        
+        Cache hits are resolved first; all misses go to the LLM together, at most
+        max_concurrency at a time. on_item_done(index) is awaited once per item as soon
+        as its analysis is settled. Results keep the input order.
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(items)
+        pending = []  # (index, topper_examples, prompt, cache_path)
+        
+        for i, (question_text, student_answer, similar_toppers) in enumerate(items):
+            skipped = self._skip_comparison(similar_toppers)
+            if skipped is not None:
+                results[i] = skipped
+                continue
+            topper_examples = self._build_topper_examples(similar_toppers)
+            cache_path = self._completion_cache_path(question_text, student_answer, topper_examples) if use_cache else None
+            cached = self._load_cached_completion(cache_path)
+            if cached is not None:
+                results[i] = self._parse_comparison_response(cached, topper_examples)
+            else:
+                # Prompts are only built for cache misses
+                prompt = self._build_comparison_prompt(question_text, student_answer, topper_examples)
+                pending.append((i, topper_examples, prompt, cache_path))
+        
+        if on_item_done:
+            for i, result in enumerate(results):
+                if result is not None:
+                    await on_item_done(i)
+        
+        async def pending_done(j: int):
+            await on_item_done(pending[j][0])
+        
+        if pending:
+            logger.info("🚀 Sending %d topper comparisons to the LLM (%d served from cache)",
+                        len(pending), len(items) - len(pending))
+            responses = await self.llm_service.generate_completions_batch(
+                [prompt for _, _, prompt, _ in pending], max_concurrency=max_concurrency,
+                return_exceptions=True, on_complete=pending_done if on_item_done else None
+            )
+            for (i, topper_examples, _, cache_path), response in zip(pending, responses):
+                if isinstance(response, BaseException):
+                    logger.error(f"Error in topper comparison analysis: {response}")
+                    results[i] = {
+                        'comparison_available': False,
+                        'error': str(response),
+                        'message': 'Failed to analyze topper comparison'
+                    }
+                    continue
+                self._store_if_parseable(cache_path, response)
+                results[i] = self._parse_comparison_response(response, topper_examples)
+        
+        return results
+    
+    async def generate_topper_based_evaluation(self, question_text: str, student_answer: str, marks: int = 10,
+                                               use_cache: bool = True) -> Dict[str, Any]:
         """Generate complete evaluation based on topper comparison"""
         try:
             # Find similar topper answers
             similar_toppers = await self.find_similar_topper_answers(question_text, student_answer, limit=5)
             
             if not similar_toppers:
-                return {
-                    'evaluation_type': 'topper_comparison',
-                    'comparison_available': False,
-                    'score': 0.0,
-                    'max_score': marks,  # Keep as integer for proper display
-                    'feedback': 'No similar topper answers found for comparison. This question may be unique or require different evaluation approach.',
-                    'topper_insights': None
-                }
+                return self._no_toppers_evaluation(marks)
             
             # Analyze comparison
-            comparison_analysis = await self.analyze_topper_comparison(question_text, student_answer, similar_toppers)
-            
-            # Extract score from analysis - check multiple possible fields
-            estimated_score = 0.0
-            try:
-                # Try score_breakdown first (new format)
-                score_breakdown = comparison_analysis.get('score_breakdown', {})
-                if score_breakdown and 'current_estimated' in score_breakdown:
-                    score_text = score_breakdown['current_estimated']
-                    if '/' in score_text:
-                        score_part = score_text.split('/')[0].strip()
-                        estimated_score = float(score_part)
-                    else:
-                        # Try to extract number from text
-                        import re
-                        numbers = re.findall(r'\d+\.?\d*', score_text)
-                        if numbers:
-                            estimated_score = float(numbers[0])
-                
-                # Fallback to old format
-                if estimated_score == 0.0:
-                    score_text = comparison_analysis.get('estimated_topper_score', '0/10')
-                    if '/' in score_text:
-                        score_part = score_text.split('/')[0].strip()
-                        estimated_score = float(score_part)
-                    else:
-                        # Try to extract number from text
-                        import re
-                        numbers = re.findall(r'\d+\.?\d*', score_text)
-                        if numbers:
-                            estimated_score = float(numbers[0])
-                
-                # If still 0, provide a reasonable default based on similarity
-                if estimated_score == 0.0 and similar_toppers:
-                    avg_similarity = sum(t['similarity_score'] for t in similar_toppers[:3]) / len(similar_toppers[:3])
-                    # Convert similarity to score (similarity ranges 0-1, multiply by marks)
-                    # Ensure score doesn't exceed the marks allocation
-                    estimated_score = min(marks, max(1.0, avg_similarity * marks * 0.8))  # At least 1 point for attempt, max = marks
-                    
-            except (ValueError, IndexError, TypeError):
-                # Default scoring based on answer length and similarity
-                if similar_toppers and student_answer.strip():
-                    avg_similarity = sum(t['similarity_score'] for t in similar_toppers[:3]) / len(similar_toppers[:3])
-                    word_count = len(student_answer.split())
-                    # Base score on similarity and effort (word count)
-                    base_score = avg_similarity * marks * 0.7
-                    effort_bonus = min(2.0, word_count / 50)  # Up to 2 points for effort
-                    estimated_score = min(marks, max(1.0, base_score + effort_bonus))  # Cap at marks allocation
-                else:
-                    estimated_score = 1.0  # Minimum score for attempt
-            
-            # Generate detailed, specific feedback
-            topper_matches = comparison_analysis.get('topper_matches', [])
-            missing_keywords = comparison_analysis.get('missing_keywords', [])
-            structural_blueprint = comparison_analysis.get('structural_blueprint', {})
-            missing_content = comparison_analysis.get('missing_content', {})
-            writing_techniques = comparison_analysis.get('writing_techniques', {})
+            comparison_analysis = await self.analyze_topper_comparison(
+                question_text, student_answer, similar_toppers, use_cache=use_cache
+            )
+            if comparison_analysis.get('low_similarity'):
+                return self._unscored_evaluation(comparison_analysis)
             
-            feedback_parts = [
-                f"🎯 **How Your Answer Compares to UPSC Toppers**",
-                "",
-                "📚 **Topper Answers We Analyzed:**"
-            ]
+            return self._build_topper_evaluation(student_answer, marks, similar_toppers, comparison_analysis)
             
-            # Show actual topper questions being compared
-            if topper_matches:
-                for match in topper_matches:
-                    similarity = match.get('question_similarity', '0%')
-                    if similarity == '0%' or similarity == 'N/A':
-                        similarity_note = "⚠️ Different question - analysis focuses on writing techniques"
-                    else:
-                        similarity_note = f"✅ {similarity} question similarity"
-                    
-                    feedback_parts.extend([
-                        f"• **{match.get('topper_name', 'Unknown')}** ({match.get('marks', 'Unknown')} marks) - {similarity_note}",
-                        f"  **Topper's Question**: {match.get('exact_question', 'Not specified')}",
-                        ""
-                    ])
+        except Exception as e:
+            return self._failed_evaluation(marks, e)
+    
+    async def generate_topper_based_evaluations(
+        self,
+        items: List[Tuple[str, str, int]],
+        use_cache: bool = True,
+        max_concurrency: int = 8,
+        on_item_done: Optional[Callable[[int], Awaitable[None]]] = None
+    ) -> List[Dict[str, Any]]:
+        """generate_topper_based_evaluation for many (question, answer, marks) items
+        
+        All searches share one embedding pass and Milvus request, and every LLM
+        comparison is submitted in one batch (at most max_concurrency in flight).
+        on_item_done(index) is awaited as each item's comparison finishes.
+        Results keep the input order; a failed item gets the same error shape as the
+        single-item method.
+        """
+        searches = await self.find_similar_topper_answers_batch([(q, a) for q, a, _ in items], limit=5)
+        
+        results: List[Optional[Dict[str, Any]]] = [None] * len(items)
+        to_analyze = []  # indexes with topper matches
+        for i, ((_, _, marks), similar_toppers) in enumerate(zip(items, searches)):
+            if not similar_toppers:
+                results[i] = self._no_toppers_evaluation(marks)
             else:
-                # If no matches from LLM analysis, show the actual toppers we found
-                for i, topper in enumerate(similar_toppers[:3]):
-                    similarity_pct = f"{topper['similarity_score']:.1%}"
-                    feedback_parts.extend([
-                        f"• **{topper['topper_name']}** ({topper['marks']} marks) - ✅ {similarity_pct} similarity",
-                        f"  **Topper's Question**: {topper['question_text']}",
-                        ""
-                    ])
-            
-            feedback_parts.extend([
-                "💡 **What You Can Add to Improve:**",
-                f"Key terms to include: {', '.join(missing_keywords[:8])}",
-                f"Technical concepts: {', '.join(comparison_analysis.get('technical_terms_missed', [])[:6])}",
-                "",
-                "📝 **How to Structure Better:**",
-                f"✅ **What toppers do**: {structural_blueprint.get('topper_structure', 'Follow a clear introduction-body-conclusion format')}",
-                f"📋 **Your current approach**: {structural_blueprint.get('student_structure', 'Could be more structured')}",
-                f"🎯 **Try this instead**: {structural_blueprint.get('recommended_structure', 'Start with context, add examples, conclude with implications')}",
-                "",
-                "📚 **Content You're Missing:**"
-            ])
-            
-            if missing_content.get('facts_statistics'):
-                feedback_parts.append(f"📊 **Add these facts**: {', '.join(missing_content['facts_statistics'][:3])}")
-            if missing_content.get('examples_case_studies'):
-                feedback_parts.append(f"🔍 **Include examples like**: {', '.join(missing_content['examples_case_studies'][:3])}")
-            if missing_content.get('constitutional_references'):
-                feedback_parts.append(f"⚖️ **Reference these provisions**: {', '.join(missing_content['constitutional_references'][:3])}")
-            
-            feedback_parts.extend([
-                "",
-                "✨ **Writing Tips from Toppers:**",
-                f"🚀 **Start sentences with**: {', '.join(writing_techniques.get('sentence_starters', [])[:4])}",
-                f"🎯 **Structure arguments using**: {', '.join(writing_techniques.get('argument_frameworks', [])[:3])}",
-                "",
-                "🔥 **Quick Wins - Do This Next Time:**"
-            ])
-            
-            for improvement in comparison_analysis.get('specific_improvements', [])[:5]:
-                feedback_parts.append(f"• {improvement}")
-            
+                to_analyze.append(i)
+        
+        if on_item_done:
+            for i, result in enumerate(results):
+                if result is not None:
+                    await on_item_done(i)
+        
+        async def analyzed_done(j: int):
+            await on_item_done(to_analyze[j])
+        
+        analyses = await self.analyze_topper_comparisons_batch(
+            [(items[i][0], items[i][1], searches[i]) for i in to_analyze], use_cache=use_cache,
+            max_concurrency=max_concurrency, on_item_done=analyzed_done if on_item_done else None
+        )
+        for i, comparison_analysis in zip(to_analyze, analyses):
+            _, student_answer, marks = items[i]
+            if comparison_analysis.get('low_similarity'):
+                results[i] = self._unscored_evaluation(comparison_analysis)
+                continue
+            try:
+                results[i] = self._build_topper_evaluation(student_answer, marks, searches[i], comparison_analysis)
+            except Exception as e:
+                results[i] = self._failed_evaluation(marks, e)
+        
+        return results
+    
+    @staticmethod
+    def _no_toppers_evaluation(marks: int) -> Dict[str, Any]:
+        return {
+            'evaluation_type': 'topper_comparison',
+            'comparison_available': False,
+            'score': 0.0,
+            'max_score': marks,  # Keep as integer for proper display
+            'feedback': 'No similar topper answers found for comparison. This question may be unique or require different evaluation approach.',
+            'topper_insights': None
+        }
+    
+    @staticmethod
+    def _unscored_evaluation(comparison_analysis: Dict[str, Any]) -> Dict[str, Any]:
+        """Evaluation for a question whose closest topper answer is too far off to grade against
+        
+        max_score is 0 so the question stays out of the answer's totals instead of counting as 0/marks.
+        """
+        return {
+            'evaluation_type': 'topper_comparison',
+            'comparison_available': False,
+            'scored': False,
+            'score': 0.0,
+            'max_score': 0,
+            'feedback': 'No sufficiently similar topper answers found for comparison, so this question was not scored against toppers.',
+            'topper_insights': comparison_analysis
+        }
+    
+    @staticmethod
+    def _failed_evaluation(marks: int, error: BaseException) -> Dict[str, Any]:
+        logger.error(f"Error generating topper-based evaluation: {error}")
+        return {
+            'evaluation_type': 'topper_comparison',
+            'comparison_available': False,
+            'score': 0.0,
+            'max_score': marks,  # Keep as integer for proper display
+            'feedback': f'Error in topper comparison: {str(error)}',
+            'topper_insights': None,
+            'error': str(error)
+        }
+    
+    def _build_topper_evaluation(self, student_answer: str, marks: int, similar_toppers: List[Dict[str, Any]],
+                                 comparison_analysis: Dict[str, Any]) -> Dict[str, Any]:
+        """Score and render feedback for one question from its topper comparison"""
+        # Extract score from analysis - check multiple possible fields
+        estimated_score = 0.0
+        try:
+            # Try score_breakdown first (new format)
             score_breakdown = comparison_analysis.get('score_breakdown', {})
-            
+            if score_breakdown and 'current_estimated' in score_breakdown:
+                score_text = score_breakdown['current_estimated']
+                if '/' in score_text:
+                    score_part = score_text.split('/')[0].strip()
+                    estimated_score = float(score_part)
+                else:
+                    # Try to extract number from text
+                    import re
+                    numbers = re.findall(r'\d+\.?\d*', score_text)
+                    if numbers:
+                        estimated_score = float(numbers[0])
+            
+            # Fallback to old format
+            if estimated_score == 0.0:
+                score_text = comparison_analysis.get('estimated_topper_score', '0/10')
+                if '/' in score_text:
+                    score_part = score_text.split('/')[0].strip()
+                    estimated_score = float(score_part)
+                else:
+                    # Try to extract number from text
+                    import re
+                    numbers = re.findall(r'\d+\.?\d*', score_text)
+                    if numbers:
+                        estimated_score = float(numbers[0])
+            
+            # If still 0, provide a reasonable default based on similarity
+            if estimated_score == 0.0 and similar_toppers:
+                avg_similarity = sum(t['similarity_score'] for t in similar_toppers[:3]) / len(similar_toppers[:3])
+                # Convert similarity to score (similarity ranges 0-1, multiply by marks)
+                # Ensure score doesn't exceed the marks allocation
+                estimated_score = min(marks, max(1.0, avg_similarity * marks * 0.8))  # At least 1 point for attempt, max = marks
+                
+        except (ValueError, IndexError, TypeError):
+            # Default scoring based on answer length and similarity
+            if similar_toppers and student_answer.strip():
+                avg_similarity = sum(t['similarity_score'] for t in similar_toppers[:3]) / len(similar_toppers[:3])
+                word_count = len(student_answer.split())
+                # Base score on similarity and effort (word count)
+                base_score = avg_similarity * marks * 0.7
+                effort_bonus = min(2.0, word_count / 50)  # Up to 2 points for effort
+                estimated_score = min(marks, max(1.0, base_score + effort_bonus))  # Cap at marks allocation
+            else:
+                estimated_score = 1.0  # Minimum score for attempt
+        
+        # Generate detailed, specific feedback
+        topper_matches = comparison_analysis.get('topper_matches', [])
+        missing_keywords = comparison_analysis.get('missing_keywords', [])
+        structural_blueprint = comparison_analysis.get('structural_blueprint', {})
+        missing_content = comparison_analysis.get('missing_content', {})
+        writing_techniques = comparison_analysis.get('writing_techniques', {})
+        
+        feedback_parts = [
+            f"🎯 **How Your Answer Compares to UPSC Toppers**",
+            "",
+            "📚 **Topper Answers We Analyzed:**"
+        ]
+        
+        # Show actual topper questions being compared
+        if topper_matches:
+            for match in topper_matches:
+                similarity = match.get('question_similarity', '0%')
+                if similarity == '0%' or similarity == 'N/A':
+                    similarity_note = "⚠️ Different question - analysis focuses on writing techniques"
+                else:
+                    similarity_note = f"✅ {similarity} question similarity"
+                
+                feedback_parts.extend([
+                    f"• **{match.get('topper_name', 'Unknown')}** ({match.get('marks', 'Unknown')} marks) - {similarity_note}",
+                    f"  **Topper's Question**: {match.get('exact_question', 'Not specified')}",
+                    ""
+                ])
+        else:
+            # If no matches from LLM analysis, show the actual toppers we found
+            for i, topper in enumerate(similar_toppers[:3]):
+                similarity_pct = f"{topper['similarity_score']:.1%}"
+                feedback_parts.extend([
+                    f"• **{topper['topper_name']}** ({topper['marks']} marks) - ✅ {similarity_pct} similarity",
+                    f"  **Topper's Question**: {topper['question_text']}",
+                    ""
+                ])
+        
+        feedback_parts.extend([
+            "💡 **What You Can Add to Improve:**",
+            f"Key terms to include: {', '.join(missing_keywords[:8])}",
+            f"Technical concepts: {', '.join(comparison_analysis.get('technical_terms_missed', [])[:6])}",
+            "",
+            "📝 **How to Structure Better:**",
+            f"✅ **What toppers do**: {structural_blueprint.get('topper_structure', 'Follow a clear introduction-body-conclusion format')}",
+            f"📋 **Your current approach**: {structural_blueprint.get('student_structure', 'Could be more structured')}",
+            f"🎯 **Try this instead**: {structural_blueprint.get('recommended_structure', 'Start with context, add examples, conclude with implications')}",
+            "",
+            "📚 **Content You're Missing:**"
+        ])
+        
+        if missing_content.get('facts_statistics'):
+            feedback_parts.append(f"📊 **Add these facts**: {', '.join(missing_content['facts_statistics'][:3])}")
+        if missing_content.get('examples_case_studies'):
+            feedback_parts.append(f"🔍 **Include examples like**: {', '.join(missing_content['examples_case_studies'][:3])}")
+        if missing_content.get('constitutional_references'):
+            feedback_parts.append(f"⚖️ **Reference these provisions**: {', '.join(missing_content['constitutional_references'][:3])}")
+        
+        feedback_parts.extend([
+            "",
+            "✨ **Writing Tips from Toppers:**",
+            f"🚀 **Start sentences with**: {', '.join(writing_techniques.get('sentence_starters', [])[:4])}",
+            f"🎯 **Structure arguments using**: {', '.join(writing_techniques.get('argument_frameworks', [])[:3])}",
+            "",
+            "🔥 **Quick Wins - Do This Next Time:**"
+        ])
+        
+        for improvement in comparison_analysis.get('specific_improvements', [])[:5]:
+            feedback_parts.append(f"• {improvement}")
+        
+        score_breakdown = comparison_analysis.get('score_breakdown', {})
+        
+        feedback_parts.extend([
+            "",
+            "📈 **Your Score Potential:**",
+            f"🎯 **Current level**: {score_breakdown.get('current_estimated', 'Good effort!')}",
+            f"⭐ **With these improvements**: {score_breakdown.get('with_improvements', 'Much higher!')}",
+            f"💭 **Why**: {score_breakdown.get('reasoning', 'Focus on structure and key concepts')}",
+            "",
+            "🌟 **What Makes Toppers Special:**"
+        ])
+        
+        for insight in comparison_analysis.get('unique_topper_insights', [])[:3]:
+            feedback_parts.append(f"• {insight}")
+        
+        # Only add comparison section if we have actual topper matches
+        if topper_matches and any(m.get('topper_name', 'Unknown') != 'Unknown' for m in topper_matches):
             feedback_parts.extend([
                 "",
-                "📈 **Your Score Potential:**",
-                f"🎯 **Current level**: {score_breakdown.get('current_estimated', 'Good effort!')}",
-                f"⭐ **With these improvements**: {score_breakdown.get('with_improvements', 'Much higher!')}",
-                f"💭 **Why**: {score_breakdown.get('reasoning', 'Focus on structure and key concepts')}",
-                "",
-                "🌟 **What Makes Toppers Special:**"
+                f"📚 **Compared with**: {', '.join([m.get('topper_name', 'Unknown') for m in topper_matches if m.get('topper_name', 'Unknown') != 'Unknown'])}"
             ])
-            
-            for insight in comparison_analysis.get('unique_topper_insights', [])[:3]:
-                feedback_parts.append(f"• {insight}")
-            
-            # Only add comparison section if we have actual topper matches
-            if topper_matches and any(m.get('topper_name', 'Unknown') != 'Unknown' for m in topper_matches):
-                feedback_parts.extend([
-                    "",
-                    f"📚 **Compared with**: {', '.join([m.get('topper_name', 'Unknown') for m in topper_matches if m.get('topper_name', 'Unknown') != 'Unknown'])}"
-                ])
-            
-            # Generate varied dimensional scores based on analysis and marks allocation
-            # For dimensional scores, use proportional scoring out of 10 regardless of question marks
-            max_dimensional_score = 10.0
-            score_ratio = estimated_score / marks if marks > 0 else 0
-            
-            structure_score = round(min(score_ratio * max_dimensional_score * 0.8, max_dimensional_score), 1)
-            coverage_score = round(min(score_ratio * max_dimensional_score * 0.9, max_dimensional_score), 1)
-            tone_score = round(min(score_ratio * max_dimensional_score * 0.85, max_dimensional_score), 1)
-            
-            return {
-                'evaluation_type': 'topper_comparison',
-                'comparison_available': True,
-                'score': round(estimated_score, 1),
-                'max_score': marks,  # Keep as integer for proper display
-                'feedback': '\n'.join(feedback_parts),
-                'topper_insights': comparison_analysis,
-                'similar_toppers': similar_toppers[:3],  # Include top 3 for reference
-                'structure': structure_score,
-                'coverage': coverage_score,
-                'tone': tone_score
-            }
-            
-        except Exception as e:
-            logger.error(f"Error generating topper-based evaluation: {e}")
-            return {
-                'evaluation_type': 'topper_comparison',
-                'comparison_available': False,
-                'score': 0.0,
-                'max_score': marks,  # Keep as integer for proper display
-                'feedback': f'Error in topper comparison: {str(e)}',
-                'topper_insights': None,
-                'error': str(e)
-            }
\ No newline at end of file
+        
+        # Generate varied dimensional scores based on analysis and marks allocation
+        # For dimensional scores, use proportional scoring out of 10 regardless of question marks
+        max_dimensional_score = 10.0
+        score_ratio = estimated_score / marks if marks > 0 else 0
+        
+        structure_score = round(min(score_ratio * max_dimensional_score * 0.8, max_dimensional_score), 1)
+        coverage_score = round(min(score_ratio * max_dimensional_score * 0.9, max_dimensional_score), 1)
+        tone_score = round(min(score_ratio * max_dimensional_score * 0.85, max_dimensional_score), 1)
+        
+        return {
+            'evaluation_type': 'topper_comparison',
+            'comparison_available': True,
+            'score': round(estimated_score, 1),
+            'max_score': marks,  # Keep as integer for proper display
+            'feedback': '\n'.join(feedback_parts),
+            'topper_insights': comparison_analysis,
+            'similar_toppers': similar_toppers[:3],  # Include top 3 for reference
+            'structure': structure_score,
+            'coverage': coverage_score,
+            'tone': tone_score
+        }
+
+
+# Process-wide service instance; the embedder and LLM client are set up once
+# instead of on every evaluation request
+_topper_comparison_service: Optional[TopperComparisonService] = None
+_service_lock = threading.Lock()
+
+
+def get_topper_comparison_service() -> TopperComparisonService:
+    """Get the shared TopperComparisonService, creating it on first use
+    
+    Construction failures are raised to the caller and not cached, so a later call retries.
+    """
+    global _topper_comparison_service
+    if _topper_comparison_service is None:
+        with _service_lock:
+            if _topper_comparison_service is None:
+                _topper_comparison_service = TopperComparisonService()
+    return _topper_comparison_service
@@ -6,7 +6,12 @@ import os
 import re
 import json
 import asyncio
-from typing import List, Dict, Any, Optional, Tuple
+import base64
+import hashlib
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from collections import deque
+from typing import List, Dict, Any, Optional, Tuple, AsyncIterator, Deque
 from pathlib import Path
 import logging
 import fitz  # PyMuPDF
@@ -21,14 +26,93 @@ from app.utils.vision_pdf_processor import VisionPDFProcessor
 
 logger = logging.getLogger(__name__)
 
+# Same zoom as VisionPDFProcessor.convert_page_to_image
+PAGE_RENDER_ZOOM = 2.0
+
+# Rasterization is CPU bound and fitz.Page isn't picklable, so workers reopen the
+# PDF by path. Created on first use and shared by every service instance.
+_render_pool: Optional[ProcessPoolExecutor] = None
+_render_pool_lock = threading.Lock()
+
+def _get_render_pool() -> ProcessPoolExecutor:
+    global _render_pool
+    if _render_pool is None:
+        with _render_pool_lock:
+            if _render_pool is None:
+                workers = max(1, (os.cpu_count() or 2) // 2)
+                _render_pool = ProcessPoolExecutor(max_workers=workers)
+                logger.info(f"🖼️ Page render pool started with {workers} workers")
+    return _render_pool
+
+def _render_page_image(file_path: str, page_num: int) -> str:
+    """Render one PDF page to a base64 PNG (runs in a worker process)"""
+    with fitz.open(file_path) as pdf:
+        pix = pdf[page_num].get_pixmap(matrix=fitz.Matrix(PAGE_RENDER_ZOOM, PAGE_RENDER_ZOOM))
+        return base64.b64encode(pix.tobytes("png")).decode('utf-8')
+
+class _QAPairBuilder:
+    """Incremental form of extract_qa_pairs: feed pages in page order as they are analyzed"""
+    
+    def __init__(self, service: "TopperExtractionService", topper_info: TopperInfo):
+        self.service = service
+        self.topper_info = topper_info
+        self.qa_pairs: List[TopperQuestionAnswer] = []
+        self.current_question = None
+        self.current_answer_parts = []
+    
+    def feed(self, page: TopperPageContent):
+        """Consume one page; only Q&A pages contribute"""
+        if page.page_type != TopperPageType.QUESTION_ANSWER:
+            return
+        
+        # Look for questions in vision analysis
+        for q in page.questions_found:
+            # If we were building an answer, save it first
+            if self.current_question and self.current_answer_parts:
+                self.service.save_qa_pair(self.qa_pairs, self.current_question, self.current_answer_parts, self.topper_info)
+            
+            # Start new question
+            self.current_question = q
+            self.current_answer_parts = []
+        
+        # Look for answers
+        for a in page.answers_found:
+            if self.current_question:
+                self.current_answer_parts.append({
+                    'text': a.get('answer_text', ''),
+                    'page': page.page_number,
+                    'confidence': a.get('confidence', 0.0)
+                })
+    
+    def finish(self) -> List[TopperQuestionAnswer]:
+        """Flush the question still being answered and return all pairs"""
+        if self.current_question and self.current_answer_parts:
+            self.service.save_qa_pair(self.qa_pairs, self.current_question, self.current_answer_parts, self.topper_info)
+            self.current_question = None
+            self.current_answer_parts = []
+        return self.qa_pairs
+
 class TopperExtractionService:
     """Service for extracting content from topper PDFs"""
     
-    def __init__(self, output_dir: str = "extracted_topper_data"):
+    MANIFEST_FILENAME = "processed_manifest.json"
+    
+    def __init__(self, output_dir: str = "extracted_topper_data",
+                 max_concurrent_pdfs: int = 4, max_concurrent_pages: int = 2,
+                 skip_processed: bool = True):
         """Initialize the extraction service"""
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(exist_ok=True, parents=True)
         
+        # PDF content hash -> saved document JSON, so reruns skip finished PDFs
+        self.skip_processed = skip_processed
+        self.manifest_path = self.output_dir / self.MANIFEST_FILENAME
+        self._manifest: Optional[Dict[str, str]] = None
+        
+        # Vision calls are I/O bound: overlap PDFs, and pages within each PDF
+        self.max_concurrent_pdfs = max_concurrent_pdfs
+        self.max_concurrent_pages = max_concurrent_pages
+        
         # Initialize vision processor for OCR
         self.vision_processor = VisionPDFProcessor()
         
@@ -38,9 +122,52 @@ class TopperExtractionService:
             "total_successful": 0,
             "total_failed": 0,
             "total_pages": 0,
-            "total_qa_pairs": 0
+            "total_qa_pairs": 0,
+            "total_skipped": 0
         }
         
+    @staticmethod
+    def file_digest(file_path: str) -> str:
+        """Content hash of a PDF; renamed or re-downloaded copies map to the same entry"""
+        digest = hashlib.blake2b(digest_size=16)
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+    
+    def _load_manifest(self) -> Dict[str, str]:
+        """Read the processed-PDF manifest once per service instance"""
+        if self._manifest is None:
+            self._manifest = {}
+            if self.manifest_path.exists():
+                try:
+                    with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                        self._manifest = json.load(f)
+                except (OSError, ValueError) as e:
+                    logger.warning(f"⚠️ Ignoring unreadable manifest {self.manifest_path}: {e}")
+        return self._manifest
+    
+    def _record_processed(self, digest: str, saved_filename: str):
+        """Add a successfully extracted PDF to the manifest and persist it"""
+        manifest = self._load_manifest()
+        manifest[digest] = saved_filename
+        tmp_path = self.manifest_path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+    
+    def load_processed_document(self, digest: str) -> Optional[TopperDocument]:
+        """Return the saved document for an already-processed PDF, if it is still on disk"""
+        saved_filename = self._load_manifest().get(digest)
+        if not saved_filename:
+            return None
+        try:
+            with open(self.output_dir / saved_filename, 'r', encoding='utf-8') as f:
+                return TopperDocument(**json.load(f))
+        except Exception as e:
+            logger.warning(f"⚠️ Saved extraction {saved_filename} unusable, reprocessing: {e}")
+            return None
+    
     def parse_filename(self, filename: str, year_folder: str) -> TopperInfo:
         """
         Parse topper information from filename
@@ -136,56 +263,18 @@ class TopperExtractionService:
             
             logger.info(f"📄 Processing {document.total_pages} pages for {topper_info.topper_name}")
             
-            # Process each page
-            for page_num in range(document.total_pages):
-                try:
-                    current_page = page_num + 1
-                    page = doc[page_num]
-                    
-                    # Convert to image for vision analysis
-                    page_image = self.vision_processor.convert_page_to_image(page)
-                    
-                    if page_image:
-                        # Analyze with vision LLM
-                        vision_analysis = await self.vision_processor.analyze_page_with_vision(
-                            page_image, current_page
-                        )
-                        
-                        # Extract raw text
-                        raw_text = vision_analysis.get('extracted_text', '')
-                        
-                        # Classify page type
-                        page_type = self.classify_page_type(current_page, raw_text, vision_analysis)
-                        
-                        # Create page content
-                        page_content = TopperPageContent(
-                            page_number=current_page,
-                            page_type=page_type,
-                            raw_text=raw_text,
-                            vision_analysis=vision_analysis,
-                            questions_found=vision_analysis.get('questions_found', []),
-                            answers_found=vision_analysis.get('answers_found', []),
-                            confidence_score=vision_analysis.get('confidence_score', 0.0)
-                        )
-                        
-                        document.pages.append(page_content)
-                        
-                        logger.info(f"✅ Page {current_page}: {page_type.value}, {len(raw_text)} chars")
-                        
-                        # Add delay to prevent rate limiting
-                        await asyncio.sleep(1.0)
-                        
-                    else:
-                        logger.warning(f"⚠️ Failed to process page {current_page}")
-                        
-                except Exception as e:
-                    logger.error(f"❌ Error processing page {current_page}: {e}")
-                    document.error_log.append(f"Page {current_page}: {str(e)}")
-            
-            doc.close()
+            # Pages are analyzed concurrently but consumed in page order, so Q&A pairs
+            # are assembled while later pages are still in flight
+            qa_builder = _QAPairBuilder(self, topper_info)
+            try:
+                async for page_content in self.iter_page_contents(doc, document):
+                    document.pages.append(page_content)
+                    qa_builder.feed(page_content)
+            finally:
+                doc.close()
             
-            # Extract Q&A pairs from processed pages
-            self.extract_qa_pairs(document)
+            document.question_answers = qa_builder.finish()
+            logger.info(f"📝 Extracted {len(document.question_answers)} Q&A pairs from {document.filename}")
             
             # Mark as successful
             document.extraction_successful = True
@@ -207,41 +296,90 @@ class TopperExtractionService:
             
         return document
     
+    async def iter_page_contents(self, doc, document: TopperDocument) -> AsyncIterator[TopperPageContent]:
+        """Analyze pages concurrently and yield them in page order as soon as each is ready
+        
+        Failed pages are logged to document.error_log and skipped.
+        """
+        # The semaphore replaces the fixed per-page delay as the vision API rate limiter
+        page_semaphore = asyncio.Semaphore(self.max_concurrent_pages)
+        loop = asyncio.get_running_loop()
+        
+        async def process_page(page_num: int) -> Optional[TopperPageContent]:
+            current_page = page_num + 1
+            async with page_semaphore:
+                try:
+                    # Convert to image for vision analysis, off the event loop
+                    page_image = await self._render_page(loop, doc, document.file_path, page_num)
+                    
+                    if not page_image:
+                        logger.warning(f"⚠️ Failed to process page {current_page}")
+                        return None
+                    
+                    # Analyze with vision LLM
+                    vision_analysis = await self.vision_processor.analyze_page_with_vision(
+                        page_image, current_page
+                    )
+                    
+                    # Extract raw text
+                    raw_text = vision_analysis.get('extracted_text', '')
+                    
+                    # Classify page type
+                    page_type = self.classify_page_type(current_page, raw_text, vision_analysis)
+                    
+                    logger.info(f"✅ Page {current_page}: {page_type.value}, {len(raw_text)} chars")
+                    
+                    # Create page content
+                    return TopperPageContent(
+                        page_number=current_page,
+                        page_type=page_type,
+                        raw_text=raw_text,
+                        vision_analysis=vision_analysis,
+                        questions_found=vision_analysis.get('questions_found', []),
+                        answers_found=vision_analysis.get('answers_found', []),
+                        confidence_score=vision_analysis.get('confidence_score', 0.0)
+                    )
+                    
+                except Exception as e:
+                    logger.error(f"❌ Error processing page {current_page}: {e}")
+                    document.error_log.append(f"Page {current_page}: {str(e)}")
+                    return None
+        
+        # Only a bounded window of pages is scheduled ahead of the consumer, so finished
+        # analyses never pile up for long PDFs; the next page starts as each one is taken
+        total_pages = len(doc)
+        window = max(2, self.max_concurrent_pages * 2)
+        pending: Deque[asyncio.Future] = deque()
+        next_page = 0
+        try:
+            while next_page < total_pages or pending:
+                while next_page < total_pages and len(pending) < window:
+                    pending.append(asyncio.ensure_future(process_page(next_page)))
+                    next_page += 1
+                page_content = await pending.popleft()
+                if page_content is not None:
+                    yield page_content
+        finally:
+            # Consumer stopped early or failed: don't leave page analyses running
+            for task in pending:
+                task.cancel()
+    
+    async def _render_page(self, loop, doc, file_path: str, page_num: int) -> str:
+        """Rasterize a page in the render pool, falling back to the in-process renderer"""
+        try:
+            return await loop.run_in_executor(_get_render_pool(), _render_page_image, file_path, page_num)
+        except Exception as e:
+            logger.warning(f"⚠️ Render pool failed for page {page_num + 1}, rendering inline: {e}")
+            return self.vision_processor.convert_page_to_image(doc[page_num])
+    
     def extract_qa_pairs(self, document: TopperDocument):
         """Extract question-answer pairs from processed pages"""
-        qa_pairs = []
-        current_question = None
-        current_answer_parts = []
-        
-        # Process Q&A pages
-        qa_pages = document.get_pages_by_type(TopperPageType.QUESTION_ANSWER)
-        
-        for page in qa_pages:
-            # Look for questions in vision analysis
-            for q in page.questions_found:
-                # If we were building an answer, save it first
-                if current_question and current_answer_parts:
-                    self.save_qa_pair(qa_pairs, current_question, current_answer_parts, document.topper_info)
-                
-                # Start new question
-                current_question = q
-                current_answer_parts = []
-            
-            # Look for answers
-            for a in page.answers_found:
-                if current_question:
-                    current_answer_parts.append({
-                        'text': a.get('answer_text', ''),
-                        'page': page.page_number,
-                        'confidence': a.get('confidence', 0.0)
-                    })
-        
-        # Save final Q&A if exists
-        if current_question and current_answer_parts:
-            self.save_qa_pair(qa_pairs, current_question, current_answer_parts, document.topper_info)
-        
-        document.question_answers = qa_pairs
-        logger.info(f"📝 Extracted {len(qa_pairs)} Q&A pairs from {document.filename}")
+        qa_builder = _QAPairBuilder(self, document.topper_info)
+        for page in document.pages:
+            qa_builder.feed(page)
+        
+        document.question_answers = qa_builder.finish()
+        logger.info(f"📝 Extracted {len(document.question_answers)} Q&A pairs from {document.filename}")
     
     def save_qa_pair(self, qa_pairs: List[TopperQuestionAnswer], question: Dict, answer_parts: List[Dict], topper_info: TopperInfo):
         """Save a question-answer pair"""
@@ -272,31 +410,50 @@ class TopperExtractionService:
         
         logger.info(f"📂 Found {len(pdf_files)} PDF files in {directory}")
         
-        documents = []
-        for pdf_file in pdf_files:
-            try:
-                # Parse topper info from filename
-                topper_info = self.parse_filename(pdf_file.name, year)
-                
-                # Extract content
-                document = await self.extract_single_pdf(str(pdf_file), topper_info)
-                documents.append(document)
-                
-                # Save individual document
-                await self.save_document(document)
-                
-                # Update global stats
-                self.stats["total_processed"] += 1
-                if document.extraction_successful:
-                    self.stats["total_successful"] += 1
-                    self.stats["total_pages"] += document.total_pages
-                    self.stats["total_qa_pairs"] += len(document.question_answers)
-                else:
+        pdf_semaphore = asyncio.Semaphore(self.max_concurrent_pdfs)
+        
+        async def process_pdf(pdf_file: Path) -> Optional[TopperDocument]:
+            async with pdf_semaphore:
+                try:
+                    # Skip PDFs whose content was already extracted on a previous run
+                    digest = None
+                    if self.skip_processed:
+                        digest = await asyncio.to_thread(self.file_digest, str(pdf_file))
+                        document = self.load_processed_document(digest)
+                        if document is not None:
+                            logger.info(f"⏭️ Skipping already processed: {pdf_file.name}")
+                            self.stats["total_skipped"] += 1
+                            return document
+                    
+                    # Parse topper info from filename
+                    topper_info = self.parse_filename(pdf_file.name, year)
+                    
+                    # Extract content
+                    document = await self.extract_single_pdf(str(pdf_file), topper_info)
+                    
+                    # Save individual document
+                    saved_filename = await self.save_document(document)
+                    if digest and document.extraction_successful:
+                        self._record_processed(digest, saved_filename)
+                    
+                    # Update global stats
+                    self.stats["total_processed"] += 1
+                    if document.extraction_successful:
+                        self.stats["total_successful"] += 1
+                        self.stats["total_pages"] += document.total_pages
+                        self.stats["total_qa_pairs"] += len(document.question_answers)
+                    else:
+                        self.stats["total_failed"] += 1
+                    
+                    return document
+                    
+                except Exception as e:
+                    logger.error(f"❌ Error processing {pdf_file}: {e}")
                     self.stats["total_failed"] += 1
-                
-            except Exception as e:
-                logger.error(f"❌ Error processing {pdf_file}: {e}")
-                self.stats["total_failed"] += 1
+                    return None
+        
+        results = await asyncio.gather(*(process_pdf(pdf_file) for pdf_file in pdf_files))
+        documents = [document for document in results if document is not None]
         
         return documents
     
@@ -345,8 +502,8 @@ class TopperExtractionService:
         
         return batch
     
-    async def save_document(self, document: TopperDocument):
-        """Save individual document to JSON file"""
+    async def save_document(self, document: TopperDocument) -> str:
+        """Save individual document to JSON file; returns the filename"""
         filename = f"{document.topper_info.exam_year}_{document.topper_info.topper_name.replace(' ', '_')}_{document.document_id[:8]}.json"
         filepath = self.output_dir / filename
         
@@ -354,6 +511,7 @@ class TopperExtractionService:
             json.dump(document.dict(), f, indent=2, ensure_ascii=False, default=str)
         
         logger.info(f"💾 Saved document: {filename}")
+        return filename
     
     async def save_batch(self, batch: TopperExtractionBatch):
         """Save batch results"""
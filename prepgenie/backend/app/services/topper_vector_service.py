@@ -7,8 +7,14 @@ from typing import List, Dict, Any, Optional
 import json
 import logging
 import asyncio
+import hashlib
+import io
 import os
+import threading
+from collections import OrderedDict
 from datetime import datetime
+from pathlib import Path
+import numpy as np
 from pymilvus import (
     connections,
     Collection,
@@ -17,14 +23,33 @@ from pymilvus import (
     DataType,
     utility
 )
-from sentence_transformers import SentenceTransformer
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
 from app.models.topper_reference import TopperReference, TopperPattern
+from app.services.milvus_tuning import adaptive_search_params, similarity_converter
+from app.services.embedder import get_embedder, DEFAULT_EMBEDDING_MODEL, EMBEDDING_BACKEND
+from app.utils.disk_cache import DiskCache
 
 logger = logging.getLogger(__name__)
 
+# Output fields - match actual topper_embeddings collection schema
+TOPPER_OUTPUT_FIELDS = [
+    "topper_id", "topper_name", "institute", "rank", "exam_year",
+    "question_id", "question_text", "answer_text", "subject", "topic", "marks",
+    "word_count", "source_document", "page_number"
+]
+
+# Scalar fields used in search pre-filters (see _build_filter_expr); an INVERTED
+# index lets Milvus resolve the predicate to a row bitmap instead of scanning values
+TOPPER_FILTER_FIELDS = ["subject", "exam_year", "marks", "rank"]
+
+# Content-addressed embedding cache so re-ingesting unchanged topper text skips the model
+# (bulk ingestion only; search queries are never written to disk); set TOPPER_EMBED_CACHE_DIR="" to disable
+EMBED_CACHE_DIR = os.getenv("TOPPER_EMBED_CACHE_DIR", "./.embed_cache")
+EMBED_CACHE_TTL = int(os.getenv("TOPPER_EMBED_CACHE_TTL", str(30 * 24 * 3600)))  # seconds
+EMBED_CACHE_MAX_MB = int(os.getenv("TOPPER_EMBED_CACHE_MAX_MB", "512"))
+
 class TopperVectorService:
     """Enhanced vector service specifically for topper content"""
     
@@ -38,6 +63,18 @@ class TopperVectorService:
         self._topper_collection = None
         self._pattern_collection = None
         
+        # LRU of query embeddings keyed by sha1(text); guarded for thread-pool callers
+        self._query_embedding_cache: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._query_embedding_cache_size = 1024
+        self._query_embedding_lock = threading.Lock()
+        
+        # One cache directory per model/backend so a model switch never serves stale vectors
+        model_slug = f"{DEFAULT_EMBEDDING_MODEL.replace('/', '__')}-{EMBEDDING_BACKEND}"
+        self._embed_cache = DiskCache(
+            str(Path(EMBED_CACHE_DIR) / model_slug) if EMBED_CACHE_DIR else "",
+            EMBED_CACHE_TTL, EMBED_CACHE_MAX_MB * 2**20, suffix=".npy"
+        )
+        
         # Use same local/remote logic as main vector service  
         # Check if we should use local Milvus (development or local environment)
         environment = getattr(settings, 'ENVIRONMENT', 'production').lower()
@@ -54,7 +91,7 @@ class TopperVectorService:
             
         # Initialize model (reuse from main vector service if available)
         try:
-            self.model = SentenceTransformer('BAAI/bge-large-en-v1.5')
+            self.model = get_embedder()
             logger.info("Initialized BGE SentenceTransformer for topper analysis")
         except Exception as e:
             logger.warning(f"Failed to initialize SentenceTransformer for toppers: {e}")
@@ -107,6 +144,9 @@ class TopperVectorService:
 
     def _ensure_collections_exist(self):
         """Ensure both topper collections exist and are properly loaded"""
+        if self._topper_collection is not None:
+            # Already resolved and loaded on this connection; load() is not free
+            return
         try:
             # Check for existing topper_embeddings collection first
             collections = utility.list_collections(using=self.connection_alias)
@@ -121,22 +161,25 @@ class TopperVectorService:
                 # Legacy property for backward compatibility
                 self.topper_collection = self._topper_collection
                 
+                # Scalar indexes must exist before load() to be used by filtered searches
+                self._ensure_filter_indexes(self._topper_collection)
+                
                 # Force load to ensure fresh data
                 try:
                     self._topper_collection.load()
                 except Exception as e:
                     logger.warning(f"Collection load warning: {e}")
                 
-                # Get REAL entity count by forcing a fresh query
+                # Get REAL entity count (num_entities still includes deleted rows).
+                # count(*) is aggregated server-side instead of shipping back up to
+                # 1000 ids just to len() them, and isn't capped at 1000
                 try:
-                    # Use query to get actual count since num_entities might be cached
                     count_results = self._topper_collection.query(
-                        expr="topper_id >= 0",
-                        output_fields=["topper_id"],
-                        limit=1000  # Get a large number to count
+                        expr="",
+                        output_fields=["count(*)"]
                     )
-                    entity_count = len(count_results)
-                    logger.info(f"Real collection entity count (via query): {entity_count}")
+                    entity_count = count_results[0]["count(*)"]
+                    logger.info(f"Real collection entity count (via count(*)): {entity_count}")
                 except Exception as e:
                     entity_count = self._topper_collection.num_entities
                     logger.info(f"Collection entity count (via num_entities): {entity_count}")
@@ -165,6 +208,28 @@ class TopperVectorService:
             logger.error(f"Error ensuring collections exist: {e}")
             raise
 
+    def _ensure_filter_indexes(self, collection: Collection):
+        """Build INVERTED scalar indexes on the filter fields that don't have one yet
+        
+        Best effort: older servers without scalar index support keep filtering by scan.
+        """
+        schema_fields = {f.name for f in collection.schema.fields}
+        for field_name in TOPPER_FILTER_FIELDS:
+            if field_name not in schema_fields:
+                continue
+            index_name = f"{field_name}_idx"
+            try:
+                if collection.has_index(index_name=index_name):
+                    continue
+                collection.create_index(
+                    field_name=field_name,
+                    index_params={"index_type": "INVERTED"},
+                    index_name=index_name
+                )
+                logger.info(f"Created scalar filter index {index_name}")
+            except Exception as e:
+                logger.warning(f"Could not create scalar index on {field_name}: {e}")
+
     def _create_topper_collection(self):
         """Create topper_embeddings collection with proper schema"""
         try:
@@ -203,12 +268,17 @@ class TopperVectorService:
             )
 
             # Create index
+            # SQ8 keeps 8-bit quantized vectors: ~4x less memory than IVF_FLAT with
+            # negligible recall loss on normalized embeddings; queries stay FP32.
+            # Embeddings are L2-normalized, so IP ranks exactly like COSINE without
+            # the per-candidate norm; nlist 128 suits a few thousand topper answers.
             index_params = {
-                "metric_type": "COSINE",
-                "index_type": "IVF_FLAT",
-                "params": {"nlist": 1024}
+                "metric_type": "IP",
+                "index_type": "IVF_SQ8",
+                "params": {"nlist": 128}
             }
             collection.create_index(field_name="embedding", index_params=index_params)
+            self._ensure_filter_indexes(collection)
             
             logger.info("Created topper collection with index: topper_embeddings")
 
@@ -216,6 +286,24 @@ class TopperVectorService:
             logger.error(f"Failed to create topper collection: {e}")
             raise
 
+    def _load_cached_embedding(self, text: str) -> Optional[List[float]]:
+        """Return the on-disk embedding for text, or None on a miss or unreadable entry"""
+        path = self._embed_cache.path_for(text)
+        data = self._embed_cache.read(path)
+        if data is None:
+            return None
+        try:
+            return np.load(io.BytesIO(data)).tolist()
+        except Exception as e:
+            logger.debug(f"Ignoring unreadable embedding cache entry {path}: {e}")
+            return None
+
+    def _store_cached_embedding(self, text: str, embedding: np.ndarray) -> None:
+        """Persist an embedding; cache write failures never fail the caller"""
+        buffer = io.BytesIO()
+        np.save(buffer, np.asarray(embedding, dtype=np.float32))
+        self._embed_cache.write(self._embed_cache.path_for(text), buffer.getvalue())
+
     def generate_embedding(self, text: str) -> List[float]:
         """Generate embedding for text"""
         if not self.model:
@@ -228,6 +316,82 @@ class TopperVectorService:
             logger.error(f"Failed to generate embedding: {e}")
             raise
 
+    def _encode_batch(self, texts: List[str]):
+        """Encode texts in batched forward passes, bypassing every cache"""
+        try:
+            return self.model.encode(texts, normalize_embeddings=True, batch_size=32, convert_to_numpy=True)
+        except Exception as e:
+            logger.error(f"Failed to generate embeddings: {e}")
+            raise
+
+    def generate_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """Generate embeddings for topper ingestion, reusing on-disk vectors of unchanged text"""
+        if not self.model:
+            return [[0.0] * self.dimension for _ in texts]
+        
+        embeddings: List[Optional[List[float]]] = [self._load_cached_embedding(text) for text in texts]
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        if not missing:
+            return embeddings
+        
+        encoded = self._encode_batch([texts[i] for i in missing])
+        for i, embedding in zip(missing, encoded):
+            self._store_cached_embedding(texts[i], embedding)
+            embeddings[i] = embedding.tolist()
+        if len(missing) < len(texts):
+            logger.info(f"♻️ Embedding cache: {len(texts) - len(missing)}/{len(texts)} hits")
+        return embeddings
+
+    def embed_query(self, text: str) -> List[float]:
+        """Generate a search embedding, reusing it for repeated query strings"""
+        key = hashlib.sha1(text.encode("utf-8")).hexdigest()
+        with self._query_embedding_lock:
+            cached = self._query_embedding_cache.get(key)
+            if cached is not None:
+                self._query_embedding_cache.move_to_end(key)
+                return cached
+        
+        embedding = self.generate_embedding(text)
+        if not self.model:
+            return embedding  # zero-vector placeholder, not worth caching
+        
+        with self._query_embedding_lock:
+            self._query_embedding_cache[key] = embedding
+            if len(self._query_embedding_cache) > self._query_embedding_cache_size:
+                self._query_embedding_cache.popitem(last=False)
+        return embedding
+
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        """Embed several queries, encoding all cache misses in one batched forward pass"""
+        keys = [hashlib.sha1(text.encode("utf-8")).hexdigest() for text in texts]
+        embeddings: List[Optional[List[float]]] = [None] * len(texts)
+        with self._query_embedding_lock:
+            for i, key in enumerate(keys):
+                cached = self._query_embedding_cache.get(key)
+                if cached is not None:
+                    self._query_embedding_cache.move_to_end(key)
+                    embeddings[i] = cached
+        
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        if missing and not self.model:
+            return [[0.0] * self.dimension for _ in texts]  # placeholders, not worth caching
+        if missing:
+            # Queries carry student answers: they stay in the in-memory LRU, never on disk
+            encoded = self._encode_batch([texts[i] for i in missing])
+            with self._query_embedding_lock:
+                for i, embedding in zip(missing, encoded):
+                    embedding = embedding.tolist()
+                    embeddings[i] = embedding
+                    self._query_embedding_cache[keys[i]] = embedding
+                while len(self._query_embedding_cache) > self._query_embedding_cache_size:
+                    self._query_embedding_cache.popitem(last=False)
+        return embeddings
+
+    def warmup(self, queries: List[str]) -> None:
+        """Pre-populate the query embedding cache for known queries"""
+        if self.model:
+            self.embed_queries(queries)
+
     async def insert_topper_answer(self, topper_data: Dict[str, Any]) -> str:
         """Insert topper answer with embedding"""
         if not self._connected:
@@ -269,8 +433,8 @@ class TopperVectorService:
             logger.error(f"Failed to insert topper answer: {e}")
             raise
 
-    async def store_topper_content(
-        self,
+    @staticmethod
+    def _build_topper_record(
         topper_name: str,
         institute: str,
         exam_year: str,
@@ -280,19 +444,18 @@ class TopperVectorService:
         marks: int = 10,
         question_number: str = "Q1",
         metadata: Optional[Dict[str, Any]] = None
-    ) -> str:
-        """Simplified method to store topper content using existing add_topper_answer"""
+    ) -> Dict[str, Any]:
+        """Build the topper_data dict expected by insert_topper_answer/bulk_insert_toppers"""
         
         # Convert exam_year to int if needed
         year = int(exam_year) if isinstance(exam_year, str) and exam_year.isdigit() else 2024
         
         # Create numeric topper ID (hash of name + year for uniqueness)
-        import hashlib
         topper_id_str = f"{topper_name.replace(' ', '_').lower()}_{year}"
         topper_id = int(hashlib.md5(topper_id_str.encode()).hexdigest()[:10], 16) % (2**31)  # Convert to 32-bit int
         
         # Create topper data dictionary
-        topper_data = {
+        return {
             'topper_id': topper_id,
             'topper_name': topper_name,
             'institute': institute,
@@ -309,10 +472,92 @@ class TopperVectorService:
             'page_number': 1,  # Convert page reference to int
             'created_at': datetime.now().isoformat()[:50]  # Truncate to fit field size
         }
+
+    async def store_topper_content_batch(self, records: List[Dict[str, Any]]) -> List[str]:
+        """Store many topper answers with one batched embed and one Milvus insert
+        
+        Each record takes the same keyword arguments as store_topper_content().
+        """
+        if not records:
+            return []
+        topper_list = [self._build_topper_record(**record) for record in records]
+        return await self.bulk_insert_toppers(topper_list)
+
+    async def store_topper_content(
+        self,
+        topper_name: str,
+        institute: str,
+        exam_year: str,
+        question_text: str,
+        answer_text: str,
+        subject: str = "General Studies",
+        marks: int = 10,
+        question_number: str = "Q1",
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """Simplified method to store topper content using existing add_topper_answer"""
+        topper_data = self._build_topper_record(
+            topper_name=topper_name,
+            institute=institute,
+            exam_year=exam_year,
+            question_text=question_text,
+            answer_text=answer_text,
+            subject=subject,
+            marks=marks,
+            question_number=question_number,
+            metadata=metadata
+        )
         
         # Use existing method
         return await self.insert_topper_answer(topper_data)
 
+    @staticmethod
+    def _build_filter_expr(filters: Optional[Dict[str, Any]]) -> str:
+        """Translate search filters into a Milvus boolean expression
+        
+        The expression is evaluated server-side as a pre-filter, so only matching
+        rows are scanned by the ANN search. String values are escaped and numeric
+        values coerced to int so caller input can't alter the expression.
+        """
+        if not filters:
+            return ""
+        filter_conditions = []
+        if filters.get('subject'):
+            subject = str(filters['subject']).replace('\\', '\\\\').replace('"', '\\"')
+            filter_conditions.append(f'subject == "{subject}"')
+        if filters.get('exam_year'):
+            filter_conditions.append(f'exam_year == {int(filters["exam_year"])}')
+        if filters.get('marks_min'):
+            filter_conditions.append(f'marks >= {int(filters["marks_min"])}')
+        if filters.get('rank_max'):
+            filter_conditions.append(f'rank <= {int(filters["rank_max"])}')
+        return " && ".join(filter_conditions)
+
+    @staticmethod
+    def _format_topper_hit(hit, relevance_rank: int, similarity: float) -> Dict[str, Any]:
+        """Shape a Milvus hit into the topper result dict used by callers"""
+        # hit.fields is a plain dict of output fields; avoids the entity proxy per lookup
+        fields = hit.fields
+        answer_text = fields.get("answer_text")
+        return {
+            "topper_id": fields.get("topper_id"),
+            "topper_name": fields.get("topper_name"),
+            "institute": fields.get("institute"),
+            "rank": fields.get("rank"),  # Map to rank for consistency
+            "exam_year": fields.get("exam_year"),
+            "question_id": fields.get("question_id"),  # Use question_id field
+            "question_text": fields.get("question_text"),  # Use correct field name
+            "subject": fields.get("subject"),
+            "topic": fields.get("subject"),  # Use subject as topic for now
+            "marks": fields.get("marks"),
+            "answer_text": answer_text,  # Use correct field name
+            "word_count": len(answer_text.split()) if answer_text else 0,
+            "source_document": f"Topper {fields.get('topper_name', 'Unknown')}",
+            "page_number": 1,  # Default page number
+            "similarity_score": similarity,
+            "relevance_rank": relevance_rank
+        }
+
     async def search_similar_topper_answers(
         self,
         query_question: str,
@@ -328,7 +573,7 @@ class TopperVectorService:
             # Try to initialize the model if it's not available
             logger.info("Attempting to initialize SentenceTransformer model...")
             try:
-                self.model = SentenceTransformer('BAAI/bge-large-en-v1.5')
+                self.model = get_embedder()
                 logger.info("Successfully initialized BGE SentenceTransformer model")
             except Exception as e:
                 logger.error(f"Failed to initialize SentenceTransformer model: {e}")
@@ -338,36 +583,16 @@ class TopperVectorService:
         try:
             # Create search query embedding
             search_text = f"{query_question} {student_answer}" if student_answer else query_question
-            query_embedding = self.generate_embedding(search_text)
+            query_embedding = self.embed_query(search_text)
             
             # Build filter expression
-            filter_expr = ""
-            if filters:
-                filter_conditions = []
-                if filters.get('subject'):
-                    filter_conditions.append(f'subject == "{filters["subject"]}"')
-                if filters.get('exam_year'):
-                    filter_conditions.append(f'exam_year == {filters["exam_year"]}')
-                if filters.get('marks_min'):
-                    filter_conditions.append(f'marks >= {filters["marks_min"]}')
-                if filters.get('rank_max'):
-                    filter_conditions.append(f'rank <= {filters["rank_max"]}')
-                    
-                if filter_conditions:
-                    filter_expr = " && ".join(filter_conditions)
-            
-            # Search parameters
-            search_params = {
-                "metric_type": "COSINE",
-                "params": {"nprobe": 10}
-            }
+            filter_expr = self._build_filter_expr(filters)
             
-            # Output fields - match actual topper_embeddings collection schema  
-            output_fields = [
-                "topper_id", "topper_name", "institute", "rank", "exam_year",
-                "question_id", "question_text", "answer_text", "subject", "topic", "marks", 
-                "word_count", "source_document", "page_number"
-            ]
+            # Search parameters scaled to the collection's index
+            search_params = adaptive_search_params(self._topper_collection, limit)
+            to_similarity = similarity_converter(self._topper_collection)
+            
+            output_fields = TOPPER_OUTPUT_FIELDS
             
             # Check collection status before search
             try:
@@ -394,27 +619,10 @@ class TopperVectorService:
             for result_set_idx, hits in enumerate(results):
                 logger.info(f"📝 Processing result set {result_set_idx + 1} with {len(hits)} hits")
                 for hit_idx, hit in enumerate(hits):
-                    result_data = {
-                        "topper_id": hit.entity.get("topper_id"),
-                        "topper_name": hit.entity.get("topper_name"),
-                        "institute": hit.entity.get("institute"),
-                        "rank": hit.entity.get("rank"),  # Map to rank for consistency
-                        "exam_year": hit.entity.get("exam_year"),
-                        "question_id": hit.entity.get("question_id"),  # Use question_id field
-                        "question_text": hit.entity.get("question_text"),  # Use correct field name
-                        "subject": hit.entity.get("subject"),
-                        "topic": hit.entity.get("subject"),  # Use subject as topic for now
-                        "marks": hit.entity.get("marks"),
-                        "answer_text": hit.entity.get("answer_text"),  # Use correct field name
-                        "word_count": len(hit.entity.get("answer_text", "").split()) if hit.entity.get("answer_text") else 0,
-                        "source_document": f"Topper {hit.entity.get('topper_name', 'Unknown')}",
-                        "page_number": 1,  # Default page number
-                        "similarity_score": hit.score,
-                        "relevance_rank": len(formatted_results) + 1
-                    }
+                    result_data = self._format_topper_hit(hit, len(formatted_results) + 1, to_similarity(hit.score))
                     formatted_results.append(result_data)
                     # Log individual similarity scores for debugging
-                    logger.info(f"🎯 Result {len(formatted_results)}: [{hit.entity.get('topper_name')}] Q{hit.entity.get('question_id')} - Similarity: {hit.score:.4f}")
+                    logger.info(f"🎯 Result {len(formatted_results)}: [{result_data['topper_name']}] Q{result_data['question_id']} - Similarity: {result_data['similarity_score']:.4f}")
             
             if len(formatted_results) == 0:
                 logger.warning(f"❌ Vector search returned 0 results for query: '{query_question[:100]}...'")
@@ -442,6 +650,50 @@ class TopperVectorService:
             logger.error(f"Failed to search topper answers: {e}")
             return []
 
+    async def search_similar_topper_answers_batch(
+        self,
+        queries: List[str],
+        limit: int = 5,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """Search several questions with one batched encode and one Milvus search
+        
+        Returns one result list per query, in the order of `queries`.
+        """
+        if not queries:
+            return []
+        if not self._connected:
+            await self.connect()
+        if not self.model:
+            return [[] for _ in queries]
+        
+        try:
+            query_embeddings = self.embed_queries(queries)
+            filter_expr = self._build_filter_expr(filters)
+            search_params = adaptive_search_params(self._topper_collection, limit)
+            to_similarity = similarity_converter(self._topper_collection)
+            
+            results = self._topper_collection.search(
+                data=query_embeddings,
+                anns_field="embedding",
+                param=search_params,
+                limit=limit,
+                expr=filter_expr if filter_expr else None,
+                output_fields=TOPPER_OUTPUT_FIELDS
+            )
+            
+            batched_results = [
+                [self._format_topper_hit(hit, rank, to_similarity(hit.score)) for rank, hit in enumerate(hits, 1)]
+                for hits in results
+            ]
+            logger.info(f"✅ Batched topper search: {len(queries)} queries, "
+                        f"{sum(len(r) for r in batched_results)} hits")
+            return batched_results
+            
+        except Exception as e:
+            logger.error(f"Failed to batch search topper answers: {e}")
+            return [[] for _ in queries]
+
     async def search_relevant_patterns(
         self,
         question_type: str,
@@ -458,12 +710,10 @@ class TopperVectorService:
         try:
             # Create query for patterns
             query_text = f"{subject} {question_type}"
-            query_embedding = self.generate_embedding(query_text)
+            query_embedding = self.embed_query(query_text)
             
-            search_params = {
-                "metric_type": "COSINE", 
-                "params": {"nprobe": 10}
-            }
+            search_params = adaptive_search_params(self._pattern_collection, limit)
+            to_similarity = similarity_converter(self._pattern_collection)
             
             results = self._pattern_collection.search(
                 data=[query_embedding],
@@ -477,16 +727,17 @@ class TopperVectorService:
             formatted_results = []
             for hits in results:
                 for hit in hits:
+                    fields = hit.fields
                     result_data = {
-                        "pattern_id": hit.entity.get("pattern_id"),
-                        "pattern_type": hit.entity.get("pattern_type"),
-                        "pattern_name": hit.entity.get("pattern_name"),
-                        "description": hit.entity.get("description"),
-                        "subjects": json.loads(hit.entity.get("subjects", "[]")),
-                        "frequency": hit.entity.get("frequency"),
-                        "effectiveness_score": hit.entity.get("effectiveness_score"),
-                        "examples": json.loads(hit.entity.get("examples", "[]")),
-                        "relevance_score": hit.score
+                        "pattern_id": fields.get("pattern_id"),
+                        "pattern_type": fields.get("pattern_type"),
+                        "pattern_name": fields.get("pattern_name"),
+                        "description": fields.get("description"),
+                        "subjects": json.loads(fields.get("subjects", "[]")),
+                        "frequency": fields.get("frequency"),
+                        "effectiveness_score": fields.get("effectiveness_score"),
+                        "examples": json.loads(fields.get("examples", "[]")),
+                        "relevance_score": to_similarity(hit.score)
                     }
                     formatted_results.append(result_data)
             
@@ -521,11 +772,14 @@ class TopperVectorService:
                 "embedding": []
             }
             
+            # Embed every entry in one batched forward pass
+            embeddings = self.generate_embeddings([
+                f"{topper_data['question_text']} {topper_data['answer_text']}"
+                for topper_data in topper_list
+            ])
+            
             # Process each topper entry
-            for topper_data in topper_list:
-                text_for_embedding = f"{topper_data['question_text']} {topper_data['answer_text']}"
-                embedding = self.generate_embedding(text_for_embedding)
-                
+            for topper_data, embedding in zip(topper_list, embeddings):
                 batch_data["topper_id"].append(topper_data['topper_id'])
                 batch_data["topper_name"].append(topper_data['topper_name'])
                 batch_data["institute"].append(topper_data.get('institute', ''))
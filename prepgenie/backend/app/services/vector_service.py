@@ -14,8 +14,8 @@ from pymilvus import (
     DataType,
     utility
 )
-from sentence_transformers import SentenceTransformer
 from app.core.config import settings
+from app.services.embedder import get_embedder
 
 logger = logging.getLogger(__name__)
 
@@ -35,7 +35,7 @@ class VectorService:
             
         # Only initialize model if service is enabled
         try:
-            self.model = SentenceTransformer('BAAI/bge-large-en-v1.5')
+            self.model = get_embedder()
         except Exception as e:
             logger.warning(f"Failed to initialize SentenceTransformer: {e}")
             logger.info("Vector service will be disabled due to model initialization failure")
@@ -0,0 +1,115 @@
+"""
+Disk Cache
+Content-addressed file cache shared by the LLM response and embedding caches,
+bounded by entry age and total size so long-running workers never fill the disk
+"""
+
+import hashlib
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Union
+
+logger = logging.getLogger(__name__)
+
+
+class DiskCache:
+    """
+    Files under directory/<2-char shard>/<sha256><suffix>, written atomically
+    Entries older than ttl_seconds are misses; once more than max_bytes are stored,
+    the oldest entries are evicted (checked every prune_every writes)
+    """
+
+    def __init__(self, directory: str, ttl_seconds: int, max_bytes: int,
+                 suffix: str = ".json", prune_every: int = 256):
+        self.directory = Path(directory) if directory else None
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.suffix = suffix
+        self.prune_every = prune_every
+        self._writes = 0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.directory is not None
+
+    def path_for(self, *parts: Union[str, bytes]) -> Optional[Path]:
+        """Cache file for a key made of parts; None when the cache is disabled"""
+        if self.directory is None:
+            return None
+        digest = hashlib.sha256()
+        for part in parts:
+            digest.update(part if isinstance(part, bytes) else str(part).encode("utf-8"))
+            digest.update(b"\x1f")
+        hexdigest = digest.hexdigest()
+        return self.directory / hexdigest[:2] / f"{hexdigest}{self.suffix}"
+
+    def read(self, path: Optional[Path]) -> Optional[bytes]:
+        """Entry contents, or None on a miss, an expired entry or a read error"""
+        if path is None:
+            return None
+        try:
+            if time.time() - path.stat().st_mtime > self.ttl_seconds:
+                return None
+            return path.read_bytes()
+        except OSError:
+            return None
+
+    def write(self, path: Optional[Path], data: bytes):
+        """Store an entry; cache write failures never fail the caller"""
+        if path is None:
+            return
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.debug("Could not write cache entry %s: %s", path, e)
+            return
+
+        with self._lock:
+            self._writes += 1
+            due = self._writes % self.prune_every == 1  # first write, then every prune_every
+        if due:
+            self.prune()
+
+    def prune(self):
+        """Delete expired entries, then the oldest ones until the cache fits in max_bytes"""
+        if self.directory is None or not self.directory.exists():
+            return
+        now = time.time()
+        entries = []
+        total = 0
+        removed = 0
+        for path in self.directory.glob(f"*/*{self.suffix}"):
+            try:
+                stat = path.stat()
+                if now - stat.st_mtime > self.ttl_seconds:
+                    path.unlink()
+                    removed += 1
+                    continue
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+        if total > self.max_bytes:
+            entries.sort()
+            # Evict down to 90% so the next few writes don't trigger another scan
+            target = self.max_bytes * 0.9
+            for _, size, path in entries:
+                if total <= target:
+                    break
+                try:
+                    path.unlink()
+                except OSError:
+                    continue
+                total -= size
+                removed += 1
+
+        if removed:
+            logger.info("🧹 Pruned %d entries from %s (%.1f MB kept)", removed, self.directory, total / 2**20)
@@ -22,6 +22,7 @@ import fitz  # PyMuPDF for PDF page conversion
 import base64
 import json
 from io import BytesIO
+from pathlib import Path
 from PIL import Image
 from datetime import datetime
 from typing import Dict, List, Optional, Tuple, Callable
@@ -29,6 +30,7 @@ from sqlalchemy.orm import Session
 
 # Import core services
 from app.core.llm_service import get_llm_service, LLMService
+from app.utils.disk_cache import DiskCache
 from app.api.llm_endpoints import (
     AnswerEvaluationRequest, ExamContext, evaluate_answer,
     comprehensive_question_analysis_direct
@@ -36,6 +38,193 @@ from app.api.llm_endpoints import (
 
 logger = logging.getLogger(__name__)
 
+# Pages analyzed concurrently; replaces the fixed 2s delay between pages, and the
+# provider's rate-limit handler backs off if the gateway still returns 429s
+VISION_PAGE_CONCURRENCY = int(os.getenv("VISION_PAGE_CONCURRENCY", "4"))
+# Consecutive pages sent in one vision request; each page can need ~6k output tokens,
+# so batches stay small and are capped at VISION_BATCH_MAX_TOKENS
+VISION_PAGES_PER_REQUEST = max(1, int(os.getenv("VISION_PAGES_PER_REQUEST", "2")))
+VISION_MAX_TOKENS_PER_PAGE = 6000
+VISION_BATCH_MAX_TOKENS = 16000
+# Pages where fewer than this fraction of pixels carry ink (grayscale < 200 at 1x render)
+# are blank and classified locally instead of by the LLM. One short handwritten stroke
+# on A4 is ~0.03%, a single line of text ~0.2%, so only truly empty pages fall below it.
+BLANK_PAGE_INK_RATIO = float(os.getenv("VISION_BLANK_PAGE_INK_RATIO", "0.0001"))
+_INK_GRAY_LEVELS = bytes(range(200))  # light enough to count anti-aliased blue/gray strokes
+
+VISION_MODEL = "gpt-4.1-mini"  # Use the same model as regular chat for Walmart Gateway
+VISION_TEMPERATURE = 0.0  # deterministic extraction; responses are only cached at temperature 0
+
+# Page analyses on disk keyed by sha256(prompt version, model, page image), so re-running a
+# booklet skips the LLM for pages already analyzed; set VISION_PAGE_CACHE_DIR="" to disable
+VISION_PAGE_CACHE_DIR = os.getenv("VISION_PAGE_CACHE_DIR", "./.llm_cache/vision_pages")
+VISION_PAGE_CACHE_TTL = int(os.getenv("VISION_PAGE_CACHE_TTL", str(24 * 3600)))  # seconds
+VISION_PAGE_CACHE_MAX_MB = int(os.getenv("VISION_PAGE_CACHE_MAX_MB", "256"))
+VISION_PROMPT_VERSION = "1"  # part of the cache key; bump when VISION_PAGE_PROMPT changes
+
+_page_cache = DiskCache(VISION_PAGE_CACHE_DIR, VISION_PAGE_CACHE_TTL, VISION_PAGE_CACHE_MAX_MB * 2**20)
+
+
+def _page_cache_path(page_image: str) -> Optional[Path]:
+    if VISION_TEMPERATURE != 0:
+        return None
+    return _page_cache.path_for(VISION_PROMPT_VERSION, VISION_MODEL, page_image)
+
+
+def _load_cached_page(path: Optional[Path]) -> Optional[str]:
+    """Return a cached vision response if present and younger than the TTL"""
+    data = _page_cache.read(path)
+    if data is None:
+        return None
+    try:
+        return json.loads(data)['response']
+    except (ValueError, KeyError):
+        return None
+
+
+def _store_cached_page(path: Optional[Path], response: str):
+    """Persist a vision response; cache write failures never fail the page"""
+    _page_cache.write(path, json.dumps({'response': response, 'cached_at': datetime.now().isoformat()}).encode('utf-8'))
+
+# Enhanced UPSC-specific page analysis instructions (~2k tokens), sent unchanged with every page
+VISION_PAGE_PROMPT = """🎓 **UPSC MAINS HANDWRITTEN ANSWER BOOKLET ANALYZER** 🎓
+
+You are analyzing a **HANDWRITTEN UPSC Civil Services Mains exam answer booklet** written by competitive exam students. This is a comprehensive evaluation of student responses on Indian governance, polity, economics, society, international relations, and current affairs.
+
+🎯 **CRITICAL CONTEXT**: 
+- This is a **STUDENT'S HANDWRITTEN ANSWER BOOKLET** for UPSC CSE Mains exam
+- Students write detailed analytical responses across multiple pages for each question
+- Answers demonstrate policy understanding, constitutional knowledge, and current affairs integration
+- Students frequently use visual aids (diagrams, flowcharts, tables, maps) to enhance their presentation
+- Handwriting varies from clear to moderate difficulty - extract ALL visible content
+
+📊 **VISUAL ELEMENTS STUDENTS COMMONLY INCLUDE**:
+- **📊 Tables/Matrices**: Comparative analysis (Central vs State, Pros vs Cons, Before vs After)
+- **🔄 Flowcharts**: Policy implementation flows (Scheme → Implementation → Monitoring → Impact)
+- **🗺️ Maps & Sketches**: India map, state boundaries, international borders, geographic regions
+- **🏛️ Organizational Charts**: Government structure (President → PM → Ministers → Departments)
+- **📈 Graphs/Charts**: Economic indicators, demographic trends, statistical data presentation
+- **⏰ Timelines**: Historical evolution (1947→1991→2014→2024), policy development phases
+- **🧠 Mind Maps**: Concept interconnections, cause-effect relationships, issue-solution mapping
+- **⚖️ Constitutional Diagrams**: Article relationships, fundamental rights structure, separation of powers
+- **🌐 Process Diagrams**: Economic frameworks, international relations, administrative procedures
+- **📋 Bullet Points & Lists**: Structured presentation of multiple points, schemes, policies
+
+🔍 **EXTRACT WITH MAXIMUM PRECISION**:
+
+**1. UPSC QUESTIONS** (Look for ANY of these question numbering patterns):
+   - **Question Numbers**: Recognize ANY format like:
+     * Standard: "1.", "2.", "3.", "Question 1.", "Question 2."
+     * Abbreviated: "Q1.", "Q2.", "Q3.", "Que1.", "Que2."
+     * Parentheses: "1)", "2)", "3)", "(1)", "(2)", "(3)"
+     * Circled: "①", "②", "③" or numbers inside circles/boxes
+     * Alternative: "1/", "Q1/", "Que1/" or any numbering variation
+   - **Complete Question Text**: Extract entire question including ALL sub-parts: (a), (b), (c), (d)
+   - **Word Limits**: "(150 words)", "(250 words)", "(300 words)", "word limit: 150"
+   - **Marks Allocation**: "[10 marks]", "(15 marks)", "20M", "marks: 10"
+   - **UPSC Keywords**: "Discuss", "Analyze", "Examine", "Critically evaluate", "Comment", "Elaborate"
+
+**2. STUDENT HANDWRITTEN ANSWERS** (Comprehensive Extraction):
+
+   **📝 TEXTUAL CONTENT** (Extract ALL readable text):
+   - Complete paragraphs with policy analysis and constitutional references
+   - **Government Schemes**: PM-KISAN, MGNREGA, POSHAN, Digital India, Ayushman Bharat, PLI schemes
+   - **Constitutional Articles**: Article 356, Article 370, Article 14, Article 21, DPSPs, Fundamental Rights
+   - **Legislative Acts**: RTI Act 2005, SARFAESI Act, IBC 2016, CAA, Farm Laws, GST Acts
+   - **Current Affairs**: G20 presidency, COP28, Make in India, Atmanirbhar Bharat, NEP 2020
+   - **International Relations**: QUAD, BRICS, SCO, Indo-Pacific, India-China relations, neighborhood policy
+   - **Economic Policies**: Demonetization, GST implementation, FDI policies, fiscal federalism
+   - **Social Issues**: Gender equality, caste dynamics, urbanization, digital divide, healthcare access
+
+   **🎨 VISUAL ELEMENTS** (Detailed Description Required):
+   - **Tables**: "3x4 table comparing Centre vs State functions with examples in each cell"
+   - **Flowcharts**: "5-step flowchart: Policy Formulation → Approval → Implementation → Monitoring → Evaluation"
+   - **Maps**: "Hand-drawn India map highlighting northeastern states with state names labeled"
+   - **Organizational Charts**: "Government hierarchy: President → PM → Council of Ministers → Secretaries"
+   - **Timelines**: "1947 Independence → 1991 Liberalization → 2014 Digital India → 2020 Atmanirbhar"
+   - **Statistical Charts**: "Bar graph showing GDP growth 2019-2024 with percentages"
+   - **Mind Maps**: "Central concept 'Federalism' with 6 branches: fiscal, administrative, legislative, judicial, cooperative, competitive"
+
+   **🔗 CRITICAL: ANSWER CONTINUATION TRACKING**:
+   - If page contains answer text but NO question number → This is ANSWER CONTINUATION
+   - Analyze content context to determine which question this continues (policy area, constitutional topic, etc.)
+   - MANDATORY: Every answer must have "linked_to_question" populated (make intelligent guess based on content)
+   - Look for content clues: same policy area, similar constitutional themes, continuation phrases
+
+**3. CONTENT QUALITY MARKERS** (Identify these UPSC-specific indicators):
+   - **Policy Analysis Depth**: Mentions of implementation challenges, multi-stakeholder approach
+   - **Constitutional Knowledge**: Accurate article references, landmark case citations
+   - **Current Affairs Integration**: Recent developments, committee reports, government initiatives
+   - **Balanced Perspective**: Pros/cons analysis, multiple viewpoints consideration
+   - **Solution-Oriented Approach**: Way forward suggestions, policy recommendations
+
+📋 **RESPOND IN EXACT JSON FORMAT**:
+{
+    "page_number": NUMBER,
+    "has_questions": true/false,
+    "has_answers": true/false,
+    "questions_found": [
+        {
+            "question_number": NUMBER,
+            "question_text": "COMPLETE_QUESTION_INCLUDING_ALL_SUBPARTS_AND_INSTRUCTIONS",
+            "word_limit": NUMBER,
+            "marks": NUMBER,
+            "confidence": "high/medium/low",
+            "upsc_topic_area": "polity/economics/society/geography/international_relations/current_affairs/ethics",
+            "question_type": "analytical/descriptive/compare_contrast/case_study/evaluate",
+            "handwriting_quality": "clear/moderate/difficult"
+        }
+    ],
+    "answers_found": [
+        {
+            "question_number": NUMBER_OR_NULL_IF_CONTINUATION,
+            "answer_text": "COMPLETE_HANDWRITTEN_TEXT_WITH_DETAILED_VISUAL_ELEMENT_DESCRIPTIONS",
+            "linked_to_question": ALWAYS_POPULATE_THIS_FIELD_EVEN_IF_GUESS,
+            "is_continuation": true/false,
+            "has_diagrams": true/false,
+            "visual_elements": ["table", "flowchart", "map", "timeline", "organizational_chart", "mind_map", "graph", "bullet_points"],
+            "upsc_content_markers": ["constitutional_articles", "government_schemes", "current_affairs", "policy_analysis", "international_agreements", "case_studies"],
+            "content_quality_indicators": ["analytical_depth", "examples_provided", "current_affairs_integration", "balanced_perspective", "solution_oriented"],
+            "handwriting_quality": "clear/moderate/difficult", 
+            "estimated_word_count": NUMBER,
+            "confidence": "high/medium/low",
+            "page_position": "top/middle/bottom",
+            "upsc_topic_area": "polity/economics/society/geography/international_relations/current_affairs"
+        }
+    ],
+    "page_analysis": {
+        "content_type": "questions/answers/mixed/instructions/blank",
+        "visual_complexity": "simple/moderate/complex",
+        "upsc_content_quality": "excellent/good/average/poor",
+        "handwriting_assessment": "Overall readability assessment",
+        "academic_rigor": "high/medium/low",
+        "upsc_indicators": ["constitutional_knowledge", "policy_awareness", "current_affairs", "analytical_thinking", "structured_presentation"],
+        "notes": "Specific observations about UPSC answer quality, presentation style, and content depth"
+    }
+}
+
+🎯 **MANDATORY REQUIREMENTS**:
+1. **ANSWER LINKING**: Every answer MUST have "linked_to_question" populated (analyze content if unclear)
+2. **Visual Integration**: Describe ALL visual elements as part of answer text for complete evaluation  
+3. **UPSC Specificity**: Extract exact policy names, constitutional articles, scheme details, current affairs
+4. **Continuation Handling**: For answers without question numbers, analyze content topic and intelligently link
+5. **MULTI-PAGE DETECTION**: Look for incomplete sentences, abrupt endings, or "(continued)" markers that indicate answer continues on next page
+6. **COMPLETE TEXT EXTRACTION**: Extract ALL handwritten text, even if it appears to be continuation from previous page
+
+**CRITICAL: MULTI-PAGE ANSWER DETECTION**:
+- UPSC answers often span 2-3 pages (10 marks = 2 pages, 15 marks = 3 pages)
+- Look for answers that end mid-sentence or without proper conclusion
+- Check if handwriting continues at page bottom without clear ending
+- Mark "is_continuation": true for answer parts that continue previous content
+- For continuation pages: analyze content topic to link to correct question number
+
+**SPECIAL INSTRUCTIONS FOR CONTINUATION PAGES**:
+- If answer text exists but no question number visible, examine the content closely
+- Look for policy continuity, constitutional themes, or topic consistency with previous pages
+- Make intelligent linking based on subject matter (e.g., Article 356 content → governance question)
+- Populate "linked_to_question" with your best analysis-based guess
+- Extract COMPLETE text even if it starts mid-sentence (continuation from previous page)"""
+
 class ProgressTracker:
     """Track and report processing progress with time estimates"""
     
@@ -260,155 +449,33 @@ class VisionPDFProcessor:
             return ""
     
     async def analyze_page_with_vision(self, page_image: str, page_num: int) -> Dict:
-        """Analyze a single page using vision-capable LLM with enhanced UPSC-specific prompt"""
+        """Analyze a single page using vision-capable LLM with enhanced UPSC-specific prompt
+        
+        Pages whose image was analyzed before (same prompt version and model) are served
+        from the page cache without calling the LLM.
+        """
+        cache_path = _page_cache_path(page_image)
+        cached = _load_cached_page(cache_path)
+        if cached is not None:
+            analysis = json.loads(cached)
+            analysis["page_number"] = page_num
+            logger.info(f"♻️ Using cached vision analysis for page {page_num}")
+            return analysis
         
-        vision_prompt = """🎓 **UPSC MAINS HANDWRITTEN ANSWER BOOKLET ANALYZER** 🎓
-
-You are analyzing a **HANDWRITTEN UPSC Civil Services Mains exam answer booklet** written by competitive exam students. This is a comprehensive evaluation of student responses on Indian governance, polity, economics, society, international relations, and current affairs.
-
-🎯 **CRITICAL CONTEXT**: 
-- This is a **STUDENT'S HANDWRITTEN ANSWER BOOKLET** for UPSC CSE Mains exam
-- Students write detailed analytical responses across multiple pages for each question
-- Answers demonstrate policy understanding, constitutional knowledge, and current affairs integration
-- Students frequently use visual aids (diagrams, flowcharts, tables, maps) to enhance their presentation
-- Handwriting varies from clear to moderate difficulty - extract ALL visible content
-
-📊 **VISUAL ELEMENTS STUDENTS COMMONLY INCLUDE**:
-- **📊 Tables/Matrices**: Comparative analysis (Central vs State, Pros vs Cons, Before vs After)
-- **🔄 Flowcharts**: Policy implementation flows (Scheme → Implementation → Monitoring → Impact)
-- **🗺️ Maps & Sketches**: India map, state boundaries, international borders, geographic regions
-- **🏛️ Organizational Charts**: Government structure (President → PM → Ministers → Departments)
-- **📈 Graphs/Charts**: Economic indicators, demographic trends, statistical data presentation
-- **⏰ Timelines**: Historical evolution (1947→1991→2014→2024), policy development phases
-- **🧠 Mind Maps**: Concept interconnections, cause-effect relationships, issue-solution mapping
-- **⚖️ Constitutional Diagrams**: Article relationships, fundamental rights structure, separation of powers
-- **🌐 Process Diagrams**: Economic frameworks, international relations, administrative procedures
-- **📋 Bullet Points & Lists**: Structured presentation of multiple points, schemes, policies
-
-🔍 **EXTRACT WITH MAXIMUM PRECISION**:
-
-**1. UPSC QUESTIONS** (Look for ANY of these question numbering patterns):
-   - **Question Numbers**: Recognize ANY format like:
-     * Standard: "1.", "2.", "3.", "Question 1.", "Question 2."
-     * Abbreviated: "Q1.", "Q2.", "Q3.", "Que1.", "Que2."
-     * Parentheses: "1)", "2)", "3)", "(1)", "(2)", "(3)"
-     * Circled: "①", "②", "③" or numbers inside circles/boxes
-     * Alternative: "1/", "Q1/", "Que1/" or any numbering variation
-   - **Complete Question Text**: Extract entire question including ALL sub-parts: (a), (b), (c), (d)
-   - **Word Limits**: "(150 words)", "(250 words)", "(300 words)", "word limit: 150"
-   - **Marks Allocation**: "[10 marks]", "(15 marks)", "20M", "marks: 10"
-   - **UPSC Keywords**: "Discuss", "Analyze", "Examine", "Critically evaluate", "Comment", "Elaborate"
-
-**2. STUDENT HANDWRITTEN ANSWERS** (Comprehensive Extraction):
-
-   **📝 TEXTUAL CONTENT** (Extract ALL readable text):
-   - Complete paragraphs with policy analysis and constitutional references
-   - **Government Schemes**: PM-KISAN, MGNREGA, POSHAN, Digital India, Ayushman Bharat, PLI schemes
-   - **Constitutional Articles**: Article 356, Article 370, Article 14, Article 21, DPSPs, Fundamental Rights
-   - **Legislative Acts**: RTI Act 2005, SARFAESI Act, IBC 2016, CAA, Farm Laws, GST Acts
-   - **Current Affairs**: G20 presidency, COP28, Make in India, Atmanirbhar Bharat, NEP 2020
-   - **International Relations**: QUAD, BRICS, SCO, Indo-Pacific, India-China relations, neighborhood policy
-   - **Economic Policies**: Demonetization, GST implementation, FDI policies, fiscal federalism
-   - **Social Issues**: Gender equality, caste dynamics, urbanization, digital divide, healthcare access
-
-   **🎨 VISUAL ELEMENTS** (Detailed Description Required):
-   - **Tables**: "3x4 table comparing Centre vs State functions with examples in each cell"
-   - **Flowcharts**: "5-step flowchart: Policy Formulation → Approval → Implementation → Monitoring → Evaluation"
-   - **Maps**: "Hand-drawn India map highlighting northeastern states with state names labeled"
-   - **Organizational Charts**: "Government hierarchy: President → PM → Council of Ministers → Secretaries"
-   - **Timelines**: "1947 Independence → 1991 Liberalization → 2014 Digital India → 2020 Atmanirbhar"
-   - **Statistical Charts**: "Bar graph showing GDP growth 2019-2024 with percentages"
-   - **Mind Maps**: "Central concept 'Federalism' with 6 branches: fiscal, administrative, legislative, judicial, cooperative, competitive"
-
-   **🔗 CRITICAL: ANSWER CONTINUATION TRACKING**:
-   - If page contains answer text but NO question number → This is ANSWER CONTINUATION
-   - Analyze content context to determine which question this continues (policy area, constitutional topic, etc.)
-   - MANDATORY: Every answer must have "linked_to_question" populated (make intelligent guess based on content)
-   - Look for content clues: same policy area, similar constitutional themes, continuation phrases
-
-**3. CONTENT QUALITY MARKERS** (Identify these UPSC-specific indicators):
-   - **Policy Analysis Depth**: Mentions of implementation challenges, multi-stakeholder approach
-   - **Constitutional Knowledge**: Accurate article references, landmark case citations
-   - **Current Affairs Integration**: Recent developments, committee reports, government initiatives
-   - **Balanced Perspective**: Pros/cons analysis, multiple viewpoints consideration
-   - **Solution-Oriented Approach**: Way forward suggestions, policy recommendations
-
-📋 **RESPOND IN EXACT JSON FORMAT**:
-{
-    "page_number": NUMBER,
-    "has_questions": true/false,
-    "has_answers": true/false,
-    "questions_found": [
-        {
-            "question_number": NUMBER,
-            "question_text": "COMPLETE_QUESTION_INCLUDING_ALL_SUBPARTS_AND_INSTRUCTIONS",
-            "word_limit": NUMBER,
-            "marks": NUMBER,
-            "confidence": "high/medium/low",
-            "upsc_topic_area": "polity/economics/society/geography/international_relations/current_affairs/ethics",
-            "question_type": "analytical/descriptive/compare_contrast/case_study/evaluate",
-            "handwriting_quality": "clear/moderate/difficult"
-        }
-    ],
-    "answers_found": [
-        {
-            "question_number": NUMBER_OR_NULL_IF_CONTINUATION,
-            "answer_text": "COMPLETE_HANDWRITTEN_TEXT_WITH_DETAILED_VISUAL_ELEMENT_DESCRIPTIONS",
-            "linked_to_question": ALWAYS_POPULATE_THIS_FIELD_EVEN_IF_GUESS,
-            "is_continuation": true/false,
-            "has_diagrams": true/false,
-            "visual_elements": ["table", "flowchart", "map", "timeline", "organizational_chart", "mind_map", "graph", "bullet_points"],
-            "upsc_content_markers": ["constitutional_articles", "government_schemes", "current_affairs", "policy_analysis", "international_agreements", "case_studies"],
-            "content_quality_indicators": ["analytical_depth", "examples_provided", "current_affairs_integration", "balanced_perspective", "solution_oriented"],
-            "handwriting_quality": "clear/moderate/difficult", 
-            "estimated_word_count": NUMBER,
-            "confidence": "high/medium/low",
-            "page_position": "top/middle/bottom",
-            "upsc_topic_area": "polity/economics/society/geography/international_relations/current_affairs"
-        }
-    ],
-    "page_analysis": {
-        "content_type": "questions/answers/mixed/instructions/blank",
-        "visual_complexity": "simple/moderate/complex",
-        "upsc_content_quality": "excellent/good/average/poor",
-        "handwriting_assessment": "Overall readability assessment",
-        "academic_rigor": "high/medium/low",
-        "upsc_indicators": ["constitutional_knowledge", "policy_awareness", "current_affairs", "analytical_thinking", "structured_presentation"],
-        "notes": "Specific observations about UPSC answer quality, presentation style, and content depth"
-    }
-}
-
-🎯 **MANDATORY REQUIREMENTS**:
-1. **ANSWER LINKING**: Every answer MUST have "linked_to_question" populated (analyze content if unclear)
-2. **Visual Integration**: Describe ALL visual elements as part of answer text for complete evaluation  
-3. **UPSC Specificity**: Extract exact policy names, constitutional articles, scheme details, current affairs
-4. **Continuation Handling**: For answers without question numbers, analyze content topic and intelligently link
-5. **MULTI-PAGE DETECTION**: Look for incomplete sentences, abrupt endings, or "(continued)" markers that indicate answer continues on next page
-6. **COMPLETE TEXT EXTRACTION**: Extract ALL handwritten text, even if it appears to be continuation from previous page
-
-**CRITICAL: MULTI-PAGE ANSWER DETECTION**:
-- UPSC answers often span 2-3 pages (10 marks = 2 pages, 15 marks = 3 pages)
-- Look for answers that end mid-sentence or without proper conclusion
-- Check if handwriting continues at page bottom without clear ending
-- Mark "is_continuation": true for answer parts that continue previous content
-- For continuation pages: analyze content topic to link to correct question number
-
-**SPECIAL INSTRUCTIONS FOR CONTINUATION PAGES**:
-- If answer text exists but no question number visible, examine the content closely
-- Look for policy continuity, constitutional themes, or topic consistency with previous pages
-- Make intelligent linking based on subject matter (e.g., Article 356 content → governance question)
-- Populate "linked_to_question" with your best analysis-based guess
-- Extract COMPLETE text even if it starts mid-sentence (continuation from previous page)"""
-
         try:
-            # Create message for vision API
+            # Instructions go first as a byte-identical system message so the provider's
+            # prompt cache can reuse them; only the page image changes between calls
             messages = [
+                {
+                    "role": "system",
+                    "content": VISION_PAGE_PROMPT
+                },
                 {
                     "role": "user",
                     "content": [
                         {
                             "type": "text",
-                            "text": vision_prompt
+                            "text": f"Analyze answer booklet page {page_num}."
                         },
                         {
                             "type": "image_url",
@@ -423,15 +490,17 @@ You are analyzing a **HANDWRITTEN UPSC Civil Services Mains exam answer booklet*
             # Use vision chat for analysis with correct model
             response = await self.llm_service.vision_chat(
                 messages=messages,
-                model="gpt-4.1-mini",  # Use the same model as regular chat for Walmart Gateway
-                temperature=0.1,
-                max_tokens=6000  # Increased from 2000 to 6000 for comprehensive vision analysis
+                model=VISION_MODEL,
+                temperature=VISION_TEMPERATURE,
+                max_tokens=VISION_MAX_TOKENS_PER_PAGE  # Increased from 2000 to 6000 for comprehensive vision analysis
             )
             
             # Parse JSON response
             try:
                 analysis = json.loads(response)
                 analysis["page_number"] = page_num
+                # Only parseable responses are cached; a malformed one is retried next run
+                _store_cached_page(cache_path, response)
                 return analysis
             except json.JSONDecodeError:
                 logger.warning(f"Failed to parse JSON for page {page_num}, using fallback")
@@ -455,6 +524,159 @@ You are analyzing a **HANDWRITTEN UPSC Civil Services Mains exam answer booklet*
                 "page_analysis": {"content_type": "error", "notes": f"Analysis failed: {str(e)}"}
             }
     
+    @staticmethod
+    def is_blank_page(page) -> bool:
+        """True when a page has (almost) no ink, judged from a full-scale grayscale render
+        
+        Downscaled renders blur thin strokes to light gray, so the check renders at 1x.
+        """
+        try:
+            pix = page.get_pixmap(matrix=fitz.Matrix(1.0, 1.0), colorspace=fitz.csGRAY, alpha=False)
+            samples = pix.samples
+            if not samples:
+                return False
+            ink_pixels = len(samples) - len(samples.translate(None, _INK_GRAY_LEVELS))
+            return ink_pixels / len(samples) < BLANK_PAGE_INK_RATIO
+        except Exception as e:
+            logger.debug(f"Blank page check failed, sending page to the LLM: {e}")
+            return False
+    
+    @staticmethod
+    def _blank_page_analysis(page_num: int) -> Dict:
+        return {
+            "page_number": page_num,
+            "has_questions": False,
+            "has_answers": False,
+            "questions_found": [],
+            "answers_found": [],
+            "page_analysis": {"content_type": "blank", "notes": "No writing detected; skipped vision analysis"}
+        }
+    
+    async def analyze_pages_batch(self, pages: List[Tuple[int, str]]) -> List[Dict]:
+        """Analyze several consecutive (page_num, page_image) pages with one vision request
+        
+        Cached pages are served from the page cache. The rest are sent together and the
+        model returns {"results": [...]} with one page analysis each; if the batch response
+        is unusable, its pages are analyzed one by one. Results keep the input order.
+        """
+        results: List[Optional[Dict]] = [None] * len(pages)
+        pending = []  # (index, page_num, page_image, cache_path)
+        for i, (page_num, page_image) in enumerate(pages):
+            cache_path = _page_cache_path(page_image)
+            cached = _load_cached_page(cache_path)
+            if cached is not None:
+                results[i] = json.loads(cached)
+                results[i]["page_number"] = page_num
+            else:
+                pending.append((i, page_num, page_image, cache_path))
+        
+        if len(pending) == 1:
+            i, page_num, page_image, _ = pending[0]
+            results[i] = await self.analyze_page_with_vision(page_image, page_num)
+        elif pending:
+            page_list = ", ".join(str(page_num) for _, page_num, _, _ in pending)
+            content = [{
+                "type": "text",
+                "text": (f"Analyze answer booklet pages {page_list}, given in order below. Respond with "
+                         f'{{"results": [...]}} holding one page object in the format above per page, in the same order.')
+            }]
+            for _, page_num, page_image, _ in pending:
+                content.append({"type": "text", "text": f"Page {page_num}:"})
+                content.append({"type": "image_url", "image_url": {"url": f"data:image/png;base64,{page_image}"}})
+            
+            page_results = []
+            try:
+                response = await self.llm_service.vision_chat(
+                    messages=[
+                        {"role": "system", "content": VISION_PAGE_PROMPT},
+                        {"role": "user", "content": content}
+                    ],
+                    model=VISION_MODEL,
+                    temperature=VISION_TEMPERATURE,
+                    max_tokens=min(VISION_MAX_TOKENS_PER_PAGE * len(pending), VISION_BATCH_MAX_TOKENS)
+                )
+                parsed = json.loads(response)
+                page_results = parsed.get("results", []) if isinstance(parsed, dict) else parsed
+            except Exception as e:
+                logger.warning(f"Batch vision analysis failed for pages {page_list}: {e}")
+            
+            if len(page_results) == len(pending) and all(isinstance(r, dict) for r in page_results):
+                for (i, page_num, _, cache_path), analysis in zip(pending, page_results):
+                    analysis["page_number"] = page_num
+                    _store_cached_page(cache_path, json.dumps(analysis))
+                    results[i] = analysis
+            else:
+                logger.warning(f"Unusable batch response for pages {page_list}, analyzing them one by one")
+                singles = await asyncio.gather(*(
+                    self.analyze_page_with_vision(page_image, page_num) for _, page_num, page_image, _ in pending
+                ))
+                for (i, _, _, _), analysis in zip(pending, singles):
+                    results[i] = analysis
+        
+        return results
+    
+    async def _analyze_pages(self, doc, progress_tracker: ProgressTracker) -> Tuple[List[Dict], int, int]:
+        """Render and vision-analyze every page
+        
+        Pages go out VISION_PAGES_PER_REQUEST to a request, with up to VISION_PAGE_CONCURRENCY
+        requests in flight. Returns (page_analyses in page order, questions_found,
+        answers_found). Pages that fail to render or raise are reported through progress
+        and left out.
+        """
+        semaphore = asyncio.Semaphore(VISION_PAGE_CONCURRENCY)
+        completed = 0
+        
+        async def analyze_group(page_nums: List[int]) -> List[Optional[Dict]]:
+            nonlocal completed
+            analyses: List[Optional[Dict]] = [None] * len(page_nums)
+            error = None
+            try:
+                async with semaphore:
+                    # Render inside the semaphore to bound the number of page images in memory
+                    rendered = []  # (index, current_page, page_image)
+                    for index, page_num in enumerate(page_nums):
+                        page = doc[page_num]
+                        if self.is_blank_page(page):
+                            analyses[index] = self._blank_page_analysis(page_num + 1)
+                            continue
+                        page_image = self.convert_page_to_image(page)
+                        if page_image:
+                            rendered.append((index, page_num + 1, page_image))
+                    if rendered:
+                        batch = await self.analyze_pages_batch([(current_page, image) for _, current_page, image in rendered])
+                        for (index, _, _), analysis in zip(rendered, batch):
+                            analyses[index] = analysis
+            except Exception as e:
+                logger.error(f"Error processing pages {page_nums[0] + 1}-{page_nums[-1] + 1}: {e}")
+                error = str(e)[:50]
+            
+            for page_num, analysis in zip(page_nums, analyses):
+                current_page = page_num + 1
+                if error is not None:
+                    details = f"Error on page {current_page}: {error}"
+                elif analysis is None:
+                    details = f"Failed to process page {current_page}"
+                else:
+                    page_questions = len(analysis.get("questions_found", []))
+                    page_answers = len(analysis.get("answers_found", []))
+                    if page_questions > 0 or page_answers > 0:
+                        details = f"Page {current_page}: found {page_questions} questions, {page_answers} answers"
+                    else:
+                        details = f"Page {current_page}: no content detected"
+                
+                # Groups finish out of order, so progress counts completed pages
+                completed += 1
+                await progress_tracker.update_progress("page_processing", current_page=completed, details=details)
+            return analyses
+        
+        page_nums = list(range(len(doc)))
+        groups = [page_nums[i:i + VISION_PAGES_PER_REQUEST] for i in range(0, len(page_nums), VISION_PAGES_PER_REQUEST)]
+        group_results = await asyncio.gather(*(analyze_group(group) for group in groups))
+        page_analyses = [analysis for analyses in group_results for analysis in analyses if analysis is not None]
+        questions_found = sum(len(analysis.get("questions_found", [])) for analysis in page_analyses)
+        answers_found = sum(len(analysis.get("answers_found", [])) for analysis in page_analyses)
+        return page_analyses, questions_found, answers_found
+    
     def match_questions_to_answers(self, all_analyses: List[Dict]) -> List[Dict]:
         """Enhanced question-answer matching with improved continuation handling"""
         
@@ -775,73 +997,26 @@ You are analyzing a **HANDWRITTEN UPSC Civil Services Mains exam answer booklet*
         if not os.path.exists(file_path):
             raise FileNotFoundError(f"PDF not found: {file_path}")
         
-        # Open PDF and get basic info
+        # Open PDF once; every page render below shares this handle
         doc = fitz.open(file_path)
-        self.total_pages = len(doc)
-        pdf_filename = os.path.basename(file_path)
-        file_size_bytes = os.path.getsize(file_path)
-        file_size_mb = file_size_bytes / (1024 * 1024)
+        try:
+            self.total_pages = len(doc)
+            pdf_filename = os.path.basename(file_path)
+            file_size_bytes = os.path.getsize(file_path)
+            file_size_mb = file_size_bytes / (1024 * 1024)
         
-        # Initialize progress tracker
-        progress_tracker = ProgressTracker(self.total_pages, progress_callback)
-        estimated_minutes = progress_tracker.estimate_total_time()
+            # Initialize progress tracker
+            progress_tracker = ProgressTracker(self.total_pages, progress_callback)
+            estimated_minutes = progress_tracker.estimate_total_time()
         
-        # Log initial setup
-        logger.info(f"📄 VISION-ONLY: Starting processing: {pdf_filename} ({self.total_pages} pages, {file_size_mb:.1f} MB)")
-        await progress_tracker.update_progress("initializing", details=f"{pdf_filename} - Vision extraction only")
+            # Log initial setup
+            logger.info(f"📄 VISION-ONLY: Starting processing: {pdf_filename} ({self.total_pages} pages, {file_size_mb:.1f} MB)")
+            await progress_tracker.update_progress("initializing", details=f"{pdf_filename} - Vision extraction only")
         
-        # Phase 1: Process each page with vision analysis (NO COMPREHENSIVE EVALUATION)
-        page_analyses = []
-        questions_found = 0
-        answers_found = 0
-        
-        for page_num in range(self.total_pages):
-            try:
-                current_page = page_num + 1
-                page = doc[page_num]
-                
-                await progress_tracker.update_progress("page_processing", current_page=current_page, 
-                                                details=f"Converting page {current_page} to image")
-                
-                # Convert page to image
-                page_image = self.convert_page_to_image(page)
-                
-                if page_image:
-                    await progress_tracker.update_progress("page_processing", current_page=current_page,
-                                                   details=f"Analyzing page {current_page} with Vision AI")
-                    
-                    # Analyze with vision LLM (only for question/answer detection)
-                    analysis = await self.analyze_page_with_vision(page_image, current_page)
-                    page_analyses.append(analysis)
-                    
-                    # Count content found
-                    page_questions = len(analysis.get("questions_found", []))
-                    page_answers = len(analysis.get("answers_found", []))
-                    questions_found += page_questions
-                    answers_found += page_answers
-                    
-                    # Update progress with findings
-                    if page_questions > 0 or page_answers > 0:
-                        details = f"Found {page_questions} questions, {page_answers} answers"
-                    else:
-                        details = "No content detected on this page"
-                    
-                    await progress_tracker.update_progress("page_processing", current_page=current_page, details=details)
-                    
-                    # Add delay between pages to prevent rate limiting
-                    if current_page < self.total_pages:  # Don't delay after last page
-                        await asyncio.sleep(2.0)  # 2 second delay between pages
-                    
-                else:
-                    await progress_tracker.update_progress("page_processing", current_page=current_page,
-                                                   details=f"Failed to process page {current_page}")
-                    
-            except Exception as e:
-                logger.error(f"Error processing page {current_page}: {e}")
-                await progress_tracker.update_progress("page_processing", current_page=current_page,
-                                               details=f"Error on page {current_page}: {str(e)[:50]}")
-        
-        doc.close()
+            # Phase 1: Process each page with vision analysis (NO COMPREHENSIVE EVALUATION)
+            page_analyses, questions_found, answers_found = await self._analyze_pages(doc, progress_tracker)
+        finally:
+            doc.close()  # also on errors, so a failed run doesn't leak the file handle
         
         # Phase 2: Extract and consolidate questions (NO EVALUATION)
         await progress_tracker.update_progress("question_extraction", current_page=0,
@@ -914,73 +1089,26 @@ You are analyzing a **HANDWRITTEN UPSC Civil Services Mains exam answer booklet*
         if not os.path.exists(file_path):
             raise FileNotFoundError(f"PDF not found: {file_path}")
         
-        # Open PDF and get basic info
+        # Open PDF once; every page render below shares this handle
         doc = fitz.open(file_path)
-        self.total_pages = len(doc)
-        pdf_filename = os.path.basename(file_path)
-        file_size_bytes = os.path.getsize(file_path)
-        file_size_mb = file_size_bytes / (1024 * 1024)
-        
-        # Initialize progress tracker
-        progress_tracker = ProgressTracker(self.total_pages, self.progress_callback)
-        estimated_minutes = progress_tracker.estimate_total_time()
-        
-        # Log initial setup
-        logger.info(f"📄 Starting processing: {pdf_filename} ({self.total_pages} pages, {file_size_mb:.1f} MB)")
-        await progress_tracker.update_progress("initializing", details=f"{pdf_filename} - {estimated_minutes} minutes estimated")
-        
-        # Phase 1: Process each page with vision analysis
-        page_analyses = []
-        questions_found = 0
-        answers_found = 0
-        
-        for page_num in range(self.total_pages):
-            try:
-                current_page = page_num + 1
-                page = doc[page_num]
-                
-                await progress_tracker.update_progress("page_processing", current_page=current_page, 
-                                                details=f"Converting page {current_page} to image")
-                
-                # Convert page to image
-                page_image = self.convert_page_to_image(page)
-                
-                if page_image:
-                    await progress_tracker.update_progress("page_processing", current_page=current_page,
-                                                   details=f"Analyzing page {current_page} with Vision AI")
-                    
-                    # Analyze with vision LLM
-                    analysis = await self.analyze_page_with_vision(page_image, current_page)
-                    page_analyses.append(analysis)
-                    
-                    # Count content found
-                    page_questions = len(analysis.get("questions_found", []))
-                    page_answers = len(analysis.get("answers_found", []))
-                    questions_found += page_questions
-                    answers_found += page_answers
-                    
-                    # Update progress with findings
-                    if page_questions > 0 or page_answers > 0:
-                        details = f"Found {page_questions} questions, {page_answers} answers"
-                    else:
-                        details = "No content detected on this page"
-                    
-                    await progress_tracker.update_progress("page_processing", current_page=current_page, details=details)
-                    
-                    # Add delay between pages to prevent rate limiting
-                    if current_page < self.total_pages:  # Don't delay after last page
-                        await asyncio.sleep(2.0)  # 2 second delay between pages
-                    
-                else:
-                    await progress_tracker.update_progress("page_processing", current_page=current_page,
-                                                   details=f"Failed to process page {current_page}")
-                    
-            except Exception as e:
-                logger.error(f"Error processing page {current_page}: {e}")
-                await progress_tracker.update_progress("page_processing", current_page=current_page,
-                                               details=f"Error on page {current_page}: {str(e)[:50]}")
-        
-        doc.close()
+        try:
+            self.total_pages = len(doc)
+            pdf_filename = os.path.basename(file_path)
+            file_size_bytes = os.path.getsize(file_path)
+            file_size_mb = file_size_bytes / (1024 * 1024)
+        
+            # Initialize progress tracker
+            progress_tracker = ProgressTracker(self.total_pages, self.progress_callback)
+            estimated_minutes = progress_tracker.estimate_total_time()
+        
+            # Log initial setup
+            logger.info(f"📄 Starting processing: {pdf_filename} ({self.total_pages} pages, {file_size_mb:.1f} MB)")
+            await progress_tracker.update_progress("initializing", details=f"{pdf_filename} - {estimated_minutes} minutes estimated")
+        
+            # Phase 1: Process each page with vision analysis
+            page_analyses, questions_found, answers_found = await self._analyze_pages(doc, progress_tracker)
+        finally:
+            doc.close()  # also on errors, so a failed run doesn't leak the file handle
         
         # Phase 2: Extract and consolidate questions
         await progress_tracker.update_progress("question_extraction", current_page=0,
@@ -6,16 +6,18 @@ Each node is a standalone function that can be tested and modified independently
 import os
 import logging
 import asyncio
+from collections import OrderedDict
 from datetime import datetime
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 
 # Import existing services (maintaining compatibility)
 from app.utils.vision_pdf_processor import VisionPDFProcessor
 from app.api.llm_endpoints import comprehensive_question_analysis_direct
 from app.services.topper_analysis_service import TopperAnalysisService
-from app.core.llm_service import get_llm_service
+from app.core.llm_service import get_llm_service, is_transient_llm_error
 from app.crud.answer import create_answer_evaluation
 from app.schemas.answer import AnswerEvaluationCreate
+from app.core.workflow_config import WorkflowConfig as AppWorkflowConfig
 
 from .pdf_evaluation_state import (
     PDFEvaluationState, 
@@ -45,6 +47,81 @@ def get_progress_callback(config):
         return None
     return config["configurable"].get("progress_callback")
 
+
+def normalize_progress_callback(callback):
+    """
+    Wrap a progress callback so it can always be awaited.
+    Checked once per workflow run instead of at every callback site.
+    """
+    if callback is None or asyncio.iscoroutinefunction(callback):
+        return callback
+    
+    async def _async_callback(callback_data):
+        return callback(callback_data)
+    
+    return _async_callback
+
+# Page counts of recently validated PDFs, keyed by (path, size, mtime) (LRU)
+_VALIDATION_CACHE: "OrderedDict[Tuple[str, int, int], int]" = OrderedDict()
+_VALIDATION_CACHE_MAX = 128
+
+def _read_page_count(file_path: str) -> int:
+    """Open the PDF just long enough to read its page count (runs in a worker thread)"""
+    import fitz  # PyMuPDF
+    doc = fitz.open(file_path)
+    try:
+        return len(doc)
+    finally:
+        doc.close()
+
+async def _count_pdf_pages(file_path: str) -> int:
+    """Page count for a PDF, cached by (path, size, mtime) so a rewritten file is read again"""
+    stat = os.stat(file_path)
+    key = (file_path, stat.st_size, stat.st_mtime_ns)
+    
+    page_count = _VALIDATION_CACHE.get(key)
+    if page_count is not None:
+        _VALIDATION_CACHE.move_to_end(key)
+        return page_count
+    
+    # Reading the page count takes ~1 ms, so a thread keeps it off the loop without forking the app
+    page_count = await asyncio.to_thread(_read_page_count, file_path)
+    
+    _VALIDATION_CACHE[key] = page_count
+    if len(_VALIDATION_CACHE) > _VALIDATION_CACHE_MAX:
+        _VALIDATION_CACHE.popitem(last=False)
+    return page_count
+
+async def _analyze_question_with_retry(max_attempts: int = None, base_delay: float = 0.5, **analysis_kwargs) -> Dict[str, Any]:
+    """
+    Run comprehensive_question_analysis_direct with exponential backoff
+    so a transient LLM failure doesn't drop the question from the evaluation;
+    the analysis reports failures as success=False results flagged "transient"
+    when retrying may help, anything else is returned/raised at once
+    """
+    max_attempts = max_attempts or AppWorkflowConfig.LANGGRAPH_MAX_RETRIES
+    question_number = analysis_kwargs.get("question_number")
+    
+    for attempt in range(max_attempts):
+        try:
+            result = await comprehensive_question_analysis_direct(**analysis_kwargs)
+        except Exception as e:
+            if attempt == max_attempts - 1 or not is_transient_llm_error(e):
+                raise
+            error = e
+        else:
+            if result.get("success"):
+                if attempt:
+                    logger.info("✅ Q%s analysis succeeded on attempt %d/%d", question_number, attempt + 1, max_attempts)
+                return result
+            if attempt == max_attempts - 1 or not result.get("transient"):
+                return result
+            error = result.get("error")
+        delay = base_delay * (2 ** attempt)
+        logger.warning("⚠️ Q%s analysis attempt %d/%d failed (%s), retrying in %.1fs",
+                       question_number, attempt + 1, max_attempts, error, delay)
+        await asyncio.sleep(delay)
+
 async def validate_pdf_node(state: PDFEvaluationState) -> PDFEvaluationState:
     """
     Node 1: Validate PDF file and initialize processing
@@ -52,33 +129,41 @@ async def validate_pdf_node(state: PDFEvaluationState) -> PDFEvaluationState:
     start_time = datetime.now()
     
     try:
-        logger.info(f"🔍 LangGraph Node 1: PDF Validation - Answer ID {state['answer_id']}")
+        logger.info("🔍 LangGraph Node 1: PDF Validation - Answer ID %s", state['answer_id'])
         
         # Update state
         state["phase"] = ProcessingPhase.PDF_VALIDATION
         state["progress"] = 5.0
         state["processing_start_time"] = start_time.isoformat()
+        state["progress_callback"] = normalize_progress_callback(state.get("progress_callback"))
         
         # Validate file existence
         if not state["file_path"] or not os.path.exists(state["file_path"]):
             error_msg = f"PDF file not found: {state['file_path']}"
             state["errors"].append(error_msg)
             state["phase"] = ProcessingPhase.ERROR
-            logger.error(f"❌ {error_msg}")
+            logger.error("❌ %s", error_msg)
             return state
         
-        # Extract basic PDF info
-        try:
-            import fitz  # PyMuPDF
-            doc = fitz.open(state["file_path"])
-            state["total_pages"] = len(doc)
-            state["pdf_filename"] = os.path.basename(state["file_path"])
-            doc.close()
-            logger.info(f"✅ PDF validated: {state['total_pages']} pages")
-        except Exception as pdf_error:
-            state["warnings"].append(f"Could not read PDF metadata: {pdf_error}")
+        # Extract basic PDF info while the LLM service initializes
+        page_count, llm_service = await asyncio.gather(
+            _count_pdf_pages(state["file_path"]),
+            asyncio.to_thread(get_llm_service),
+            return_exceptions=True
+        )
+        state["pdf_filename"] = os.path.basename(state["file_path"])
+        if isinstance(page_count, Exception):
+            state["warnings"].append(f"Could not read PDF metadata: {page_count}")
             state["total_pages"] = 1  # Default assumption
-            state["pdf_filename"] = os.path.basename(state["file_path"])
+        else:
+            state["total_pages"] = page_count
+            logger.info("✅ PDF validated: %s pages", state['total_pages'])
+        
+        if isinstance(llm_service, Exception):
+            # analyze_dimensions_node will retry initialization
+            logger.warning("LLM service prefetch failed: %s", llm_service)
+            llm_service = None
+        state["llm_service"] = llm_service
         
         # Send progress update
         if state.get("progress_callback"):
@@ -104,19 +189,16 @@ async def validate_pdf_node(state: PDFEvaluationState) -> PDFEvaluationState:
                     "total_questions": 0
                 }
                 
-                if asyncio.iscoroutinefunction(state["progress_callback"]):
-                    await state["progress_callback"](callback_data)
-                else:
-                    state["progress_callback"](callback_data)
+                await state["progress_callback"](callback_data)
             except Exception as callback_error:
-                logger.warning(f"Progress callback failed: {callback_error}")
+                logger.warning("Progress callback failed: %s", callback_error)
         
-        logger.info(f"✅ PDF validation completed in {(datetime.now() - start_time).total_seconds():.2f}s")
+        logger.info("✅ PDF validation completed in %.2fs", (datetime.now() - start_time).total_seconds())
         return state
         
     except Exception as e:
         error_msg = f"PDF validation failed: {str(e)}"
-        logger.error(f"❌ {error_msg}")
+        logger.error("❌ %s", error_msg)
         state["errors"].append(error_msg)
         state["phase"] = ProcessingPhase.ERROR
         return state
@@ -129,7 +211,7 @@ async def extract_vision_node(state: PDFEvaluationState) -> PDFEvaluationState:
     start_time = datetime.now()
     
     try:
-        logger.info(f"🔍 LangGraph Node 2: Vision Extraction - {state['pdf_filename']}")
+        logger.info("🔍 LangGraph Node 2: Vision Extraction - %s", state['pdf_filename'])
         
         # Update state
         state["phase"] = ProcessingPhase.VISION_EXTRACTION
@@ -140,12 +222,9 @@ async def extract_vision_node(state: PDFEvaluationState) -> PDFEvaluationState:
             """Wrapper to maintain compatibility with existing progress system"""
             if state.get("progress_callback"):
                 try:
-                    if asyncio.iscoroutinefunction(state["progress_callback"]):
-                        await state["progress_callback"](callback_data)
-                    else:
-                        state["progress_callback"](callback_data)
+                    await state["progress_callback"](callback_data)
                 except Exception as e:
-                    logger.warning(f"Progress callback error: {e}")
+                    logger.warning("Progress callback error: %s", e)
         
         # FIXED: Use vision extraction without comprehensive analysis to prevent duplication
         # The comprehensive analysis will be done by the analyze_dimensions_node
@@ -167,7 +246,7 @@ async def extract_vision_node(state: PDFEvaluationState) -> PDFEvaluationState:
                     question_number=q_data.get("question_number", len(questions) + 1),
                     question_text=q_data.get("question_text", "Question text not available"),
                     student_answer=q_data.get("student_answer", ""),
-                    marks=q_data.get("marks", 10) or 10,  # Fix: Ensure marks is never None
+                    marks=q_data.get("marks") or 10,  # Normalized here so marks is never None downstream
                     page_number=q_data.get("page_number", 1),
                     word_limit=q_data.get("word_limit"),
                     time_limit=q_data.get("time_limit")
@@ -176,19 +255,34 @@ async def extract_vision_node(state: PDFEvaluationState) -> PDFEvaluationState:
             
             state["questions"] = questions
             state["total_questions"] = len(questions)
-            # Fix: Handle None marks values by defaulting to 10
-            state["total_marks"] = sum(q["marks"] if q["marks"] is not None else 10 for q in questions)
+            state["total_marks"] = sum(q["marks"] for q in questions)
             state["extraction_successful"] = True
             
-            logger.info(f"✅ Vision extraction completed: {len(questions)} questions found")
+            logger.info("✅ Vision extraction completed: %s questions found", len(questions))
             
         else:
             # Fallback to simple content analysis
             logger.warning("Vision extraction failed, using fallback content analysis")
+            content = state.get("content") or ""
+            if not content.strip():
+                error_msg = "Vision extraction failed and no text content available for fallback analysis"
+                state["errors"].append(error_msg)
+                state["phase"] = ProcessingPhase.ERROR
+                logger.error("❌ %s", error_msg)
+                return state
+            
+            # Bound the fallback answer so a large PDF dump doesn't blow up LLM tokens
+            max_chars = AppWorkflowConfig.LANGGRAPH_MAX_FALLBACK_CHARS
+            if len(content) > max_chars:
+                warning_msg = f"Fallback content truncated from {len(content)} to {max_chars} characters"
+                state["warnings"].append(warning_msg)
+                logger.warning("⚠️ %s", warning_msg)
+                content = content[:max_chars]
+            
             fallback_question = QuestionData(
                 question_number=1,
                 question_text="General Answer Analysis",
-                student_answer=state["content"],
+                student_answer=content,
                 marks=15,
                 page_number=1,
                 word_limit=250,
@@ -201,17 +295,23 @@ async def extract_vision_node(state: PDFEvaluationState) -> PDFEvaluationState:
             state["extraction_successful"] = False
             state["warnings"].append("Used fallback content analysis due to vision extraction failure")
         
+        if not state.get("questions"):
+            logger.warning("🔄 No questions found, routing to error handler")
+            state["errors"].append("No questions found in PDF")
+            state["phase"] = ProcessingPhase.ERROR
+            return state
+        
         # Update progress
         state["progress"] = 40.0
         
         processing_time = (datetime.now() - start_time).total_seconds()
-        logger.info(f"✅ Vision extraction completed in {processing_time:.2f}s")
+        logger.info("✅ Vision extraction completed in %.2fs", processing_time)
         
         return state
         
     except Exception as e:
         error_msg = f"Vision extraction failed: {str(e)}"
-        logger.error(f"❌ {error_msg}")
+        logger.error("❌ %s", error_msg)
         state["errors"].append(error_msg)
         state["phase"] = ProcessingPhase.ERROR
         return state
@@ -224,109 +324,119 @@ async def analyze_dimensions_node(state: PDFEvaluationState) -> PDFEvaluationSta
     start_time = datetime.now()
     
     try:
-        logger.info(f"🔍 LangGraph Node 3: 13D Analysis - {state['total_questions']} questions")
+        logger.info("🔍 LangGraph Node 3: 13D Analysis - %s questions", state['total_questions'])
         
         # Update state
         state["phase"] = ProcessingPhase.DIMENSIONAL_ANALYSIS
         state["progress"] = 50.0
         
-        # Get LLM service
-        llm_service = get_llm_service()
+        # Reuse LLM service prefetched during validation
+        llm_service = state.get("llm_service") or get_llm_service()
         
-        # Process each question
-        evaluations = []
-        total_current_score = 0.0
-        total_max_score = 0.0
+        total_questions = state["total_questions"]
+        progress_callback = state.get("progress_callback")
         
-        for idx, question_data in enumerate(state["questions"]):
+        # Questions are analyzed concurrently, bounded so we don't flood the LLM provider
+        semaphore = asyncio.Semaphore(AppWorkflowConfig.LANGGRAPH_MAX_CONCURRENT_QUESTIONS)
+        completed = 0
+        
+        async def analyze_question(question_data: QuestionData) -> Optional[EvaluationResult]:
+            nonlocal completed
+            question_number = question_data["question_number"]
+            question_text = question_data["question_text"]
+            marks = question_data["marks"]
             try:
-                question_start = datetime.now()
-                logger.info(f"Analyzing Q{question_data['question_number']}: {question_data['question_text'][:50]}...")
+                async with semaphore:
+                    question_start = datetime.now()
+                    logger.info("Analyzing Q%s: %s...", question_number, question_text[:50])
+                    
+                    # Use existing comprehensive analysis (maintains compatibility), retrying transient failures
+                    analysis_result = await _analyze_question_with_retry(
+                        question=question_text,
+                        student_answer=question_data["student_answer"],
+                        exam_context={
+                            "marks": marks,
+                            "time_limit": question_data.get("time_limit", 20),
+                            "word_limit": question_data.get("word_limit", 250),
+                            "exam_type": "UPSC Mains"
+                        },
+                        llm_service=llm_service,
+                        question_number=str(question_number)
+                    )
                 
-                # Use existing comprehensive analysis (maintains compatibility)
-                analysis_result = await comprehensive_question_analysis_direct(
-                    question=question_data["question_text"],
-                    student_answer=question_data["student_answer"],
-                    exam_context={
-                        "marks": question_data["marks"],
-                        "time_limit": question_data.get("time_limit", 20),
-                        "word_limit": question_data.get("word_limit", 250),
-                        "exam_type": "UPSC Mains"
-                    },
-                    llm_service=llm_service,
-                    question_number=str(question_data["question_number"])
-                )
+                if not analysis_result.get("success"):
+                    error_msg = f"Analysis failed for Q{question_number}: {analysis_result.get('error', 'Unknown error')}"
+                    state["warnings"].append(error_msg)
+                    logger.warning("⚠️ %s", error_msg)
+                    return None
                 
-                if analysis_result.get("success"):
-                    # Fixed: Use 'analysis' key instead of 'comprehensive_analysis'
-                    analysis = analysis_result.get("analysis", {})
-                    
-                    # Log the analysis structure for debugging
-                    logger.info(f"📊 ANALYSIS STRUCTURE for Q{question_data['question_number']}: Keys = {list(analysis.keys()) if analysis else 'None'}")
+                # Fixed: Use 'analysis' key instead of 'comprehensive_analysis'
+                analysis = analysis_result.get("analysis", {})
+                
+                # Log the analysis structure for debugging (formatting deferred unless DEBUG is on)
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("📊 ANALYSIS STRUCTURE for Q%s: Keys = %s", question_number, list(analysis) if analysis else None)
                     if "dimensional_scores" in analysis:
-                        logger.info(f"✅ DIMENSIONAL SCORES FOUND for Q{question_data['question_number']}: {list(analysis['dimensional_scores'].keys())}")
-                    else:
-                        logger.warning(f"❌ NO DIMENSIONAL SCORES for Q{question_data['question_number']} - analysis keys: {list(analysis.keys()) if analysis else 'empty'}")
-                    
-                    answer_eval = analysis.get("answer_evaluation", {})
-                    
-                    # Extract scores (compatible with existing format)
-                    current_score_str = answer_eval.get("current_score", f"{question_data['marks'] * 0.6:.0f}/{question_data['marks']}")
+                        logger.debug("✅ DIMENSIONAL SCORES FOUND for Q%s: %s", question_number, list(analysis["dimensional_scores"]))
+                if "dimensional_scores" not in analysis:
+                    logger.warning("❌ NO DIMENSIONAL SCORES for Q%s - analysis keys: %s", question_number, list(analysis) if analysis else "empty")
+                
+                answer_eval = analysis.get("answer_evaluation", {})
+                
+                # Extract scores (compatible with existing format)
+                current_score_str = answer_eval.get("current_score", f"{marks * 0.6:.0f}/{marks}")
+                try:
+                    current_score = float(current_score_str.split('/')[0])
+                except:
+                    current_score = marks * 0.6
+                
+                # Create evaluation result
+                evaluation = EvaluationResult(
+                    question_number=question_number,
+                    question_text=question_text,
+                    current_score=current_score,
+                    max_score=float(marks),
+                    detailed_feedback=analysis,
+                    strengths=analysis.get("detailed_feedback", {}).get("strengths", []),
+                    improvements=analysis.get("detailed_feedback", {}).get("improvement_suggestions", []),
+                    topper_comparison=analysis.get("topper_analysis"),
+                    processing_time=(datetime.now() - question_start).total_seconds()
+                )
+                
+                # Send progress update (counted in completion order)
+                completed += 1
+                progress_percent = 50.0 + completed / total_questions * 30.0
+                state["progress"] = progress_percent
+                
+                if progress_callback:
                     try:
-                        current_score = float(current_score_str.split('/')[0])
-                    except:
-                        current_score = question_data["marks"] * 0.6
-                    
-                    # Create evaluation result
-                    evaluation = EvaluationResult(
-                        question_number=question_data["question_number"],
-                        question_text=question_data["question_text"],
-                        current_score=current_score,
-                        max_score=float(question_data["marks"]),
-                        detailed_feedback=analysis,
-                        strengths=analysis.get("detailed_feedback", {}).get("strengths", []),
-                        improvements=analysis.get("detailed_feedback", {}).get("improvement_suggestions", []),
-                        topper_comparison=analysis.get("topper_analysis"),
-                        processing_time=(datetime.now() - question_start).total_seconds()
-                    )
-                    
-                    evaluations.append(evaluation)
-                    total_current_score += current_score
-                    total_max_score += question_data["marks"]
-                    
-                    # Send progress update
-                    progress_percent = 50.0 + (idx + 1) / state["total_questions"] * 30.0
-                    state["progress"] = progress_percent
-                    
-                    if state.get("progress_callback"):
-                        try:
-                            callback_data = {
-                                "phase": "question_analysis", 
-                                "progress": progress_percent,
-                                "details": f"Analyzed question {idx + 1}/{state['total_questions']}",
-                                "questions_processed": idx + 1,
-                                "total_questions": state["total_questions"]
-                            }
-                            
-                            if asyncio.iscoroutinefunction(state["progress_callback"]):
-                                await state["progress_callback"](callback_data)
-                            else:
-                                state["progress_callback"](callback_data)
-                        except Exception as callback_error:
-                            logger.warning(f"Progress callback failed: {callback_error}")
-                    
-                    logger.info(f"✅ Q{question_data['question_number']} analyzed: {current_score}/{question_data['marks']}")
-                    
-                else:
-                    error_msg = f"Analysis failed for Q{question_data['question_number']}: {analysis_result.get('error', 'Unknown error')}"
-                    state["warnings"].append(error_msg)
-                    logger.warning(f"⚠️ {error_msg}")
-                    
+                        callback_data = {
+                            "phase": "question_analysis", 
+                            "progress": progress_percent,
+                            "details": f"Analyzed question {completed}/{total_questions}",
+                            "questions_processed": completed,
+                            "total_questions": total_questions
+                        }
+                        
+                        await progress_callback(callback_data)
+                    except Exception as callback_error:
+                        logger.warning("Progress callback failed: %s", callback_error)
+                
+                logger.info("✅ Q%s analyzed: %s/%s", question_number, current_score, marks)
+                return evaluation
+                
             except Exception as question_error:
-                error_msg = f"Error analyzing Q{question_data['question_number']}: {str(question_error)}"
+                error_msg = f"Error analyzing Q{question_number}: {str(question_error)}"
                 state["warnings"].append(error_msg)
-                logger.error(f"❌ {error_msg}")
-                continue
+                logger.error("❌ %s", error_msg)
+                return None
+        
+        results = await asyncio.gather(*(analyze_question(q) for q in state["questions"]))
+        
+        # Keep evaluations in question order regardless of completion order
+        evaluations = [evaluation for evaluation in results if evaluation is not None]
+        total_current_score = sum(evaluation["current_score"] for evaluation in evaluations)
+        total_max_score = sum(evaluation["max_score"] for evaluation in evaluations)
         
         # Update state with results
         state["evaluations"] = evaluations
@@ -334,14 +444,21 @@ async def analyze_dimensions_node(state: PDFEvaluationState) -> PDFEvaluationSta
         state["total_max_score"] = total_max_score
         state["progress"] = 80.0
         
+        # Even if some evaluations failed, continue if we have at least one
+        if not evaluations:
+            logger.warning("🔄 No evaluations completed, routing to error handler")
+            state["errors"].append("No evaluations completed successfully")
+            state["phase"] = ProcessingPhase.ERROR
+            return state
+        
         processing_time = (datetime.now() - start_time).total_seconds()
-        logger.info(f"✅ 13D analysis completed in {processing_time:.2f}s: {len(evaluations)} evaluations")
+        logger.info("✅ 13D analysis completed in %.2fs: %s evaluations", processing_time, len(evaluations))
         
         return state
         
     except Exception as e:
         error_msg = f"13D analysis failed: {str(e)}"
-        logger.error(f"❌ {error_msg}")
+        logger.error("❌ %s", error_msg)
         state["errors"].append(error_msg)
         state["phase"] = ProcessingPhase.ERROR
         return state
@@ -354,7 +471,7 @@ async def save_results_node(state: PDFEvaluationState) -> PDFEvaluationState:
     start_time = datetime.now()
     
     try:
-        logger.info(f"🔍 LangGraph Node 4: Database Storage - Answer ID {state['answer_id']}")
+        logger.info("🔍 LangGraph Node 4: Database Storage - Answer ID %s", state['answer_id'])
         
         # Update state
         state["phase"] = ProcessingPhase.DATABASE_STORAGE
@@ -397,11 +514,11 @@ async def save_results_node(state: PDFEvaluationState) -> PDFEvaluationState:
         
         # Database save is handled by API endpoint - just mark as completed
         state["evaluation_created"] = True
-        logger.info(f"✅ LangGraph workflow node completed - database save handled by API endpoint")
+        logger.info("✅ LangGraph workflow node completed - database save handled by API endpoint")
         
         # Prepare final result (compatible with existing system)
         state["final_result"] = {
-            "success": len(state["errors"]) == 0,
+            "success": not state["errors"],
             "pdf_filename": state["pdf_filename"],
             "total_questions_evaluated": len(state["evaluations"]),
             "total_score": state["total_score"],
@@ -438,21 +555,18 @@ async def save_results_node(state: PDFEvaluationState) -> PDFEvaluationState:
                     "total_questions": state["total_questions"]
                 }
                 
-                if asyncio.iscoroutinefunction(state["progress_callback"]):
-                    await state["progress_callback"](callback_data)
-                else:
-                    state["progress_callback"](callback_data)
+                await state["progress_callback"](callback_data)
             except Exception as callback_error:
-                logger.warning(f"Final progress callback failed: {callback_error}")
+                logger.warning("Final progress callback failed: %s", callback_error)
         
         processing_time = (datetime.now() - start_time).total_seconds()
-        logger.info(f"✅ Results saved in {processing_time:.2f}s")
+        logger.info("✅ Results saved in %.2fs", processing_time)
         
         return state
         
     except Exception as e:
         error_msg = f"Results saving failed: {str(e)}"
-        logger.error(f"❌ {error_msg}")
+        logger.error("❌ %s", error_msg)
         state["errors"].append(error_msg)
         state["phase"] = ProcessingPhase.ERROR
         return state
@@ -463,7 +577,7 @@ async def handle_error_node(state: PDFEvaluationState) -> PDFEvaluationState:
     Ensures system never completely fails
     """
     try:
-        logger.info(f"🔍 LangGraph Error Handler - Answer ID {state['answer_id']}")
+        logger.info("🔍 LangGraph Error Handler - Answer ID %s", state['answer_id'])
         
         # Update state
         state["phase"] = ProcessingPhase.ERROR
@@ -491,10 +605,10 @@ async def handle_error_node(state: PDFEvaluationState) -> PDFEvaluationState:
                 evaluation=fallback_evaluation
             )
             state["evaluation_created"] = True
-            logger.info(f"✅ Fallback evaluation saved: ID {evaluation_record.id}")
+            logger.info("✅ Fallback evaluation saved: ID %s", evaluation_record.id)
             
         except Exception as db_error:
-            logger.error(f"❌ Even fallback save failed: {db_error}")
+            logger.error("❌ Even fallback save failed: %s", db_error)
             state["evaluation_created"] = False
         
         # Prepare error result
@@ -521,19 +635,18 @@ async def handle_error_node(state: PDFEvaluationState) -> PDFEvaluationState:
                     "total_questions": 1
                 }
                 
-                if asyncio.iscoroutinefunction(state["progress_callback"]):
-                    await state["progress_callback"](callback_data)
-                else:
-                    state["progress_callback"](callback_data)
+                # Validation may have failed before the callback was normalized
+                progress_cb = normalize_progress_callback(state["progress_callback"])
+                await progress_cb(callback_data)
             except Exception as callback_error:
-                logger.warning(f"Error progress callback failed: {callback_error}")
+                logger.warning("Error progress callback failed: %s", callback_error)
         
-        logger.warning(f"⚠️ Error handling completed with fallback evaluation")
+        logger.warning("⚠️ Error handling completed with fallback evaluation")
         
         return state
         
     except Exception as e:
-        logger.error(f"❌ Critical error in error handler: {str(e)}")
+        logger.error("❌ Critical error in error handler: %s", str(e))
         # Ensure we always return a state even in worst case
         state["final_result"] = {
             "success": False,
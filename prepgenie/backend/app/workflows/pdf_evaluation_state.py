@@ -3,9 +3,8 @@ LangGraph State Definitions for PDF Evaluation Workflow
 Maintains compatibility with existing system while adding workflow orchestration
 """
 
-from typing import List, Dict, Any, Optional, TypedDict, Annotated
+from typing import List, Dict, Any, Optional, TypedDict
 from enum import Enum
-import operator
 
 class ProcessingPhase(str, Enum):
     """Processing phases for progress tracking"""
@@ -67,8 +66,11 @@ class PDFEvaluationState(TypedDict):
     # Processing state
     phase: ProcessingPhase
     progress: float
-    errors: Annotated[List[str], operator.add]  # Accumulate errors
-    warnings: Annotated[List[str], operator.add]  # Accumulate warnings
+    # Nodes run linearly and return the whole state, so these lists are
+    # replaced rather than merged (an operator.add reducer would copy and
+    # duplicate them on every node return)
+    errors: List[str]
+    warnings: List[str]
     
     # PDF processing results
     total_pages: Optional[int]
@@ -76,7 +78,7 @@ class PDFEvaluationState(TypedDict):
     extraction_successful: bool
     
     # Question data
-    questions: Annotated[List[QuestionData], operator.add]  # Accumulate questions
+    questions: List[QuestionData]
     total_questions: int
     total_marks: int
     
@@ -86,13 +88,16 @@ class PDFEvaluationState(TypedDict):
     total_max_score: float
     
     # Progress tracking
-    progress_updates: Annotated[List[ProgressUpdate], operator.add]
+    progress_updates: List[ProgressUpdate]
     processing_start_time: Optional[str]
     processing_end_time: Optional[str]
     
     # WebSocket callback for real-time updates
     progress_callback: Optional[Any]
     
+    # LLM service prefetched during validation (reused by analysis)
+    llm_service: Optional[Any]
+    
     # Final results (compatible with existing system)
     final_result: Optional[Dict[str, Any]]
     evaluation_created: bool
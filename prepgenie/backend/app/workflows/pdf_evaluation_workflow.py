@@ -5,8 +5,14 @@ Advanced orchestration for comprehensive PDF evaluation with full backward compa
 
 import logging
 import asyncio
+import functools
+import hashlib
+import os
+import time
+import uuid
+from collections import OrderedDict
 from datetime import datetime
-from typing import Dict, Any, Optional, Callable
+from typing import Dict, Any, Optional, Callable, Tuple
 from sqlalchemy.orm import Session
 
 # LangGraph imports
@@ -20,11 +26,144 @@ from .pdf_evaluation_nodes import (
     extract_vision_node,
     analyze_dimensions_node,
     save_results_node,
-    handle_error_node
+    handle_error_node,
+    normalize_progress_callback
 )
 
 logger = logging.getLogger(__name__)
 
+# Compiled graph is input-independent, so it is built once per process
+_COMPILED_GRAPH = None
+
+# Routers are pure lookups on the phase; nodes set ERROR themselves.
+# A state without a phase is malformed and goes straight to the error handler
+_ROUTE = {ProcessingPhase.ERROR: "error", None: "error"}
+
+# Immutable defaults for every state field; list fields are created fresh
+# per run in _make_initial_state
+_INITIAL_STATE_TEMPLATE: Dict[str, Any] = {
+    # Processing state
+    "phase": ProcessingPhase.INITIALIZING,
+    "progress": 0.0,
+    
+    # PDF processing results
+    "total_pages": None,
+    "pdf_filename": None,
+    "extraction_successful": False,
+    
+    # Question data
+    "total_questions": 0,
+    "total_marks": 0,
+    
+    # Analysis results
+    "total_score": 0.0,
+    "total_max_score": 0.0,
+    
+    # Progress tracking
+    "processing_start_time": None,
+    "processing_end_time": None,
+    
+    # Callbacks
+    "progress_callback": None,
+    "llm_service": None,
+    
+    # Final results
+    "final_result": None,
+    "evaluation_created": False,
+    
+    # Fallback
+    "fallback_data": None
+}
+
+def _make_initial_state(**overrides) -> PDFEvaluationState:
+    """Build a fresh workflow state from the template plus per-run values"""
+    return {
+        **_INITIAL_STATE_TEMPLATE,
+        "errors": [],
+        "warnings": [],
+        "questions": [],
+        "evaluations": [],
+        "progress_updates": [],
+        **overrides
+    }
+
+# State handles that only exist while the graph is running
+_NON_SERIALIZABLE_KEYS = frozenset({"db_session", "progress_callback", "llm_service"})
+
+# Successful results keyed by stable thread_id so duplicate deliveries are no-ops;
+# entries are (monotonic time stored, result) and expire after PDF_EVAL_RESULT_CACHE_TTL seconds
+_PROCESSED_THREADS: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+_PROCESSED_THREADS_MAX = 128
+_PROCESSED_THREADS_TTL = float(os.getenv("PDF_EVAL_RESULT_CACHE_TTL", "3600"))
+
+def _stable_thread_id(answer_id: int, file_path: str) -> str:
+    """Derive a retry-stable thread_id from the answer ID and the PDF bytes"""
+    try:
+        hasher = hashlib.blake2b(digest_size=8)
+        with open(file_path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                hasher.update(chunk)
+        return f"pdf_eval_{answer_id}_{hasher.hexdigest()}"
+    except (OSError, TypeError):
+        # Unreadable file: fall back to a unique ID, validation will report the error
+        return f"pdf_eval_{answer_id}_{uuid.uuid4().hex}"
+
+class BatchingProgressCallback:
+    """
+    Coalesces bursts of progress events into a single callback invocation
+    Only the latest event of a burst is delivered; phase changes and
+    terminal phases are always flushed so no stage is skipped, and a held
+    event is delivered by a timer once max_interval passes without a newer one
+    """
+    
+    TERMINAL_PHASES = frozenset({"completed", "error"})
+    
+    def __init__(self, inner: Callable, max_batch: int = 10, max_interval_ms: int = 200):
+        self.inner = normalize_progress_callback(inner)
+        self.max_batch = max_batch
+        self.max_interval = max_interval_ms / 1000.0
+        self._pending = []
+        self._last_flush = 0.0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._timer_task: Optional[asyncio.Task] = None
+    
+    async def send(self, callback_data: Dict[str, Any]):
+        """Queue a progress event, flushing when a threshold is reached"""
+        phase = callback_data.get("phase")
+        if self._pending and self._pending[-1].get("phase") != phase:
+            await self.flush()
+        
+        self._pending.append(callback_data)
+        if (len(self._pending) >= self.max_batch
+                or phase in self.TERMINAL_PHASES
+                or time.perf_counter() - self._last_flush >= self.max_interval):
+            await self.flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.max_interval, self._on_timer)
+    
+    def _on_timer(self):
+        """Deliver an event still held when max_interval expires"""
+        self._timer = None
+        self._timer_task = asyncio.ensure_future(self._timed_flush())
+    
+    async def _timed_flush(self):
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.warning("Progress callback failed: %s", e)
+    
+    async def flush(self):
+        """Deliver the most recent pending event, if any"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+        latest = self._pending[-1]
+        self._pending.clear()
+        self._last_flush = time.perf_counter()
+        await self.inner(latest)
+
 class PDFEvaluationWorkflow:
     """
     LangGraph-powered PDF evaluation workflow
@@ -32,8 +171,11 @@ class PDFEvaluationWorkflow:
     """
     
     def __init__(self, config: Optional[WorkflowConfig] = None):
+        global _COMPILED_GRAPH
         self.config = config or self._default_config()
-        self.graph = self._build_graph()
+        if _COMPILED_GRAPH is None:
+            _COMPILED_GRAPH = self._build_graph()
+        self.graph = _COMPILED_GRAPH
         self.workflow = self.graph  # Alias for compatibility
         logger.info("🚀 LangGraph PDF Evaluation Workflow initialized")
     
@@ -100,49 +242,28 @@ class PDFEvaluationWorkflow:
         # Non-serializable objects (SQLAlchemy sessions) will be passed via state
         return graph.compile()
     
-    def _should_continue_after_validation(self, state: PDFEvaluationState) -> str:
+    @staticmethod
+    def _should_continue_after_validation(state: PDFEvaluationState) -> str:
         """Decision point after PDF validation"""
-        if state["phase"] == ProcessingPhase.ERROR:
-            logger.warning("🔄 Validation failed, routing to error handler")
-            return "error"
-        return "continue"
+        return _ROUTE.get(state.get("phase"), "continue")
     
-    def _should_continue_after_extraction(self, state: PDFEvaluationState) -> str:
-        """Decision point after vision extraction"""
-        if state["phase"] == ProcessingPhase.ERROR:
-            logger.warning("🔄 Extraction failed, routing to error handler")
-            return "error"
-        
-        # Check if we have questions to analyze
-        if not state.get("questions") or len(state["questions"]) == 0:
-            logger.warning("🔄 No questions found, routing to error handler")
-            state["errors"].append("No questions found in PDF")
-            state["phase"] = ProcessingPhase.ERROR
-            return "error"
-        
-        return "continue"
+    @staticmethod
+    def _should_continue_after_extraction(state: PDFEvaluationState) -> str:
+        """Decision point after vision extraction (extract_vision_node flags missing questions)"""
+        return _ROUTE.get(state.get("phase"), "continue")
     
-    def _should_continue_after_analysis(self, state: PDFEvaluationState) -> str:
-        """Decision point after dimensional analysis"""
-        if state["phase"] == ProcessingPhase.ERROR:
-            logger.warning("🔄 Analysis failed, routing to error handler")
-            return "error"
-        
-        # Even if some evaluations failed, continue if we have at least one
-        if not state.get("evaluations") or len(state["evaluations"]) == 0:
-            logger.warning("🔄 No evaluations completed, routing to error handler")
-            state["errors"].append("No evaluations completed successfully")
-            state["phase"] = ProcessingPhase.ERROR
-            return "error"
-        
-        return "continue"
+    @staticmethod
+    def _should_continue_after_analysis(state: PDFEvaluationState) -> str:
+        """Decision point after dimensional analysis (analyze_dimensions_node flags missing evaluations)"""
+        return _ROUTE.get(state.get("phase"), "continue")
     
     async def run_evaluation(self, 
                            answer_id: int,
                            file_path: str,
                            content: str,
                            db_session: Session,
-                           progress_callback: Optional[Callable] = None) -> Dict[str, Any]:
+                           progress_callback: Optional[Callable] = None,
+                           force: bool = False) -> Dict[str, Any]:
         """
         Main entry point for PDF evaluation
         Maintains full compatibility with existing system
@@ -153,62 +274,59 @@ class PDFEvaluationWorkflow:
             content: Text content (fallback)
             db_session: Database session
             progress_callback: WebSocket progress callback
+            force: Re-run the evaluation even if this PDF was evaluated recently
         
         Returns:
             Dict compatible with existing comprehensive_pdf_evaluation system
         """
         
+        # Wall clock only for the ISO timestamp; perf_counter for elapsed time
         start_time = datetime.now()
-        thread_id = f"pdf_eval_{answer_id}_{int(start_time.timestamp())}"
+        start_perf = time.perf_counter()
+        # Hashing a large PDF would block the event loop, so it runs in a worker thread
+        thread_id = await asyncio.to_thread(_stable_thread_id, answer_id, file_path)
+        
+        logger.info("🚀 Starting LangGraph PDF evaluation for answer %s", answer_id)
+        logger.info("📁 File: %s", file_path)
+        logger.info("🔗 Thread ID: %s", thread_id)
         
-        logger.info(f"🚀 Starting LangGraph PDF evaluation for answer {answer_id}")
-        logger.info(f"📁 File: {file_path}")
-        logger.info(f"🔗 Thread ID: {thread_id}")
+        # Duplicate delivery of an already evaluated PDF: reuse the stored result
+        cached = None if force else _PROCESSED_THREADS.get(thread_id)
+        if cached is not None and time.monotonic() - cached[0] > _PROCESSED_THREADS_TTL:
+            del _PROCESSED_THREADS[thread_id]
+            cached = None
+        if cached is not None:
+            cached_result = cached[1]
+            _PROCESSED_THREADS.move_to_end(thread_id)
+            logger.info("♻️ Reusing completed evaluation for thread %s", thread_id)
+            result = dict(cached_result)
+            result["workflow_metadata"] = {**cached_result.get("workflow_metadata", {}), "cached": True}
+            if progress_callback:
+                # The client is still waiting for the terminal event it would get from save_results
+                try:
+                    await normalize_progress_callback(progress_callback)({
+                        "phase": "completed",
+                        "progress": 100.0,
+                        "details": f"Evaluation completed: {result.get('total_score', 0):.1f}/{result.get('total_max_score', 0):.1f}",
+                        "questions_processed": result.get("total_questions_evaluated", 0),
+                        "total_questions": result.get("total_questions_evaluated", 0)
+                    })
+                except Exception as callback_error:
+                    logger.warning("Final progress callback failed: %s", callback_error)
+            return result
+        
+        batching_callback = BatchingProgressCallback(progress_callback) if progress_callback else None
         
         try:
             # Initialize state
-            initial_state = PDFEvaluationState(
-                # Input parameters
+            initial_state = _make_initial_state(
                 answer_id=answer_id,
                 file_path=file_path,
                 content=content,
                 db_session=db_session,
-                
-                # Processing state
-                phase=ProcessingPhase.INITIALIZING,
-                progress=0.0,
-                errors=[],
-                warnings=[],
-                
-                # PDF processing results
-                total_pages=None,
-                pdf_filename=None,
-                extraction_successful=False,
-                
-                # Question data
-                questions=[],
-                total_questions=0,
-                total_marks=0,
-                
-                # Analysis results
-                evaluations=[],
-                total_score=0.0,
-                total_max_score=0.0,
-                
-                # Progress tracking
-                progress_updates=[],
                 processing_start_time=start_time.isoformat(),
-                processing_end_time=None,
-                
-                # Callbacks
-                progress_callback=progress_callback,
-                
-                # Final results
-                final_result=None,
-                evaluation_created=False,
-                
-                # Fallback
-                fallback_data=None
+                # Callbacks (coalesced to avoid a WebSocket send per event)
+                progress_callback=batching_callback.send if batching_callback else None
             )
             
             # Execute workflow
@@ -216,41 +334,53 @@ class PDFEvaluationWorkflow:
             
             config = {"configurable": {"thread_id": thread_id}}
             
-            final_state = await self.graph.ainvoke(
-                initial_state,
-                config=config
-            )
+            try:
+                final_state = await self.graph.ainvoke(
+                    initial_state,
+                    config=config
+                )
+            finally:
+                if batching_callback:
+                    await batching_callback.flush()
             
             # Extract results
             result = final_state.get("final_result", {})
             
             # Add workflow metadata
             result["workflow_metadata"] = {
-                "execution_time": (datetime.now() - start_time).total_seconds(),
+                "execution_time": time.perf_counter() - start_perf,
                 "thread_id": thread_id,
                 "langgraph_version": True,
-                "nodes_executed": self._count_executed_nodes(final_state),
                 "final_phase": final_state["phase"],
                 "total_errors": len(final_state.get("errors", [])),
                 "total_warnings": len(final_state.get("warnings", []))
             }
+            if self.config["detailed_logging"]:
+                result["workflow_metadata"]["nodes_executed"] = self._count_executed_nodes(final_state)
             
-            logger.info(f"✅ LangGraph evaluation completed in {result['workflow_metadata']['execution_time']:.2f}s")
-            logger.info(f"📊 Final score: {result.get('total_score', 0):.1f}/{result.get('total_max_score', 0):.1f}")
-            logger.info(f"🔍 Questions processed: {result.get('total_questions_evaluated', 0)}")
+            logger.info("✅ LangGraph evaluation completed in %.2fs", result['workflow_metadata']['execution_time'])
+            logger.info("📊 Final score: %.1f/%.1f", result.get('total_score', 0), result.get('total_max_score', 0))
+            logger.info("🔍 Questions processed: %s", result.get('total_questions_evaluated', 0))
+            
+            if result.get("success"):
+                # Stored as a copy so callers mutating the returned dict don't alter the cache
+                _PROCESSED_THREADS[thread_id] = (time.monotonic(), dict(result))
+                _PROCESSED_THREADS.move_to_end(thread_id)
+                if len(_PROCESSED_THREADS) > _PROCESSED_THREADS_MAX:
+                    _PROCESSED_THREADS.popitem(last=False)
             
             return result
             
         except Exception as e:
             error_msg = f"LangGraph workflow failed: {str(e)}"
-            logger.error(f"❌ {error_msg}")
+            logger.error("❌ %s", error_msg)
             
             # Return compatible error response
             return {
                 "success": False,
                 "error": error_msg,
                 "workflow_metadata": {
-                    "execution_time": (datetime.now() - start_time).total_seconds(),
+                    "execution_time": time.perf_counter() - start_perf,
                     "thread_id": thread_id,
                     "langgraph_version": True,
                     "fatal_error": True
@@ -261,8 +391,8 @@ class PDFEvaluationWorkflow:
         """Count which nodes were executed based on final state"""
         return {
             "validate_pdf": final_state.get("pdf_filename") is not None,
-            "extract_vision": len(final_state.get("questions", [])) > 0,
-            "analyze_dimensions": len(final_state.get("evaluations", [])) > 0,
+            "extract_vision": bool(final_state.get("questions")),
+            "analyze_dimensions": bool(final_state.get("evaluations")),
             "save_results": final_state.get("evaluation_created", False),
             "handle_error": final_state["phase"] == ProcessingPhase.ERROR
         }
@@ -274,50 +404,49 @@ class PDFEvaluationWorkflow:
             state = await self.graph.aget_state(config)
             return state.values if state else None
         except Exception as e:
-            logger.error(f"Failed to get workflow state: {e}")
+            logger.error("Failed to get workflow state: %s", e)
             return None
     
+    @functools.cached_property
+    def mermaid(self) -> str:
+        """Mermaid diagram of the compiled graph, generated once per instance"""
+        return self.graph.get_graph().draw_mermaid()
+    
     def visualize_workflow(self) -> str:
         """Get workflow visualization (for debugging)"""
         try:
-            # This would generate a mermaid diagram of the workflow
-            return """
-            graph TD
-                A[validate_pdf] --> B[extract_vision]
-                B --> C[analyze_dimensions] 
-                C --> D[save_results]
-                A --> E[handle_error]
-                B --> E
-                C --> E
-                D --> F[END]
-                E --> F
-            """
+            return self.mermaid
         except Exception as e:
             return f"Visualization error: {e}"
     
-    async def run(self, state: PDFEvaluationState, db_session=None, progress_callback=None) -> PDFEvaluationState:
-        """Execute workflow with LangGraph state"""
-        thread_id = f"pdf_eval_{state['answer_id']}_{int(datetime.now().timestamp())}"
+    async def run(self, state: PDFEvaluationState, db_session=None, progress_callback=None,
+                  thread_id: Optional[str] = None) -> PDFEvaluationState:
+        """Execute workflow with LangGraph state (thread_id is derived from the PDF when not given)"""
+        if thread_id is None:
+            thread_id = await asyncio.to_thread(_stable_thread_id, state["answer_id"], state.get("file_path"))
         
         # Disable checkpointing entirely to avoid serialization issues
         # LangGraph will run in stateless mode without persistence
         
-        # Add non-serializable objects to state for execution
-        temp_state = state.copy()
-        temp_state["db_session"] = db_session
-        temp_state["progress_callback"] = progress_callback
+        # Add non-serializable objects to the caller's state for execution only,
+        # restoring it afterwards instead of copying the whole state
+        injected = {"db_session": db_session, "progress_callback": progress_callback}
+        saved = {key: state[key] for key in injected if key in state}
+        state.update(injected)
         
         # Execute workflow without checkpointing (stateless execution)
         config = {"configurable": {"thread_id": thread_id}}
-        final_state = await self.workflow.ainvoke(temp_state, config=config)
-        
-        # Remove non-serializable objects from final state
-        if "db_session" in final_state:
-            del final_state["db_session"]
-        if "progress_callback" in final_state:
-            del final_state["progress_callback"]
+        try:
+            final_state = await self.workflow.ainvoke(state, config=config)
+        finally:
+            for key in injected:
+                if key in saved:
+                    state[key] = saved[key]
+                else:
+                    state.pop(key, None)
         
-        return final_state
+        # Return a copy without the non-serializable objects
+        return {k: v for k, v in final_state.items() if k not in _NON_SERIALIZABLE_KEYS}
 
 # Global workflow instance (singleton pattern for compatibility)
 _pdf_workflow_instance: Optional[PDFEvaluationWorkflow] = None
@@ -6,7 +6,9 @@ Quick Milvus Entry Count Check
 This script quickly checks the number of entries in the Milvus database.
 """
 
-from pymilvus import connections, Collection, utility
+from pymilvus import Collection, utility
+
+from _milvus_utils import ensure_connection
 
 def check_milvus_entries():
     """Check number of entries in Milvus database"""
@@ -15,7 +17,7 @@ def check_milvus_entries():
     
     try:
         # Connect to Milvus Lite
-        connections.connect("default", uri="./milvus_toppers.db")
+        ensure_connection("./milvus_toppers.db")
         print("✅ Connected to Milvus Lite")
         
         # List all collections
@@ -25,8 +27,9 @@ def check_milvus_entries():
         total_entries = 0
         
         for collection_name in collections:
+            # num_entities is read from collection stats; no need to load()
+            # every collection into memory just to count it
             collection = Collection(collection_name)
-            collection.load()
             
             count = collection.num_entities
             total_entries += count
@@ -7,9 +7,8 @@ This script checks for potential duplicate entries in the Milvus database
 and provides options to clean them up if needed.
 """
 
-from pymilvus import connections, Collection, utility
-import pandas as pd
-from collections import defaultdict
+from _milvus_utils import get_loaded_collection, iter_rows
+from collections import Counter
 
 def check_duplicates():
     """Check for duplicate entries in Milvus collection"""
@@ -17,33 +16,29 @@ def check_duplicates():
     print("🔍 Checking for Duplicate Entries in Milvus...")
     
     try:
-        # Connect to Milvus Lite
-        connections.connect("default", uri="./milvus_toppers.db")
-        print("✅ Connected to Milvus Lite")
-        
+        # Connect to Milvus Lite and load the collection
         collection_name = "toppers_qa_aayushi_bge"
-        collection = Collection(collection_name)
-        collection.load()
+        collection = get_loaded_collection(collection_name, "./milvus_toppers.db")
+        print("✅ Connected to Milvus Lite")
         
         print(f"📊 Collection: {collection_name}")
         print(f"📈 Total entities: {collection.num_entities}")
         
-        # Get all data for duplicate analysis
-        results = collection.query(
-            expr="",
-            output_fields=["question_text", "pdf_filename", "question_number", "marks_allocated", "estimated_word_count", "pages_spanned"],
-            limit=200  # Get more than current 120 to be safe
-        )
-        
-        print(f"📋 Retrieved {len(results)} records for analysis")
+        # Stream every row once: group by content key and count distributions together
+        # Singletons only cost one (index, preview) tuple; lists exist only for repeated keys
+        seen_once = {}  # key -> (first index, first question preview)
+        duplicates = {}  # key -> indices, for keys seen 2+ times
+        previews = {}  # key -> first 2 question previews, for repeated keys
+        pdf_counts = Counter()
+        marks_counts = Counter()
+        total_records = 0
         
-        # Convert to DataFrame for easier analysis
-        df = pd.DataFrame(results)
-        
-        # Check for duplicates based on key fields
-        duplicate_groups = defaultdict(list)
-        
-        for i, row in df.iterrows():
+        rows = iter_rows(
+            collection,
+            ["question_text", "pdf_filename", "question_number", "marks_allocated", "estimated_word_count"]
+        )
+        for i, row in enumerate(rows):
+            total_records += 1
             # Create a unique key based on content
             key = (
                 row['pdf_filename'],
@@ -51,17 +46,24 @@ def check_duplicates():
                 row['marks_allocated'],
                 row['estimated_word_count']
             )
-            duplicate_groups[key].append(i)
+            if key in duplicates:
+                duplicates[key].append(i)
+            elif key in seen_once:
+                first_index, first_preview = seen_once[key]
+                duplicates[key] = [first_index, i]
+                previews[key] = [first_preview, row['question_text'][:80]]
+            else:
+                seen_once[key] = (i, row['question_text'][:80])
+            pdf_counts[row['pdf_filename']] += 1
+            marks_counts[row['marks_allocated']] += 1
+        
+        print(f"📋 Retrieved {total_records} records for analysis")
         
-        # Find actual duplicates
-        duplicates_found = []
-        for key, indices in duplicate_groups.items():
-            if len(indices) > 1:
-                duplicates_found.append((key, indices))
+        duplicates_found = list(duplicates.items())
         
         print(f"\n📊 DUPLICATE ANALYSIS:")
-        print(f"   📈 Total records: {len(results)}")
-        print(f"   🔍 Unique combinations: {len(duplicate_groups)}")
+        print(f"   📈 Total records: {total_records}")
+        print(f"   🔍 Unique combinations: {len(seen_once)}")
         print(f"   ⚠️ Duplicate groups found: {len(duplicates_found)}")
         
         if duplicates_found:
@@ -73,35 +75,32 @@ def check_duplicates():
                 print(f"      Found {len(indices)} times at indices: {indices}")
                 
                 # Show sample questions for verification
-                for idx in indices[:2]:  # Show first 2 instances
-                    question_preview = df.iloc[idx]['question_text'][:80] + "..."
-                    print(f"         • {question_preview}")
+                for question_preview in previews[key]:  # Show first 2 instances
+                    print(f"         • {question_preview}...")
         else:
             print(f"✅ No duplicates found!")
         
         # Show distribution by PDF
         print(f"\n📄 Distribution by PDF:")
-        pdf_counts = df['pdf_filename'].value_counts()
-        for pdf, count in pdf_counts.items():
+        for pdf, count in pdf_counts.most_common():
             print(f"   • {pdf}: {count} questions")
         
         # Show distribution by marks
         print(f"\n🎯 Distribution by Marks:")
-        marks_counts = df['marks_allocated'].value_counts()
-        for marks, count in marks_counts.items():
+        for marks, count in marks_counts.most_common():
             print(f"   • {marks} marks: {count} questions")
         
         print(f"\n🎯 SUMMARY:")
         expected_total = len(pdf_counts) * 20  # Each PDF should have 20 questions
         print(f"   📊 Expected total: {expected_total} questions")
-        print(f"   📊 Actual total: {len(results)} questions")
+        print(f"   📊 Actual total: {total_records} questions")
         
-        if len(results) > expected_total:
-            print(f"   ⚠️ Found {len(results) - expected_total} extra entries (possible duplicates)")
-        elif len(results) == expected_total:
+        if total_records > expected_total:
+            print(f"   ⚠️ Found {total_records - expected_total} extra entries (possible duplicates)")
+        elif total_records == expected_total:
             print(f"   ✅ Total matches expected count")
         else:
-            print(f"   ⚠️ Missing {expected_total - len(results)} entries")
+            print(f"   ⚠️ Missing {expected_total - total_records} entries")
             
     except Exception as e:
         print(f"❌ Error checking duplicates: {e}")
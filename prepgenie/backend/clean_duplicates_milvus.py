@@ -7,9 +7,43 @@ This script removes duplicate entries from the Milvus collection,
 keeping only one instance of each unique question.
 """
 
-from pymilvus import connections, Collection, utility
-import pandas as pd
-from collections import defaultdict
+from pymilvus import Collection, MilvusException
+
+from _milvus_utils import get_loaded_collection, iter_rows
+
+# Whether the client/server accept filter templating (expr_params); cleared on first failure
+_expr_params_supported = True
+
+def _delete_expr(collection: Collection, ids: list):
+    """Delete with a templated expression when supported, else a literal id list"""
+    global _expr_params_supported
+    if _expr_params_supported:
+        try:
+            # The id list travels as a typed parameter instead of ~10KB of expression text
+            return collection.delete("id in {ids}", expr_params={"ids": ids})
+        except (TypeError, MilvusException) as e:
+            _expr_params_supported = False
+            print(f"   ↪️ Templated delete unavailable ({e}); using literal id lists")
+    
+    if isinstance(ids[0], str):
+        id_list_str = ",".join(f'"{i}"' for i in ids)
+    else:
+        id_list_str = ",".join(map(str, ids))
+    return collection.delete(f"id in [{id_list_str}]")
+
+def delete_ids(collection: Collection, ids: list) -> int:
+    """Delete ids in one expression, halving the batch if Milvus rejects it"""
+    try:
+        _delete_expr(collection, ids)
+        return len(ids)
+    except MilvusException as e:
+        if len(ids) == 1:
+            print(f"   ❌ Could not delete id {ids[0]}: {e}")
+            return 0
+        # Expression too large or request rejected: split and retry each half
+        mid = len(ids) // 2
+        print(f"   ↪️ Delete of {len(ids)} ids failed ({e}); retrying in halves")
+        return delete_ids(collection, ids[:mid]) + delete_ids(collection, ids[mid:])
 
 def clean_duplicates():
     """Clean duplicate entries from Milvus collection"""
@@ -17,32 +51,44 @@ def clean_duplicates():
     print("🧹 Cleaning Duplicate Entries from Milvus...")
     
     try:
-        # Connect to Milvus Lite
-        connections.connect("default", uri="./milvus_toppers.db")
-        print("✅ Connected to Milvus Lite")
-        
+        # Connect to Milvus Lite and load the collection
         collection_name = "toppers_qa_aayushi_bge"
-        collection = Collection(collection_name)
-        collection.load()
+        collection = get_loaded_collection(collection_name, "./milvus_toppers.db")
+        print("✅ Connected to Milvus Lite")
         
+        # num_entities is an RPC; read it once and derive later counts from it
+        entities_before = collection.num_entities
         print(f"📊 Collection: {collection_name}")
-        print(f"📈 Total entities before cleanup: {collection.num_entities}")
+        print(f"📈 Total entities before cleanup: {entities_before}")
         
-        # Get all data with IDs for deletion
-        results = collection.query(
-            expr="",
-            output_fields=["id", "question_text", "pdf_filename", "question_number", "marks_allocated", "estimated_word_count"],
-            limit=200
-        )
-        
-        print(f"📋 Retrieved {len(results)} records for analysis")
-        
-        # Find duplicates and identify which IDs to keep/delete
+        # Stream rows in primary-key order and delete duplicates as each 1000-id batch
+        # fills. Deleting rows the iterator has already passed doesn't disturb paging.
         seen_combinations = set()
-        ids_to_keep = []
-        ids_to_delete = []
+        total_records = 0
+        kept_count = 0
+        duplicate_count = 0
+        deleted_count = 0
+        pending_ids = []
+        batch_size = 1000
+        batch_number = 0
         
-        for record in results:
+        def flush_pending():
+            nonlocal deleted_count, batch_number
+            batch_number += 1
+            try:
+                batch_deleted = delete_ids(collection, pending_ids)
+                deleted_count += batch_deleted
+                print(f"   🗑️ Deleted batch {batch_number}: {batch_deleted} records")
+            except Exception as e:
+                print(f"   ❌ Error deleting batch {batch_number}: {e}")
+            pending_ids.clear()
+        
+        rows = iter_rows(
+            collection,
+            ["id", "pdf_filename", "question_number", "marks_allocated", "estimated_word_count"]
+        )
+        for record in rows:
+            total_records += 1
             # Create unique identifier
             unique_key = (
                 record['pdf_filename'],
@@ -54,50 +100,36 @@ def clean_duplicates():
             if unique_key not in seen_combinations:
                 # First occurrence - keep it
                 seen_combinations.add(unique_key)
-                ids_to_keep.append(record['id'])
+                kept_count += 1
             else:
-                # Duplicate - mark for deletion
-                ids_to_delete.append(record['id'])
+                # Duplicate - queue for deletion
+                duplicate_count += 1
+                pending_ids.append(record['id'])
+                if len(pending_ids) >= batch_size:
+                    flush_pending()
+        
+        if pending_ids:
+            flush_pending()
         
         print(f"\n📊 DUPLICATE ANALYSIS:")
-        print(f"   📈 Total records: {len(results)}")
-        print(f"   ✅ Unique records to keep: {len(ids_to_keep)}")
-        print(f"   🗑️ Duplicate records to delete: {len(ids_to_delete)}")
+        print(f"   📈 Total records: {total_records}")
+        print(f"   ✅ Unique records kept: {kept_count}")
+        print(f"   🗑️ Duplicate records found: {duplicate_count}")
         
-        if ids_to_delete:
-            print(f"\n🗑️ Deleting {len(ids_to_delete)} duplicate entries...")
-            
-            # Delete duplicates in batches
-            batch_size = 50
-            deleted_count = 0
-            
-            for i in range(0, len(ids_to_delete), batch_size):
-                batch_ids = ids_to_delete[i:i + batch_size]
-                
-                # Create expression for batch deletion
-                id_list_str = ",".join(map(str, batch_ids))
-                delete_expr = f"id in [{id_list_str}]"
-                
-                try:
-                    result = collection.delete(delete_expr)
-                    deleted_count += len(batch_ids)
-                    print(f"   🗑️ Deleted batch {i//batch_size + 1}: {len(batch_ids)} records")
-                except Exception as e:
-                    print(f"   ❌ Error deleting batch {i//batch_size + 1}: {e}")
-            
+        if duplicate_count:
             # Flush changes to disk
             collection.flush()
             print(f"✅ Flushed changes to disk")
             
             print(f"\n📊 CLEANUP COMPLETE:")
             print(f"   🗑️ Total deleted: {deleted_count}")
-            print(f"   📈 Remaining entities: {collection.num_entities}")
+            print(f"   📈 Remaining entities: {entities_before - deleted_count}")
             
         else:
             print(f"✅ No duplicates found to delete!")
         
-        # Verify final state
-        final_count = collection.num_entities
+        # Final state (num_entities would still include deleted rows until compaction)
+        final_count = entities_before - deleted_count
         print(f"\n🎯 FINAL STATE:")
         print(f"   📊 Total entities: {final_count}")
         print(f"   ✅ Expected unique questions: 60")
@@ -84,6 +84,7 @@ import asyncio
 import argparse
 import fitz  # PyMuPDF
 import base64
+import hashlib
 from pathlib import Path
 from datetime import datetime
 import sys
@@ -94,11 +95,42 @@ sys.path.append(str(Path(__file__).parent / "app"))
 
 from app.core.llm_service import LLMService
 
+VISION_MODEL = "gpt-4o"
+
 class FixedTopperExtractor:
-    def __init__(self, output_base_dir="/Users/a0j0agc/Desktop/Personal/Dump/ExtractedToppersCopy"):
+    def __init__(self, output_base_dir="/Users/a0j0agc/Desktop/Personal/Dump/ExtractedToppersCopy", cache_dir=None):
         self.output_base_dir = Path(output_base_dir)
+        self.cache_dir = Path(cache_dir) if cache_dir else None
         self.llm_service = LLMService()
         
+    def get_extraction_cache_path(self, pdf_path):
+        """Content-addressed cache file for a PDF: sha256(bytes) + model + prompt version"""
+        hasher = hashlib.sha256()
+        with open(pdf_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                hasher.update(chunk)
+        prompt_version = hashlib.sha256(self.get_enhanced_vision_prompt().encode('utf-8')).hexdigest()[:12]
+        return self.cache_dir / f"{hasher.hexdigest()}_{VISION_MODEL}_{prompt_version}.json"
+    
+    def load_cached_extraction(self, cache_path):
+        """Load cached per-page extraction results, or None on miss"""
+        if not cache_path.exists():
+            return None
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"⚠️ Ignoring unreadable extraction cache {cache_path.name}: {e}")
+            return None
+    
+    def save_cached_extraction(self, cache_path, all_page_results):
+        """Persist per-page extraction results for reuse on re-runs"""
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_suffix(".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(all_page_results, f, ensure_ascii=False)
+        tmp_path.replace(cache_path)
+        
     def create_output_structure(self, year):
         """Create year-based output directory structure"""
         year_dir = self.output_base_dir / str(year)
@@ -214,7 +246,7 @@ CRITICAL INSTRUCTIONS:
             # Call GPT-4o vision for this single page
             response = await self.llm_service.vision_chat(
                 messages=vision_message,
-                model="gpt-4o",
+                model=VISION_MODEL,
                 max_tokens=4000,
                 temperature=0.1
             )
@@ -273,10 +305,15 @@ CRITICAL INSTRUCTIONS:
             print(f"❌ Error processing page {page_num + 1}: {str(e)}")
             return {"page_number": page_num + 1, "questions_found": []}
 
-    async def extract_questions_and_answers(self, pdf_path, batch_size=5):
-        """Extract questions and answers using one-page-at-a-time processing with batching"""
+    async def extract_questions_and_answers(self, pdf_path, batch_size=5, cooldown=0.0):
+        """Extract questions and answers using one-page-at-a-time processing
+        
+        A pool of batch_size workers pulls pages from a shared queue, so a slow
+        page never holds back the rest. cooldown (seconds) optionally pauses each
+        worker between pages when the API needs extra breathing room.
+        """
         print(f"🔍 Extracting from: {pdf_path}")
-        print(f"⚡ Processing pages one at a time (batch size: {batch_size}) to avoid token limits")
+        print(f"⚡ Processing pages one at a time ({batch_size} concurrent workers) to avoid token limits")
         
         # Get PDF metadata for page count
         doc = fitz.open(pdf_path)
@@ -287,35 +324,34 @@ CRITICAL INSTRUCTIONS:
         
         all_page_results = []
         
-        # Process pages in batches to avoid overwhelming the system
-        for batch_start in range(0, total_pages, batch_size):
-            batch_end = min(batch_start + batch_size, total_pages)
-            print(f"\n🔄 Processing batch: pages {batch_start + 1}-{batch_end}")
-            
-            # Process pages in current batch
-            batch_tasks = []
-            for page_num in range(batch_start, batch_end):
-                task = self.extract_single_page(pdf_path, page_num, total_pages)
-                batch_tasks.append(task)
-            
-            # Wait for all pages in batch to complete
-            batch_results = await asyncio.gather(*batch_tasks, return_exceptions=True)
-            
-            # Process batch results
-            for result in batch_results:
-                if isinstance(result, Exception):
-                    print(f"❌ Batch error: {result}")
-                    continue
-                    
-                if result and result.get("page_number"):
-                    all_page_results.append(result)
-            
-            print(f"✅ Batch complete: {len(batch_results)} pages processed")
-            
-            # Small delay between batches to be respectful to the API
-            if batch_end < total_pages:
-                print("⏸️ Brief pause between batches...")
-                await asyncio.sleep(2)
+        queue = asyncio.Queue()
+        for page_num in range(total_pages):
+            queue.put_nowait(page_num)
+        
+        async def worker():
+            while True:
+                try:
+                    page_num = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                try:
+                    result = await self.extract_single_page(pdf_path, page_num, total_pages)
+                    if result and result.get("page_number"):
+                        all_page_results.append(result)
+                except Exception as e:
+                    print(f"❌ Page {page_num + 1} error: {e}")
+                finally:
+                    queue.task_done()
+                
+                # Optional delay between pages to be respectful to the API
+                if cooldown and not queue.empty():
+                    await asyncio.sleep(cooldown)
+        
+        workers = [asyncio.create_task(worker()) for _ in range(max(1, min(batch_size, total_pages)))]
+        await asyncio.gather(*workers)
+        
+        # Workers finish out of order; keep results in page order
+        all_page_results.sort(key=lambda r: r["page_number"])
         
         print(f"\n🎯 Total pages processed: {len(all_page_results)}")
         return all_page_results
@@ -543,7 +579,7 @@ CRITICAL INSTRUCTIONS:
         print(f"✅ Results saved to: {output_path}")
         return output_path
     
-    async def process_single_pdf(self, pdf_path, year=None, batch_size=5):
+    async def process_single_pdf(self, pdf_path, year=None, batch_size=5, cooldown=0.0):
         """Process a single PDF and save results"""
         pdf_path = Path(pdf_path)
         
@@ -565,9 +601,24 @@ CRITICAL INSTRUCTIONS:
         extraction_year = year or pdf_metadata.get("year", datetime.now().year)
         output_dir = self.create_output_structure(extraction_year)
         
-        # Extract questions and answers
+        # Extract questions and answers (skipping the LLM entirely on a cache hit)
         start_time = datetime.now()
-        all_page_results = await self.extract_questions_and_answers(pdf_path, batch_size)
+        cache_path = self.get_extraction_cache_path(pdf_path) if self.cache_dir else None
+        all_page_results = self.load_cached_extraction(cache_path) if cache_path else None
+        if all_page_results:
+            print(f"♻️ Extraction cache hit: {cache_path.name}")
+        else:
+            # One keep-alive connection pool sized to the worker count for all pages
+            self.llm_service.ensure_http_client(
+                max_connections=batch_size * 2,
+                max_keepalive_connections=batch_size
+            )
+            try:
+                all_page_results = await self.extract_questions_and_answers(pdf_path, batch_size, cooldown)
+            finally:
+                await self.llm_service.aclose()
+            if cache_path and all_page_results:
+                self.save_cached_extraction(cache_path, all_page_results)
         extraction_time = (datetime.now() - start_time).total_seconds()
         
         print(f"⏱️ Extraction completed in {extraction_time:.2f} seconds")
@@ -609,12 +660,14 @@ async def main():
     parser = argparse.ArgumentParser(description="Extract questions/answers from a single topper PDF (FIXED VERSION V2)")
     parser.add_argument("--pdf_path", required=True, help="Path to the PDF file")
     parser.add_argument("--year", type=int, help="Year for organizing output (e.g., 2024)")
-    parser.add_argument("--batch_size", type=int, default=3, help="Number of pages to process in each batch (default: 3)")
+    parser.add_argument("--batch_size", type=int, default=3, help="Number of pages to process concurrently (default: 3)")
+    parser.add_argument("--cache-dir", dest="cache_dir", help="Directory for the content-addressed extraction cache (disabled if omitted)")
+    parser.add_argument("--cooldown", type=float, default=0.0, help="Seconds each worker pauses between pages (default: 0, no pause)")
     
     args = parser.parse_args()
     
-    extractor = FixedTopperExtractor()
-    result = await extractor.process_single_pdf(args.pdf_path, args.year, args.batch_size)
+    extractor = FixedTopperExtractor(cache_dir=args.cache_dir)
+    result = await extractor.process_single_pdf(args.pdf_path, args.year, args.batch_size, args.cooldown)
     
     if result:
         print(f"\n🎯 SUCCESS: Fixed extraction complete!")
@@ -21,6 +21,7 @@ Usage:
 import json
 import asyncio
 import argparse
+import hashlib
 import logging
 from pathlib import Path
 from datetime import datetime
@@ -46,17 +47,47 @@ except ImportError as e:
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Vector index presets. IVF_SQ8 stores 8-bit scalar-quantized vectors (~4x smaller
+# than IVF_FLAT, faster distance math, negligible recall loss for normalized BGE
+# embeddings). Queries stay FP32; Milvus quantizes them internally.
+INDEX_PRESETS = {
+    "IVF_FLAT": {"index_type": "IVF_FLAT", "params": {"nlist": 1024}},
+    "IVF_SQ8": {"index_type": "IVF_SQ8", "params": {"nlist": 1024}},
+    "HNSW": {"index_type": "HNSW", "params": {"M": 16, "efConstruction": 200}},
+    # 32 sub-quantizers x 8 bits: 32 bytes per 1024-dim vector instead of 4 KB;
+    # m must divide the embedding dimension (adjusted at index build if not)
+    "IVF_PQ": {"index_type": "IVF_PQ", "params": {"nlist": 1024, "m": 32, "nbits": 8}},
+}
+
+# Search breadth for IVF presets; PQ's coarser distances need more probed lists
+IVF_SEARCH_NPROBE = {"IVF_PQ": 16}
+
+def content_id(pdf_filename: str, question_number: str, marks_allocated: str, estimated_word_count: int) -> int:
+    """Deterministic INT64 primary key for a topper answer
+    
+    Re-ingesting the same answer yields the same id, so upserts overwrite it
+    instead of adding a duplicate row.
+    """
+    key = f"{pdf_filename}|{question_number}|{marks_allocated}|{estimated_word_count}"
+    digest = hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
 class BGEMilvusProcessor:
-    def __init__(self, model_name="BAAI/bge-large-en-v1.5", milvus_db_path="./milvus_toppers.db"):
+    def __init__(self, model_name="BAAI/bge-large-en-v1.5", milvus_db_path="./milvus_toppers.db",
+                 index_type="IVF_SQ8", search_ef=64):
         """
         Initialize BGE embeddings and Milvus connection
         
         Args:
             model_name: BGE model to use for embeddings
             milvus_db_path: Path to Milvus Lite database file
+            index_type: Vector index preset for new collections (see INDEX_PRESETS)
+            search_ef: HNSW search breadth; higher trades latency for recall
         """
         self.model_name = model_name
         self.milvus_db_path = milvus_db_path
+        self.index_type = index_type
+        self.search_ef = search_ef
         self.embedding_model = None
         self.embedding_dim = 1024  # BGE-large-en-v1.5 dimension
         
@@ -93,8 +124,8 @@ class BGEMilvusProcessor:
     def create_collection_schema(self):
         """Create Milvus collection schema for topper Q&A data"""
         fields = [
-            # Primary key
-            FieldSchema(name="id", dtype=DataType.INT64, is_primary=True, auto_id=True),
+            # Primary key: content hash (see content_id) so re-ingestion upserts
+            FieldSchema(name="id", dtype=DataType.INT64, is_primary=True, auto_id=False),
             
             # Question and answer content
             FieldSchema(name="question_text", dtype=DataType.VARCHAR, max_length=10000),
@@ -143,13 +174,20 @@ class BGEMilvusProcessor:
             collection = Collection(collection_name, schema)
             
             # Create index for vector search
+            preset = INDEX_PRESETS[self.index_type]
             index_params = {
                 "metric_type": "COSINE",  # Use cosine similarity for semantic search
-                "index_type": "IVF_FLAT",
-                "params": {"nlist": 1024}
+                "index_type": preset["index_type"],
+                "params": dict(preset["params"])
             }
-            
-            print(f"🔍 Creating vector index...")
+            if "m" in index_params["params"]:
+                # Largest sub-quantizer count <= the preset that divides the dimension
+                m = index_params["params"]["m"]
+                while self.embedding_dim % m:
+                    m -= 1
+                index_params["params"]["m"] = m
+            
+            print(f"🔍 Creating {self.index_type} vector index...")
             collection.create_index("embedding", index_params)
             print(f"✅ Vector index created")
         
@@ -228,8 +266,18 @@ class BGEMilvusProcessor:
                     "extraction_timestamp": pdf_metadata.get("extraction_timestamp", ""),
                 }
                 
+                entry["id"] = content_id(
+                    entry["pdf_filename"], entry["question_number"],
+                    entry["marks_allocated"], entry["estimated_word_count"]
+                )
                 embedding_data.append(entry)
         
+        # Same answer seen twice in this run (e.g. re-extracted JSON): keep the latest
+        unique_entries = {entry["id"]: entry for entry in embedding_data}
+        if len(unique_entries) < len(embedding_data):
+            print(f"   ⚠️ Dropped {len(embedding_data) - len(unique_entries)} duplicate entries")
+            embedding_data = list(unique_entries.values())
+        
         print(f"🎯 Prepared {len(embedding_data)} entries for embedding")
         return embedding_data
     
@@ -278,9 +326,12 @@ class BGEMilvusProcessor:
                 insert_data.append([entry[field_name] for entry in embedding_data])
         
         try:
-            # Insert data
-            mr = collection.insert(insert_data)
-            print(f"✅ Inserted {len(mr.primary_keys)} entries")
+            # Upsert on content-hash keys; legacy auto_id collections can only insert
+            if collection.schema.primary_field.auto_id:
+                mr = collection.insert(insert_data)
+            else:
+                mr = collection.upsert(insert_data)
+            print(f"✅ Wrote {len(mr.primary_keys)} entries")
             
             # Flush to ensure data is written
             collection.flush()
@@ -315,7 +366,7 @@ class BGEMilvusProcessor:
             # Search parameters
             search_params = {
                 "metric_type": "COSINE",
-                "params": {"nprobe": 10}
+                "params": {"ef": self.search_ef} if self.index_type == "HNSW" else {"nprobe": IVF_SEARCH_NPROBE.get(self.index_type, 10)}
             }
             
             # Perform search
@@ -449,13 +500,17 @@ async def main():
     parser.add_argument("--batch_size", type=int, default=32, help="Batch size for embedding generation")
     parser.add_argument("--milvus_db_path", default="./milvus_toppers.db", help="Milvus Lite database path")
     parser.add_argument("--model_name", default="BAAI/bge-large-en-v1.5", help="BGE model name")
+    parser.add_argument("--index_type", default="IVF_SQ8", choices=sorted(INDEX_PRESETS), help="Vector index for new collections")
+    parser.add_argument("--search_ef", type=int, default=64, help="HNSW search ef (recall/latency knob)")
     
     args = parser.parse_args()
     
     # Initialize processor
     processor = BGEMilvusProcessor(
         model_name=args.model_name,
-        milvus_db_path=args.milvus_db_path
+        milvus_db_path=args.milvus_db_path,
+        index_type=args.index_type,
+        search_ef=args.search_ef
     )
     
     # Process files
@@ -12,25 +12,77 @@ Usage:
 
 import json
 import argparse
+import atexit
+import io
+import statistics
 import sys
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Dict, Any
-import pandas as pd
+from typing import List, Dict, Any, Iterator
 
 try:
     from pymilvus import connections, Collection, utility
     from sentence_transformers import SentenceTransformer
 except ImportError as e:
     print(f"❌ Missing required packages. Please install:")
-    print("pip install pymilvus sentence-transformers pandas")
+    print("pip install pymilvus sentence-transformers")
     print(f"Error: {e}")
     sys.exit(1)
 
+from app.services.milvus_tuning import adaptive_search_params, similarity_converter
+
+# One process-lifetime connection on the "default" alias, shared by every inspector
+_CONNECTION_LOCK = threading.Lock()
+_CONNECTED_URI = None
+
+def _ensure_connection(uri: str):
+    """Connect the default alias once; later calls reuse the open connection"""
+    global _CONNECTED_URI
+    with _CONNECTION_LOCK:
+        if _CONNECTED_URI == uri:
+            return False
+        if _CONNECTED_URI is not None:
+            connections.disconnect("default")
+        connections.connect("default", uri=uri)
+        if _CONNECTED_URI is None:
+            atexit.register(_disconnect)
+        _CONNECTED_URI = uri
+        return True
+
+def _disconnect():
+    """atexit hook closing the shared connection"""
+    global _CONNECTED_URI
+    with _CONNECTION_LOCK:
+        if _CONNECTED_URI is not None:
+            try:
+                connections.disconnect("default")
+            except Exception:
+                pass
+            _CONNECTED_URI = None
+
+def _truncate(value, width: int) -> str:
+    """Shorten a display value to `width` characters, marking the cut with '...'"""
+    text = value if isinstance(value, str) else str(value)
+    return text if len(text) <= width else text[:width] + "..."
+
 class MilvusInspector:
     def __init__(self, milvus_db_path="./milvus_toppers.db"):
         """Initialize Milvus inspector"""
         self.milvus_db_path = milvus_db_path
         self.embedding_model = None
+        # Per-instance memo so repeated test queries skip the BGE forward pass
+        self._encode = lru_cache(maxsize=256)(self._encode_uncached)
+        # Collection handles, each loaded exactly once per process
+        self._collections: Dict[str, Collection] = {}
+        self._loaded: set = set()
+        # Schemas are immutable for a collection's lifetime
+        self._output_fields: Dict[str, List[str]] = {}
+        self._schema_info: Dict[str, List[str]] = {}
+        # Rendered collection reports keyed by (name, num_entities)
+        self._report_cache: Dict[tuple, str] = {}
         
         print(f"🔍 Milvus Database Inspector")
         print(f"🗄️ Database: {milvus_db_path}")
@@ -39,12 +91,80 @@ class MilvusInspector:
         """Connect to Milvus Lite database"""
         print(f"🔗 Connecting to Milvus Lite...")
         try:
-            connections.connect("default", uri=self.milvus_db_path)
-            print(f"✅ Connected successfully")
+            if _ensure_connection(self.milvus_db_path):
+                print(f"✅ Connected successfully")
+            else:
+                print(f"✅ Reusing existing connection")
         except Exception as e:
             print(f"❌ Failed to connect: {e}")
             raise
     
+    def _get_collection(self, collection_name: str) -> Collection:
+        """Return a cached, loaded Collection handle"""
+        collection = self._collections.get(collection_name)
+        if collection is None:
+            collection = Collection(collection_name)
+            self._collections[collection_name] = collection
+        if collection_name not in self._loaded:
+            collection.load()
+            self._loaded.add(collection_name)
+        return collection
+    
+    def _get_output_fields(self, collection: Collection) -> List[str]:
+        """Scalar field names (no vectors, no auto ids), computed once per collection"""
+        fields = self._output_fields.get(collection.name)
+        if fields is None:
+            fields = [field.name for field in collection.schema.fields
+                      if field.dtype.name != 'FLOAT_VECTOR' and not field.auto_id]
+            self._output_fields[collection.name] = fields
+        return fields
+    
+    def _get_schema_info(self, collection: Collection) -> List[str]:
+        """Formatted schema field lines, computed once per collection"""
+        lines = self._schema_info.get(collection.name)
+        if lines is None:
+            lines = []
+            for i, field in enumerate(collection.schema.fields, 1):
+                field_info = f"   {i}. {field.name} ({field.dtype})"
+                if hasattr(field, 'max_length') and field.max_length:
+                    field_info += f" [max_length: {field.max_length}]"
+                if hasattr(field, 'dim') and field.dim:
+                    field_info += f" [dim: {field.dim}]"
+                if field.is_primary:
+                    field_info += " [PRIMARY KEY]"
+                if field.auto_id:
+                    field_info += " [AUTO_ID]"
+                lines.append(field_info)
+            self._schema_info[collection.name] = lines
+        return lines
+    
+    def iter_collection(self, collection: Collection, output_fields: List[str],
+                        batch: int = 500, limit: int = None) -> Iterator[List[Dict[str, Any]]]:
+        """Yield batches of rows using keyset pagination on the primary key
+        
+        Each page is `pk > last_pk`, so fetching page N costs the same as page 1
+        (Milvus offsets materialize and discard every preceding row).
+        """
+        pk_name = collection.schema.primary_field.name
+        fields = output_fields if pk_name in output_fields else output_fields + [pk_name]
+        last_pk = None
+        remaining = limit
+        
+        while remaining is None or remaining > 0:
+            page_size = batch if remaining is None else min(batch, remaining)
+            expr = f"{pk_name} > {last_pk}" if last_pk is not None else f"{pk_name} >= 0"
+            rows = collection.query(expr=expr, output_fields=fields, limit=page_size)
+            if not rows:
+                return
+            # Query results are not guaranteed to be pk-ordered
+            rows.sort(key=lambda row: row[pk_name])
+            last_pk = rows[-1][pk_name]
+            if remaining is not None:
+                remaining -= len(rows)
+            yield rows
+            if len(rows) < page_size:
+                return
+    
     def list_collections(self):
         """List all collections in the database"""
         print(f"\n📊 Collections in database:")
@@ -61,6 +181,31 @@ class MilvusInspector:
             print(f"❌ Error listing collections: {e}")
             return []
     
+    def _render_collection_report(self, collection: Collection, num_entities: int) -> str:
+        """Render the statistics, schema and index sections for a collection"""
+        buf = io.StringIO()
+        
+        # Get basic statistics
+        print(f"\n📈 Collection Statistics:", file=buf)
+        print(f"   📁 Name: {collection.name}", file=buf)
+        print(f"   📊 Total entities: {num_entities}", file=buf)
+        print(f"   🏗️ Schema fields: {len(collection.schema.fields)}", file=buf)
+        print(f"   🔍 Indexes: {len(collection.indexes)}", file=buf)
+        
+        # Show schema
+        print(f"\n🏗️ Schema Fields:", file=buf)
+        for field_info in self._get_schema_info(collection):
+            print(field_info, file=buf)
+        
+        # Show indexes
+        print(f"\n🔍 Indexes:", file=buf)
+        for i, index in enumerate(collection.indexes, 1):
+            print(f"   {i}. Field: {index.field_name}", file=buf)
+            print(f"      Type: {index.params.get('index_type', 'Unknown')}", file=buf)
+            print(f"      Metric: {index.params.get('metric_type', 'Unknown')}", file=buf)
+        
+        return buf.getvalue()
+    
     def inspect_collection(self, collection_name: str):
         """Inspect a specific collection"""
         print(f"\n🔍 Inspecting collection: {collection_name}")
@@ -70,36 +215,15 @@ class MilvusInspector:
                 print(f"❌ Collection '{collection_name}' does not exist")
                 return None
             
-            collection = Collection(collection_name)
-            collection.load()
-            
-            # Get basic statistics
-            print(f"\n📈 Collection Statistics:")
-            print(f"   📁 Name: {collection.name}")
-            print(f"   📊 Total entities: {collection.num_entities}")
-            print(f"   🏗️ Schema fields: {len(collection.schema.fields)}")
-            print(f"   🔍 Indexes: {len(collection.indexes)}")
+            collection = self._get_collection(collection_name)
             
-            # Show schema
-            print(f"\n🏗️ Schema Fields:")
-            for i, field in enumerate(collection.schema.fields, 1):
-                field_info = f"   {i}. {field.name} ({field.dtype})"
-                if hasattr(field, 'max_length') and field.max_length:
-                    field_info += f" [max_length: {field.max_length}]"
-                if hasattr(field, 'dim') and field.dim:
-                    field_info += f" [dim: {field.dim}]"
-                if field.is_primary:
-                    field_info += " [PRIMARY KEY]"
-                if field.auto_id:
-                    field_info += " [AUTO_ID]"
-                print(field_info)
-            
-            # Show indexes
-            print(f"\n🔍 Indexes:")
-            for i, index in enumerate(collection.indexes, 1):
-                print(f"   {i}. Field: {index.field_name}")
-                print(f"      Type: {index.params.get('index_type', 'Unknown')}")
-                print(f"      Metric: {index.params.get('metric_type', 'Unknown')}")
+            # Schema and indexes are immutable, so the report only changes with the row count
+            report_key = (collection_name, collection.num_entities)
+            report = self._report_cache.get(report_key)
+            if report is None:
+                report = self._render_collection_report(collection, report_key[1])
+                self._report_cache[report_key] = report
+            sys.stdout.write(report)
             
             return collection
             
@@ -113,8 +237,7 @@ class MilvusInspector:
         
         try:
             # Get field names (excluding vector field for readability)
-            field_names = [field.name for field in collection.schema.fields 
-                          if field.dtype.name != 'FLOAT_VECTOR' and not field.auto_id]
+            field_names = self._get_output_fields(collection)
             
             # Query sample data
             results = collection.query(
@@ -128,25 +251,22 @@ class MilvusInspector:
                 return
             
             # Display in a structured format
+            buf = io.StringIO()
             for i, result in enumerate(results, 1):
-                print(f"\n   📄 Entry {i}:")
-                print(f"      🆔 ID: {result.get('id', 'N/A')}")
-                print(f"      📝 Question: {result.get('question_text', 'N/A')[:100]}...")
-                print(f"      📊 Q Number: {result.get('question_number', 'N/A')}")
-                print(f"      🎯 Marks: {result.get('marks_allocated', 'N/A')}")
-                print(f"      📄 PDF: {result.get('pdf_filename', 'N/A')}")
-                print(f"      📅 Year: {result.get('year', 'N/A')}")
-                print(f"      📏 Pages: {result.get('pages_spanned', 'N/A')}")
-                print(f"      📊 Word Count: {result.get('estimated_word_count', 'N/A')}")
-                print(f"      🏆 Quality: {result.get('handwriting_quality', 'N/A')}")
+                print(f"\n   📄 Entry {i}:", file=buf)
+                print(f"      🆔 ID: {result.get('id', 'N/A')}", file=buf)
+                print(f"      📝 Question: {_truncate(result.get('question_text', 'N/A'), 100)}", file=buf)
+                print(f"      📊 Q Number: {result.get('question_number', 'N/A')}", file=buf)
+                print(f"      🎯 Marks: {result.get('marks_allocated', 'N/A')}", file=buf)
+                print(f"      📄 PDF: {result.get('pdf_filename', 'N/A')}", file=buf)
+                print(f"      📅 Year: {result.get('year', 'N/A')}", file=buf)
+                print(f"      📏 Pages: {result.get('pages_spanned', 'N/A')}", file=buf)
+                print(f"      📊 Word Count: {result.get('estimated_word_count', 'N/A')}", file=buf)
+                print(f"      🏆 Quality: {result.get('handwriting_quality', 'N/A')}", file=buf)
                 
                 # Show answer preview
-                answer_text = result.get('answer_text', 'N/A')
-                if len(answer_text) > 200:
-                    answer_preview = answer_text[:200] + "..."
-                else:
-                    answer_preview = answer_text
-                print(f"      📝 Answer: {answer_preview}")
+                print(f"      📝 Answer: {_truncate(result.get('answer_text', 'N/A'), 200)}", file=buf)
+            sys.stdout.write(buf.getvalue())
                 
         except Exception as e:
             print(f"❌ Error sampling data: {e}")
@@ -156,56 +276,53 @@ class MilvusInspector:
         print(f"\n📊 Data Distribution:")
         
         try:
-            # Get all data for analysis
-            results = collection.query(
-                expr="",
-                output_fields=["question_number", "marks_allocated", "year", "pdf_filename", "estimated_word_count", "is_multi_page"],
-                limit=1000  # Assuming we don't have more than 1000 entries for now
-            )
+            # Aggregate page by page so only the running counts stay in memory
+            year_counts, marks_counts = Counter(), Counter()
+            pdf_counts, multipage_counts = Counter(), Counter()
+            word_counts = []
+            for rows in self.iter_collection(
+                collection,
+                ["marks_allocated", "year", "pdf_filename", "estimated_word_count", "is_multi_page"]
+            ):
+                for row in rows:
+                    year_counts[row.get('year')] += 1
+                    marks_counts[row.get('marks_allocated')] += 1
+                    pdf_counts[row.get('pdf_filename')] += 1
+                    multipage_counts[row.get('is_multi_page')] += 1
+                    if row.get('estimated_word_count') is not None:
+                        word_counts.append(row['estimated_word_count'])
             
-            if not results:
+            if not year_counts:
                 print("   ⚠️ No data for analysis")
                 return
             
-            # Convert to DataFrame for analysis
-            df = pd.DataFrame(results)
-            
             # Year distribution
-            if 'year' in df.columns:
-                year_counts = df['year'].value_counts().sort_index()
-                print(f"\n   📅 Year Distribution:")
-                for year, count in year_counts.items():
-                    print(f"      {year}: {count} questions")
+            print(f"\n   📅 Year Distribution:")
+            for year, count in sorted(year_counts.items()):
+                print(f"      {year}: {count} questions")
             
             # Marks distribution
-            if 'marks_allocated' in df.columns:
-                marks_counts = df['marks_allocated'].value_counts()
-                print(f"\n   🎯 Marks Distribution:")
-                for marks, count in marks_counts.items():
-                    print(f"      {marks} marks: {count} questions")
+            print(f"\n   🎯 Marks Distribution:")
+            for marks, count in marks_counts.most_common():
+                print(f"      {marks} marks: {count} questions")
             
             # PDF distribution
-            if 'pdf_filename' in df.columns:
-                pdf_counts = df['pdf_filename'].value_counts()
-                print(f"\n   📄 PDF Distribution:")
-                for pdf, count in pdf_counts.items():
-                    print(f"      {pdf}: {count} questions")
+            print(f"\n   📄 PDF Distribution:")
+            for pdf, count in pdf_counts.most_common():
+                print(f"      {pdf}: {count} questions")
             
             # Multi-page distribution
-            if 'is_multi_page' in df.columns:
-                multipage_counts = df['is_multi_page'].value_counts()
-                print(f"\n   📄 Multi-page Distribution:")
-                for is_multi, count in multipage_counts.items():
-                    print(f"      Multi-page: {is_multi}: {count} questions")
+            print(f"\n   📄 Multi-page Distribution:")
+            for is_multi, count in multipage_counts.most_common():
+                print(f"      Multi-page: {is_multi}: {count} questions")
             
             # Word count statistics
-            if 'estimated_word_count' in df.columns:
-                word_stats = df['estimated_word_count'].describe()
+            if word_counts:
                 print(f"\n   📊 Word Count Statistics:")
-                print(f"      Mean: {word_stats['mean']:.1f} words")
-                print(f"      Min: {word_stats['min']:.0f} words")
-                print(f"      Max: {word_stats['max']:.0f} words")
-                print(f"      Median: {word_stats['50%']:.1f} words")
+                print(f"      Mean: {statistics.fmean(word_counts):.1f} words")
+                print(f"      Min: {min(word_counts):.0f} words")
+                print(f"      Max: {max(word_counts):.0f} words")
+                print(f"      Median: {statistics.median(word_counts):.1f} words")
                 
         except Exception as e:
             print(f"❌ Error analyzing data distribution: {e}")
@@ -222,6 +339,38 @@ class MilvusInspector:
                 return False
         return True
     
+    def _encode_uncached(self, query: str):
+        """Encode a single query into a normalized (1, dim) numpy array"""
+        return self.embedding_model.encode([query], normalize_embeddings=True, convert_to_numpy=True)
+    
+    def _print_search_hits(self, collection: Collection, hits):
+        """Print one query's ranked hits"""
+        to_similarity = similarity_converter(collection)
+        # Build the whole block, then write once instead of one syscall per line
+        buf = io.StringIO()
+        print(f"📊 Search Results:", file=buf)
+        for i, result in enumerate(hits, 1):
+            fields = result.fields
+            print(f"\n   🏆 Rank {i} (Score: {to_similarity(result.score):.4f})", file=buf)
+            print(f"      📄 PDF: {fields.get('pdf_filename', 'N/A')}", file=buf)
+            print(f"      📝 Q{fields.get('question_number', 'N/A')} ({fields.get('marks_allocated', 'N/A')} marks)", file=buf)
+            print(f"      📊 Words: {fields.get('estimated_word_count', 'N/A')}", file=buf)
+            
+            print(f"      ❓ Question: {_truncate(fields.get('question_text', 'N/A'), 100)}", file=buf)
+            print(f"      📝 Answer: {_truncate(fields.get('answer_text', 'N/A'), 150)}", file=buf)
+        sys.stdout.write(buf.getvalue())
+    
+    def _search(self, collection: Collection, query_embeddings, limit: int):
+        """Run one Milvus search for one or more query vectors"""
+        search_params = adaptive_search_params(collection, limit)
+        return collection.search(
+            data=query_embeddings,
+            anns_field="embedding",
+            param=search_params,
+            limit=limit,
+            output_fields=["question_text", "answer_text", "pdf_filename", "question_number", "marks_allocated", "estimated_word_count"]
+        )
+    
     def test_search(self, collection: Collection, query: str, limit: int = 3):
         """Test search functionality"""
         print(f"\n🔍 Testing search with query: '{query}'")
@@ -230,40 +379,27 @@ class MilvusInspector:
             return
         
         try:
-            # Generate embedding for query
-            query_embedding = self.embedding_model.encode([query], normalize_embeddings=True)
-            
-            # Search parameters
-            search_params = {
-                "metric_type": "COSINE",
-                "params": {"nprobe": 10}
-            }
-            
-            # Perform search
-            results = collection.search(
-                data=query_embedding,
-                anns_field="embedding",
-                param=search_params,
-                limit=limit,
-                output_fields=["question_text", "answer_text", "pdf_filename", "question_number", "marks_allocated", "estimated_word_count"]
-            )
-            
-            print(f"📊 Search Results:")
-            for i, result in enumerate(results[0], 1):
-                print(f"\n   🏆 Rank {i} (Score: {result.score:.4f})")
-                print(f"      📄 PDF: {result.entity.get('pdf_filename', 'N/A')}")
-                print(f"      📝 Q{result.entity.get('question_number', 'N/A')} ({result.entity.get('marks_allocated', 'N/A')} marks)")
-                print(f"      📊 Words: {result.entity.get('estimated_word_count', 'N/A')}")
+            # Generate embedding for query (cached; numpy goes to Milvus as-is)
+            query_embedding = self._encode(query)
+            results = self._search(collection, query_embedding, limit)
+            self._print_search_hits(collection, results[0])
                 
-                question = result.entity.get('question_text', 'N/A')
-                if len(question) > 100:
-                    question = question[:100] + "..."
-                print(f"      ❓ Question: {question}")
-                
-                answer = result.entity.get('answer_text', 'N/A')
-                if len(answer) > 150:
-                    answer = answer[:150] + "..."
-                print(f"      📝 Answer: {answer}")
+        except Exception as e:
+            print(f"❌ Error during search: {e}")
+    
+    def test_search_batch(self, collection: Collection, queries: List[str], limit: int = 3):
+        """Test several queries with one batched encode and one Milvus search"""
+        if not queries or not self.load_search_model():
+            return
+        
+        try:
+            query_embeddings = self.embedding_model.encode(
+                queries, normalize_embeddings=True, batch_size=32, convert_to_numpy=True
+            )
+            results = self._search(collection, query_embeddings, limit)
+            for query, hits in zip(queries, results):
+                print(f"\n🔍 Testing search with query: '{query}'")
+                self._print_search_hits(collection, hits)
                 
         except Exception as e:
             print(f"❌ Error during search: {e}")
@@ -274,8 +410,7 @@ class MilvusInspector:
         
         try:
             # Get field names (excluding vector field)
-            field_names = [field.name for field in collection.schema.fields 
-                          if field.dtype.name != 'FLOAT_VECTOR' and not field.auto_id]
+            field_names = self._get_output_fields(collection)
             
             # Query sample data
             results = collection.query(
@@ -308,28 +443,34 @@ class MilvusInspector:
             # If specific collection requested, inspect it
             if collection_name:
                 if collection_name in collections:
-                    collection = self.inspect_collection(collection_name)
-                    
-                    if collection:
-                        # Sample data
-                        self.sample_data(collection, limit=3)
-                        
-                        # Show distribution
-                        self.show_data_distribution(collection)
-                        
-                        # Test search
-                        test_queries = [
-                            "fiscal policy",
-                            "digitization",
-                            "subsidy",
-                            "land records"
-                        ]
-                        
-                        for query in test_queries:
-                            self.test_search(collection, query, limit=2)
+                    # Load the BGE model in the background while Milvus is queried
+                    model_loader = ThreadPoolExecutor(max_workers=1)
+                    model_ready = model_loader.submit(self.load_search_model)
+                    try:
+                        collection = self.inspect_collection(collection_name)
                         
-                        # Export sample
-                        self.export_sample_data(collection)
+                        if collection:
+                            # Sample data
+                            self.sample_data(collection, limit=3)
+                            
+                            # Show distribution
+                            self.show_data_distribution(collection)
+                            
+                            # Test search
+                            test_queries = [
+                                "fiscal policy",
+                                "digitization",
+                                "subsidy",
+                                "land records"
+                            ]
+                            
+                            model_ready.result()
+                            self.test_search_batch(collection, test_queries, limit=2)
+                            
+                            # Export sample
+                            self.export_sample_data(collection)
+                    finally:
+                        model_loader.shutdown(wait=False)
                         
                 else:
                     print(f"❌ Collection '{collection_name}' not found")
@@ -9,6 +9,7 @@ from app.api.api_v1.api import api_router
 from app.db.database import engine
 from app.db.base import Base
 from app.services.vector_service import vector_service
+from app.core.llm_service import close_llm_service
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -75,6 +76,12 @@ async def lifespan(app: FastAPI):
         logger.info("Vector service disconnected")
     except Exception as e:
         logger.error(f"Error disconnecting vector service: {e}")
+    
+    # Close pooled LLM connections
+    try:
+        await close_llm_service()
+    except Exception as e:
+        logger.error(f"Error closing LLM service: {e}")
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -0,0 +1,48 @@
+"""Blank page detection must never skip pages that carry real answer writing"""
+import pytest
+
+fitz = pytest.importorskip("fitz")
+vision_pdf_processor = pytest.importorskip("app.utils.vision_pdf_processor")
+is_blank_page = vision_pdf_processor.VisionPDFProcessor.is_blank_page
+
+
+def _page(draw):
+    doc = fitz.open()
+    page = doc.new_page(width=595, height=842)  # A4
+    draw(page)
+    data = doc.tobytes()
+    doc.close()
+    return fitz.open(stream=data, filetype="pdf")[0]
+
+
+def _text(color, lines=30):
+    def draw(page):
+        for i in range(lines):
+            page.insert_text((50, 60 + i * 24), "The Preamble reflects constitutional morality.",
+                             fontsize=11, color=color)
+    return draw
+
+
+def _handwriting(page):
+    shape = page.new_shape()
+    for row in range(12):
+        y = 80 + row * 55
+        for x in range(50, 520, 30):
+            shape.draw_bezier((x, y), (x + 8, y - 14), (x + 18, y + 14), (x + 28, y))
+    shape.finish(color=(0.1, 0.1, 0.5), width=0.8)
+    shape.commit()
+
+
+@pytest.mark.parametrize("draw", [
+    _text((0, 0, 0)),
+    _text((0.1, 0.1, 0.6)),
+    _text((0.45, 0.45, 0.45)),
+    _text((0, 0, 0), lines=1),
+    _handwriting,
+], ids=["black-text", "blue-text", "gray-text", "single-line", "handwriting"])
+def test_written_pages_are_not_blank(draw):
+    assert not is_blank_page(_page(draw))
+
+
+def test_empty_page_is_blank():
+    assert is_blank_page(_page(lambda page: None))
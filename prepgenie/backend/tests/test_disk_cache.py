@@ -0,0 +1,43 @@
+"""DiskCache must stay within its age and size bounds"""
+import os
+import time
+
+from app.utils.disk_cache import DiskCache
+
+
+def test_round_trip_and_disabled(tmp_path):
+    cache = DiskCache(str(tmp_path), ttl_seconds=60, max_bytes=2**20)
+    path = cache.path_for("model", "prompt")
+    assert cache.read(path) is None
+    cache.write(path, b"response")
+    assert cache.read(path) == b"response"
+
+    disabled = DiskCache("", ttl_seconds=60, max_bytes=2**20)
+    assert not disabled.enabled
+    assert disabled.path_for("model", "prompt") is None
+
+
+def test_expired_entries_are_misses_and_pruned(tmp_path):
+    cache = DiskCache(str(tmp_path), ttl_seconds=60, max_bytes=2**20)
+    path = cache.path_for("old")
+    cache.write(path, b"stale")
+    past = time.time() - 120
+    os.utime(path, (past, past))
+    assert cache.read(path) is None
+    cache.prune()
+    assert not path.exists()
+
+
+def test_prune_evicts_oldest_beyond_max_bytes(tmp_path):
+    cache = DiskCache(str(tmp_path), ttl_seconds=3600, max_bytes=1000, prune_every=1000)
+    paths = []
+    for i in range(10):
+        path = cache.path_for(str(i))
+        cache.write(path, b"x" * 200)
+        mtime = time.time() - 100 + i  # later writes are newer
+        os.utime(path, (mtime, mtime))
+        paths.append(path)
+    cache.prune()
+    kept = [path.exists() for path in paths]
+    assert sum(kept) * 200 <= 900
+    assert kept[-1] and not kept[0]